@@ -0,0 +1,34 @@
+from itertools import product
+from unittest import TestCase
+
+from warhammer_stats import PMFCollection, Target, Weapon
+from warhammer_stats.attack.allocation import DESTROYED, FireAllocation, allocate_fire
+
+
+class TestAllocation(TestCase):
+    def setUp(self):
+        bolter = Weapon(bs=3, shots=PMFCollection.static(2), strength=4, ap=0, damage=PMFCollection.static(1))
+        lascannon = Weapon(bs=3, shots=PMFCollection.static(1), strength=9, ap=3, damage=PMFCollection.mdn(1, 6))
+        plasma = Weapon(bs=3, shots=PMFCollection.static(2), strength=7, ap=2, damage=PMFCollection.static(2))
+        self.attackers = [[bolter] * 5, [lascannon, bolter], [plasma] * 3, [lascannon] * 2]
+        self.targets = [
+            (Target(toughness=3, save=5, invuln=7, fnp=7, wounds=1, cost=6), 10),
+            (Target(toughness=5, save=2, invuln=4, fnp=7, wounds=3, cost=40), 3),
+            (Target(toughness=9, save=3, invuln=7, fnp=7, wounds=12, cost=150), 1),
+        ]
+
+    def test_matches_brute_force(self):
+        for objective in ['points', DESTROYED]:
+            allocation = FireAllocation(self.attackers, self.targets, objective)
+            assignment, value = allocation.optimize()
+            self.assertAlmostEqual(value, allocation.total(assignment))
+            best = max(allocation.total(list(option)) for option in product(range(3), repeat=4))
+            self.assertAlmostEqual(value, best)
+
+    def test_split(self):
+        assignment, value = allocate_fire(self.attackers, self.targets, split=True)
+        self.assertEqual(len(assignment), 12)
+        self.assertGreaterEqual(value, allocate_fire(self.attackers, self.targets)[1] - 1e-9)
+        self.assertEqual(allocate_fire([], self.targets), ([], 0.0))
+        with self.assertRaises(ValueError):
+            allocate_fire(self.attackers, self.targets, objective='wounds')
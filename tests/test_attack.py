@@ -1,16 +1,23 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 
-from warhammer_stats import Attack, Weapon, Target, PMFCollection
+from warhammer_stats import Attack, MultiAttack, Weapon, Target, PMF, PMFCollection, Unit, UnitTarget
 from warhammer_stats.utils.modifier_collection import ModifierCollection
 from warhammer_stats.modifiers.additive_modifiers import AddNToAP, AddND6, AddND3, AddNToInvuln, AddNToSave, AddNToThreshold, AddNToVolume
-from warhammer_stats.modifiers.generator_modifiers import (GenerateD3MortalWoundsModifiable, GenerateD3MortalWoundsUnmodifiable,
+from warhammer_stats.modifiers.generator_modifiers import (EndAttackAndGenrateExtraWoundsModifiable, EndAttackAndGenrateExtraWoundsUnmodifiable,
+                                                           EndAttackAndGenrateMortalWoundsModifiable, EndAttackAndGenrateMortalWoundsUnmodifiable,
+                                                           GenerateD3MortalWoundsModifiable, GenerateD3MortalWoundsUnmodifiable,
                                                            GenerateD6MortalWoundsModifiable, GenerateD6MortalWoundsUnmodifiable,
                                                            GenerateExtraAutomaticHitsModifiable, GenerateExtraAutomaticHitsUnmodifiable,
                                                            GenerateExtraAutomaticWoundsModifiable, GenerateExtraAutomaticWoundsUnmodifiable,
                                                            GenerateMortalWoundsModifiable, GenerateExtraHitRollsModifiable,
                                                            GenerateExtraHitRollsUnmodifiable, GenerateMortalWoundsUnmodifiable)
+from warhammer_stats.modifiers.value_setter_modifiers import HighestOfTwo, KeepHighest, KeepLowest
 from warhammer_stats.modifiers.reroll_modifiers import ReRollAll, ReRollFailed, ReRollLessThanExpectedValue, ReRollOneDice, ReRollOneDiceVolume, ReRollOnes
 from warhammer_stats.modifiers.splitter_modifiers import OnAModifiableRollOfNAddAP, OnAModifiableRollOfNAddDamage, OnAnUnmodifiableRollOfNAddAP, OnAnUnmodifiableRollOfNAddDamage
+from warhammer_stats.attack.rolls.save_rolls import FailedArmourSaveRoll
+from warhammer_stats.attack.rolls.hit_rolls import HitPhaseKernel, SuccessfulHitRoll, MortalWoundRoll, ExtraHitRollRoll
 class TestAttack(TestCase):
     def test_every_modifiers(self):
         # Re-roll ones to hit modifier
@@ -73,10 +80,217 @@ class TestAttack(TestCase):
         self.assertEqual(round(no_modifier, 2), 1.25)
 
         # Add the modifier
-        weapon.modifiers = weapon_mods
+        weapon = weapon.replace(modifiers=weapon_mods)
 
         # Attack with no modifier
         with_modifier = Attack(weapon, target).run().total_damage_dist.mean()
 
         # Should be ~1.4583 = 1.25 *(7/6) times higher now
         self.assertEqual(round(with_modifier, 2), round(no_modifier * (7/6), 2) )
+
+    def test_split_slices_are_deduplicated(self):
+        # Two splitters granting the same AP on the same roll produce a single effect
+        weapon_mods = ModifierCollection(
+            hit_mods=[OnAModifiableRollOfNAddAP(6, 1)],
+            wound_mods=[OnAModifiableRollOfNAddAP(6, 1), OnAnUnmodifiableRollOfNAddDamage(6, 1)],
+        )
+        weapon = Weapon(bs=4, shots=PMFCollection.static(10), strength=4, ap=0, damage=PMFCollection.static(1), modifiers=weapon_mods)
+        target = Target(toughness=4, save=4, invuln=7, fnp=7, wounds=7)
+        roll = FailedArmourSaveRoll(weapon, target, weapon.modifiers + target.modifiers)
+
+        effects = roll.collect_effects(roll.split_generator())
+        self.assertEqual(len(effects), 3)
+        self.assertAlmostEqual(sum(prob for prob, _ in effects), 1.0)
+
+    def test_split_slices_on_a_pool(self):
+        weapon_mods = ModifierCollection(
+            hit_mods=[OnAModifiableRollOfNAddAP(6, 1), OnAnUnmodifiableRollOfNAddDamage(5, 1), ReRollOnes()],
+            wound_mods=[OnAModifiableRollOfNAddAP(5, 2), OnAnUnmodifiableRollOfNAddDamage(6, 1), GenerateMortalWoundsUnmodifiable(6, 1)],
+        )
+        weapon = Weapon(bs=3, shots=PMFCollection.mdn(2, 6), strength=4, ap=0, damage=PMFCollection.mdn(1, 3), modifiers=weapon_mods)
+        target = Target(toughness=4, save=3, invuln=6, fnp=6, wounds=3)
+        serial = Attack(weapon, target).run()
+        # The slices are reduced in the same order whichever worker evaluates them
+        with ThreadPoolExecutor(4) as pool:
+            roll = FailedArmourSaveRoll(weapon, target, weapon.modifiers, pool=pool)
+            self.assertGreater(len(roll.collect_effects(roll.split_generator())), 1)
+            self.assertEqual(roll.calc_dist().values, FailedArmourSaveRoll(weapon, target, weapon.modifiers).calc_dist().values)
+            for _ in range(3):
+                pooled = Attack(weapon, target, pool=pool).run()
+                for (_, x), (_, y) in zip(serial.items(), pooled.items()):
+                    self.assertEqual(x.values, y.values)
+
+    def test_dice_memo_is_shared(self):
+        weapon = Weapon(bs=4, shots=PMFCollection.static(10), strength=4, ap=0, damage=PMFCollection.static(1))
+        target = Target(toughness=4, save=4, invuln=7, fnp=7, wounds=7)
+        attack = Attack(weapon, target)
+
+        # The merged modifiers are reused until the weapon is replaced
+        self.assertIs(attack.modifiers, attack.modifiers)
+        merged = attack.modifiers
+        attack.weapon = weapon.replace(modifiers=ModifierCollection(hit_mods=[ReRollOnes()]))
+        self.assertIsNot(attack.modifiers, merged)
+
+        attack.run()
+        entries = len(attack.memo)
+        self.assertGreater(entries, 0)
+
+        # Re-deriving the hit phase hits the memo rather than adding new entries
+        attack._hit_phase().results()
+        self.assertEqual(len(attack.memo), entries)
+
+    def test_hit_phase_kernel(self):
+        weapon_mods = ModifierCollection(hit_mods=[
+            ReRollOnes(),
+            GenerateExtraHitRollsModifiable(6, 1),
+            GenerateD3MortalWoundsUnmodifiable(6, 1),
+        ])
+        weapon = Weapon(bs=3, shots=PMFCollection.static(1), strength=4, ap=0, damage=PMFCollection.static(1), modifiers=weapon_mods)
+        target = Target(toughness=4, save=4, invuln=7, fnp=7, wounds=1)
+        kernel = HitPhaseKernel(weapon, target, weapon_mods)
+
+        # The fused kernel agrees with the individual rolls
+        dists = kernel.calc_dists()
+        for name, roll_class in [('successful_hit_dist', SuccessfulHitRoll), ('extra_hit_roll_dist', ExtraHitRollRoll),
+                                 ('mortal_wound_dist', MortalWoundRoll)]:
+            expected = roll_class(weapon, target, weapon_mods).calc_dist()
+            self.assertAlmostEqual(dists[name].mean(), expected.mean())
+
+        # The joint distribution sums to one and its marginals match
+        joint = kernel.calc_joint()
+        self.assertAlmostEqual(sum(joint.values()), 1.0)
+        mortal_index = kernel.outputs.index('mortal_wound_dist')
+        self.assertAlmostEqual(sum(k[mortal_index] * p for k, p in joint.items()), dists['mortal_wound_dist'].mean())
+
+    def test_approximate_mode(self):
+        weapon = Weapon(bs=4, shots=PMFCollection.mdn(30, 6), strength=4, ap=0, damage=PMFCollection.static(1))
+        target = Target(toughness=4, save=4, invuln=7, fnp=7, wounds=1)
+        attack = Attack(weapon, target)
+
+        exact = attack.run()
+        self.assertEqual(exact.error, 0.0)
+
+        # Auto mode only approximates steps with more dice than the threshold
+        self.assertEqual(attack.run(mode='auto').error, 0.0)
+        approximate = attack.run(mode='auto', threshold=50)
+        self.assertGreater(approximate.error, 0.0)
+        self.assertAlmostEqual(approximate.damage_dist.mean(), exact.damage_dist.mean(), 0)
+        self.assertAlmostEqual(approximate.kills_dist.mean(), exact.kills_dist.mean(), 0)
+
+        # A threshold of zero approximates every step with any dice
+        self.assertGreater(Attack(weapon, target, mode='auto', threshold=1000).run(threshold=0).error, 0.0)
+        self.assertGreater(MultiAttack([weapon], target).run(mode='auto', threshold=0).error, 0.0)
+
+        with self.assertRaises(ValueError):
+            Attack(weapon, target, mode='guess')
+
+    def test_value_objects(self):
+        weapon = Weapon(bs=4, shots=PMFCollection.static(10), strength=4, ap=0, damage=PMFCollection.static(1),
+                        modifiers=ModifierCollection(hit_mods=[ReRollOnes(), AddNToThreshold(1)]))
+        target = Target(toughness=4, save=4, invuln=7, fnp=7, wounds=7)
+
+        # Equal params give equal weapons that can share cache entries
+        same = Weapon(bs=4, shots=PMFCollection.static(10), strength=4, ap=0, damage=PMFCollection.static(1),
+                      modifiers=ModifierCollection(hit_mods=[ReRollOnes(), AddNToThreshold(1)]))
+        self.assertEqual(weapon, same)
+        self.assertEqual(len({weapon, same}), 1)
+        self.assertNotEqual(weapon, weapon.replace(ap=1))
+        self.assertEqual(pickle.loads(pickle.dumps(target)), target)
+
+        with self.assertRaises(AttributeError):
+            weapon.bs = 3
+        with self.assertRaises(AttributeError):
+            AddNToThreshold(1).value = 2
+        self.assertEqual(weapon.replace(bs=3).bs, 3)
+        self.assertEqual(weapon.bs, 4)
+
+        # Collections keep their own copy of the lists they are given, so their hash can't go stale
+        dice = [PMF.dn(6)]
+        shots = PMFCollection(dice)
+        dice.append(PMF.dn(6))
+        self.assertEqual(shots, PMFCollection.mdn(1, 6))
+        self.assertNotEqual(shots, PMFCollection.mdn(2, 6))
+        for value in [shots.pmfs, weapon.modifiers.hit_mods, UnitTarget([(target, 2)]).profiles, Unit(target, 2, [weapon]).weapons]:
+            with self.assertRaises(AttributeError):
+                value.append(None)
+
+    def test_sequential_multi_attack(self):
+        # Two single shots of one damage can only kill a two wound model between them
+        weapon = Weapon(bs=2, shots=PMFCollection.static(1), strength=8, ap=0, damage=PMFCollection.static(1))
+        target = Target(toughness=4, save=7, invuln=7, fnp=7, wounds=2)
+        independent = MultiAttack([weapon, weapon], target).run()
+        sequential = MultiAttack([weapon, weapon], target).run(sequential=True)
+        self.assertAlmostEqual(independent.kills_dist.mean(), 0.0)
+        self.assertAlmostEqual(sequential.kills_dist.mean(), (25 / 36) ** 2)
+        self.assertEqual(sequential.total_damage_dist.values, independent.total_damage_dist.values)
+
+        # With no wounded models to carry over the two agree
+        target = target.replace(wounds=1)
+        for x, y in zip(MultiAttack([weapon] * 3, target).run(sequential=True).kills_dist.values,
+                        MultiAttack([weapon] * 3, target).run().kills_dist.values):
+            self.assertAlmostEqual(x, y)
+
+    def test_sequential_single_weapon(self):
+        # A single weapon's mortal wounds spill over from model to model the same way both ways
+        for hit_mod, wounds in [(GenerateD3MortalWoundsUnmodifiable(6, 1), 3), (GenerateD6MortalWoundsUnmodifiable(4, 1), 1)]:
+            weapon = Weapon(bs=3, shots=PMFCollection.mdn(1, 6), strength=4, ap=0, damage=PMFCollection.mdn(1, 3),
+                            modifiers=ModifierCollection(hit_mods=[hit_mod]))
+            target = Target(toughness=4, save=4, invuln=7, fnp=5, wounds=wounds)
+            expected = Attack(weapon, target).run().kills_dist
+            sequential = MultiAttack([weapon], target).run(sequential=True).kills_dist
+            for x, y in zip(sequential.values, expected.values):
+                self.assertAlmostEqual(x, y, 4)
+            self.assertAlmostEqual(sum(sequential.values), 1.0)
+
+        # The results of each weapon are cached along with its attack
+        multi = MultiAttack([weapon], target)
+        self.assertIs(multi.run_attack(weapon, target), multi.run_attack(weapon, target))
+        self.assertEqual(multi.run_attack(weapon, target).kills_dist, expected)
+        self.assertIs(multi.attack(weapon, target), multi.attack(weapon, target))
+
+    def test_end_attack_generators(self):
+        # A six to hit ends the attack, so only the threes to fives go on to wound and damage
+        target = Target(toughness=4, save=7, invuln=7, fnp=7, wounds=1)
+        for modifier in [EndAttackAndGenrateMortalWoundsModifiable(6, 1), EndAttackAndGenrateMortalWoundsUnmodifiable(6, 1),
+                         EndAttackAndGenrateExtraWoundsModifiable(6, 1), EndAttackAndGenrateExtraWoundsUnmodifiable(6, 1)]:
+            weapon = Weapon(bs=3, shots=PMFCollection.static(6), strength=4, ap=0, damage=PMFCollection.static(1),
+                            modifiers=ModifierCollection(hit_mods=[modifier]))
+            results = Attack(weapon, target).run()
+            self.assertAlmostEqual(sum(results.total_damage_dist.values), 1.0)
+            self.assertAlmostEqual(results.damage_dist.mean(), 1.5)
+
+    def test_correlated_mortal_wounds(self):
+        # A six to hit is both a hit and a mortal wound, so two damage needs the six
+        weapon = Weapon(bs=2, shots=PMFCollection.static(1), strength=8, ap=0, damage=PMFCollection.static(1),
+                        modifiers=ModifierCollection(hit_mods=[GenerateMortalWoundsUnmodifiable(6, 1)]))
+        target = Target(toughness=4, save=7, invuln=7, fnp=7, wounds=2)
+        attack = Attack(weapon, target)
+        total_damage = attack.run().total_damage_dist
+        self.assertAlmostEqual(total_damage.get(2), 1 / 6 * 5 / 6)
+        self.assertAlmostEqual(total_damage.mean(), attack.final_damage_dist.mean() + attack.final_mortal_wound_dist.mean())
+        for x, y in zip(attack.damage_mortal_dist.marginal(1).values, attack.final_mortal_wound_dist.values):
+            self.assertAlmostEqual(x, y)
+
+    def test_mortal_wound_kills(self):
+        # Failed saves deal no damage, so the kills only come from the 3 mortal wounds of each six to hit:
+        # 3 once in 10/36, 6 in 1/36
+        weapon = Weapon(bs=2, shots=PMFCollection.static(2), strength=8, ap=0, damage=PMFCollection.static(0),
+                        modifiers=ModifierCollection(hit_mods=[GenerateMortalWoundsUnmodifiable(6, 3)]))
+        target = Target(toughness=4, save=7, invuln=7, fnp=7, wounds=2)
+        for wounds, expected in [(2, [25 / 36, 10 / 36, 0.0, 1 / 36]), (4, [35 / 36, 1 / 36]), (1, [25 / 36, 0.0, 0.0, 10 / 36, 0.0, 0.0, 1 / 36])]:
+            kills = Attack(weapon, target.replace(wounds=wounds)).run().kills_dist
+            self.assertEqual(len(kills), len(expected))
+            for x, y in zip(kills.values, expected):
+                self.assertAlmostEqual(x, y)
+
+    def test_keep_highest_and_lowest(self):
+        weapon = Weapon(bs=2, shots=PMFCollection.mdn(1, 6), strength=8, ap=0, damage=PMFCollection.mdn(1, 3))
+        target = Target(toughness=4, save=7, invuln=7, fnp=7, wounds=6)
+        plain = Attack(weapon, target).run().total_damage_dist.mean()
+        highest = Attack(weapon.replace(modifiers=ModifierCollection(attacks_mods=[KeepHighest(2)], damage_mods=[KeepHighest(2)])), target)
+        lowest = Attack(weapon.replace(modifiers=ModifierCollection(attacks_mods=[KeepLowest(2)], damage_mods=[KeepLowest(2)])), target)
+        two = Attack(weapon.replace(modifiers=ModifierCollection(attacks_mods=[HighestOfTwo()], damage_mods=[HighestOfTwo()])), target)
+        self.assertLess(lowest.run().total_damage_dist.mean(), plain)
+        self.assertLess(plain, highest.run().total_damage_dist.mean())
+        self.assertAlmostEqual(highest.run().total_damage_dist.mean(), two.run().total_damage_dist.mean())
+        self.assertAlmostEqual(highest.attacks_phase_results.attack_number_dist.mean(), 161 / 36)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.attrition import Attrition
+from warhammer_stats.modifiers.generator_modifiers import GenerateD3MortalWoundsUnmodifiable
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+from warhammer_stats.utils.unit import Unit
+
+
+class TestAttrition(TestCase):
+    def setUp(self):
+        self.bolter = Weapon(bs=3, shots=PMFCollection.static(2), strength=4, ap=0, damage=PMFCollection.static(1))
+        self.heavy = Weapon(bs=3, shots=PMFCollection.static(2), strength=5, ap=1, damage=PMFCollection.mdn(1, 3))
+        self.psyker = self.bolter.replace(modifiers=ModifierCollection(hit_mods=[GenerateD3MortalWoundsUnmodifiable(6, 1)]))
+        self.marine = Target(toughness=4, save=3, invuln=7, fnp=7, wounds=2)
+
+    def test_single_round_matches_kills(self):
+        # Against more models than can be killed the first round matches the kill distribution
+        attacker = Unit(self.marine, 1, [self.heavy])
+        defender = Unit(self.marine, 20)
+        results = Attrition(attacker, defender, rounds=1).run()
+        kills = Attack(self.heavy, self.marine).run().kills_dist
+        expected = [0.0] * 21
+        for i, prob in enumerate(kills.values):
+            expected[20 - i] += prob
+        for x, y in zip(results.defender_survivors_dist.values, expected):
+            self.assertAlmostEqual(x, y, 6)
+        self.assertAlmostEqual(results.attacker_survivors_dist.values[-1], 1.0)
+
+    def test_rounds(self):
+        attacker = Unit(self.marine, 5, [self.bolter])
+        defender = Unit(self.marine, 5, [self.bolter])
+        results = Attrition(attacker, defender, rounds=6).run()
+        for name, dist in results.items():
+            self.assertAlmostEqual(sum(dist.values), 1.0, 8, name)
+
+        # Firing first is an advantage and more rounds destroy the defender more often
+        self.assertGreater(results.attacker_survivors_dist.mean(), results.defender_survivors_dist.mean())
+        shorter = Attrition(attacker, defender, rounds=3).run()
+        self.assertEqual(shorter.rounds_to_destroy_dist.values[:4], results.rounds_to_destroy_dist.values[:4])
+        self.assertGreater(shorter.rounds_to_destroy_dist.values[-1], results.rounds_to_destroy_dist.values[-1])
+
+    def test_mortal_wounds(self):
+        # Mortal wounds spill over from model to model the same way as in a single attack
+        terminator = self.marine.replace(wounds=3)
+        results = Attrition(Unit(terminator, 1, [self.psyker]), Unit(terminator, 20), rounds=1).run()
+        kills = Attack(self.psyker, terminator).run().kills_dist
+        for i, prob in enumerate(kills.values):
+            self.assertAlmostEqual(results.defender_survivors_dist.values[20 - i], prob, 6)
+
+        # More mortal wounds than the defender has wounds left are counted at zero
+        results = Attrition(Unit(terminator, 5, [self.psyker]), Unit(terminator, 2), rounds=3).run()
+        for name, dist in results.items():
+            self.assertAlmostEqual(sum(dist.values), 1.0, 8, name)
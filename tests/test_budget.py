@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMF, PMFCollection, Target, Weapon
+from warhammer_stats.modifiers.generator_modifiers import GenerateMortalWoundsUnmodifiable
+from warhammer_stats.utils.budget import MemoryBudget, MemoryBudgetExceeded
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+
+
+class TestMemoryBudget(TestCase):
+    def setUp(self):
+        self.weapon = Weapon(bs=3, shots=PMFCollection.mdn(4, 6), strength=6, ap=1, damage=PMFCollection.mdn(1, 6),
+                             modifiers=ModifierCollection(hit_mods=[GenerateMortalWoundsUnmodifiable(6, 1)]))
+        self.target = Target(toughness=4, save=3, invuln=7, fnp=5, wounds=4)
+
+    def test_budget(self):
+        budget = MemoryBudget(100)
+        self.assertTrue(budget.fits(100))
+        self.assertFalse(budget.fits(101))
+        self.assertTrue(MemoryBudget().fits(10**15))
+        with self.assertRaises(MemoryError) as context:
+            budget.check('step', 101)
+        self.assertEqual(context.exception.step, 'step')
+        self.assertIn('101 bytes', str(context.exception))
+
+    def test_exact_mode_fails_fast(self):
+        attack = Attack(self.weapon, self.target, memory_budget=300_000)
+        with self.assertRaises(MemoryBudgetExceeded) as context:
+            attack.run()
+        self.assertEqual(context.exception.step, 'damage_mortal_dist')
+        self.assertGreater(context.exception.footprint, 100_000)
+        self.assertNotIn('damage_mortal_dist', vars(attack))
+
+    def test_approximate_mode_fits_the_budget(self):
+        attack = Attack(self.weapon, self.target, mode='approximate', memory_budget=300_000)
+        results = attack.run()
+        self.assertNotIn('damage_mortal_dist', vars(attack))
+        # The damage and mortal wounds are treated as independent
+        self.assertEqual(results.total_damage_dist.values, PMF.convolve_many([attack.final_damage_dist, attack.final_mortal_wound_dist]).values)
+        # and the covariance left out is counted in the error
+        self.assertGreater(attack.approximation_errors['damage_mortal_dist'], 0.0)
+        self.assertLess(attack.approximation_errors['damage_mortal_dist'], 0.05)
+        self.assertGreaterEqual(results.error, attack.approximation_errors['damage_mortal_dist'])
+
+    def test_within_budget(self):
+        unlimited = Attack(self.weapon, self.target).run()
+        budgeted = Attack(self.weapon, self.target, memory_budget=10**9).run()
+        for (_, x), (_, y) in zip(unlimited.items(), budgeted.items()):
+            self.assertEqual(x.values, y.values)
+
+    def test_feel_no_pain_streams_dice(self):
+        # A budget too small to convolve the feel no pain dice in one batch convolves them one at a time
+        weapon = self.weapon.replace(modifiers=ModifierCollection())
+        unlimited = Attack(weapon, self.target, mode='approximate').final_total_damage_dist
+        budgeted = Attack(weapon, self.target, mode='approximate', memory_budget=20_000).final_total_damage_dist
+        for x, y in zip(unlimited.values, budgeted.values):
+            self.assertAlmostEqual(x, y)
+
+        dists = [PMF.dn(6), PMF.dn(3), PMF.static(2)]
+        for x, y in zip(PMF.convolve_streaming(dists).values, PMF.convolve_many(dists).values):
+            self.assertAlmostEqual(x, y)
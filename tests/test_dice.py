@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMF, PMFCollection, Target, Weapon, dice_pmf, parse_dice
+from warhammer_stats.modifiers.value_setter_modifiers import MinimumValue
+from warhammer_stats.utils.dice import normalize
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+
+
+class TestDice(TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize('2d6 + 1'), '2D6+1')
+        self.assertEqual(normalize('3+1D3'), 'D3+3')
+        self.assertEqual(normalize('D3 + D6 + D6'), '2D6+D3')
+        self.assertEqual(normalize('D6 (min 3)'), 'D6(MIN3)')
+        self.assertEqual(normalize('D6+2-2'), 'D6')
+        self.assertEqual(normalize('4'), '4')
+        for expression in ['', 'D', '2D', 'D6D6', 'D6+', '2-D6', '2D6 (min 3']:
+            with self.assertRaises(ValueError):
+                normalize(expression)
+
+    def test_parse_dice(self):
+        self.assertEqual(parse_dice('2D6'), PMFCollection.mdn(2, 6))
+        self.assertEqual(parse_dice('3'), PMFCollection.static(3))
+        self.assertEqual(parse_dice('D3+3'), PMFCollection.mdn(1, 3).plus(3))
+        # Equivalent expressions share the same interned collection
+        self.assertIs(parse_dice('d3 + 3'), parse_dice('3+D3'))
+        self.assertIs(dice_pmf('2D6'), dice_pmf('D6+D6'))
+
+        self.assertEqual(dice_pmf('D6 (min 3)'), PMF.dn(6).min(3))
+        self.assertAlmostEqual(dice_pmf('D6-1').mean(), 2.5)
+        self.assertAlmostEqual(dice_pmf('2D6+1').mean(), 8.0)
+
+    def test_weapon_from_expressions(self):
+        target = Target(toughness=4, save=3, invuln=7, fnp=7, wounds=3)
+        by_hand = Weapon(bs=3, shots=PMFCollection.mdn(1, 6), strength=8, ap=2, damage=PMFCollection.mdn(1, 6),
+                         modifiers=ModifierCollection(damage_mods=[MinimumValue(3)]))
+        parsed = Weapon(bs=3, shots=parse_dice('D6'), strength=8, ap=2, damage=parse_dice('D6 (min 3)'))
+        for x, y in zip(Attack(by_hand, target).run().kills_dist.values, Attack(parsed, target).run().kills_dist.values):
+            self.assertAlmostEqual(x, y)
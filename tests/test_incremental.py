@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.incremental import IncrementalAttack
+from warhammer_stats.modifiers.generator_modifiers import GenerateMortalWoundsUnmodifiable
+from warhammer_stats.modifiers.reroll_modifiers import ReRollOnes
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+
+
+class TestIncremental(TestCase):
+    def setUp(self):
+        self.weapon = Weapon(bs=3, shots=PMFCollection.mdn(2, 6), strength=5, ap=1, damage=PMFCollection.mdn(1, 3),
+                             modifiers=ModifierCollection(hit_mods=[GenerateMortalWoundsUnmodifiable(6, 1)]))
+        self.target = Target(toughness=4, save=3, invuln=7, fnp=6, wounds=3)
+
+    def assertMatches(self, incremental):
+        expected = Attack(incremental.weapon, incremental.target).run()
+        for name, dist in incremental.run().items():
+            for x, y in zip(dist.values, expected.get_dist(expected.fields.index(name)).values):
+                self.assertAlmostEqual(x, y)
+
+    def test_updates_match_new_attacks(self):
+        incremental = IncrementalAttack(self.weapon, self.target)
+        incremental.run()
+        hit_phase_results = incremental.attack.hit_phase_results
+
+        recomputed = incremental.update_target(save=4)
+        self.assertIn('save_phase_results', recomputed)
+        self.assertNotIn('damage_phase_results', recomputed)
+        self.assertIs(incremental.attack.hit_phase_results, hit_phase_results)
+        self.assertMatches(incremental)
+
+        recomputed = incremental.update_target(wounds=2)
+        self.assertIn('kills_dist', recomputed)
+        self.assertNotIn('final_mortal_wound_dist', recomputed)
+        self.assertMatches(incremental)
+
+        self.assertEqual(incremental.update_weapon(name='Plasma', cost=10), set())
+
+        recomputed = incremental.update_weapon(shots=PMFCollection.mdn(1, 6))
+        self.assertNotIn('hit_die_joint', recomputed)
+        self.assertMatches(incremental)
+
+        recomputed = incremental.update_target(modifiers=ModifierCollection(hit_mods=[ReRollOnes()]))
+        self.assertIn('hit_phase_results', recomputed)
+        self.assertNotIn('attacks_phase_results', recomputed)
+        self.assertMatches(incremental)
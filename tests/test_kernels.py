@@ -0,0 +1,110 @@
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from numpy import array
+
+from warhammer_stats import PMF, PMFCollection
+from warhammer_stats.attack.phases.kill_phase import calculate_kills, calculate_kills_tree
+from warhammer_stats.modifiers.additive_modifiers import AddNToAP, AddNToVolume
+from warhammer_stats.utils import kernels
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - depends on the environment
+    numba = None
+
+
+class TestKernels(TestCase):
+    """
+    The compiled kernels (or their plain Python versions when numba isn't installed) must
+    give the same results as the original pure Python implementations
+    """
+    def both_paths(self, func):
+        with patch.object(kernels, 'JIT_ENABLED', True):
+            kernel_result = func()
+        with patch.object(kernels, 'JIT_ENABLED', False):
+            python_result = func()
+        return kernel_result, python_result
+
+    def assertPMFEqual(self, a, b):
+        self.assertEqual(len(a), len(b))
+        for x, y in zip(a.values, b.values):
+            self.assertAlmostEqual(x, y, 12)
+
+    def test_re_roll_less_than(self):
+        for value in [0, 1, 3, 3.5, 7]:
+            self.assertPMFEqual(*self.both_paths(lambda: PMF.dn(6).re_roll_less_than(value)))
+
+    def test_max_of_two(self):
+        self.assertPMFEqual(*self.both_paths(lambda: PMF.max_of_two_pmf(PMF.dn(6), PMF.dn(3))))
+        self.assertPMFEqual(*self.both_paths(lambda: PMFCollection.mdn(2, 6).convolve().max_of_two()))
+
+    def test_calculate_kills(self):
+        damages = [PMF.static(1), PMF.dn(3), PMF.dn(6).min(2), PMF([0.5, 0.25, 0.25]), PMFCollection.mdn(2, 6).convolve()]
+        mortals = [PMF.static(0), PMF([0.5, 0.0, 0.0, 0.5])]
+        for wounds in [1, 3, 8]:
+            for dice in [0, 1, 4, 9]:
+                for damage in damages:
+                    for mortal in mortals:
+                        self.assertPMFEqual(*self.both_paths(lambda: calculate_kills(wounds, dice, damage, mortal)))
+
+    def test_collect_slices(self):
+        collection = ModifierCollection()
+        slices = [
+            [0, ModifierCollection()],
+            [5, ModifierCollection(save_mods=[AddNToAP(1)])],
+            [6, ModifierCollection(damage_mods=[AddNToVolume(1)])],
+            [6, ModifierCollection(save_mods=[AddNToAP(1)])],
+        ]
+        for modifier in [-1, 0, 2]:
+            compiled, python = self.both_paths(lambda: collection.collect_slices(slices, modifier))
+            self.assertEqual(list(compiled.keys()), list(python.keys()))
+            self.assertEqual([x[1] for x in compiled.values()], [x[1] for x in python.values()])
+
+
+@skipUnless(numba, 'numba is not installed')
+class TestCompiledKernels(TestCase):
+    """
+    The numba compiled kernels must give the same results as the kernels run as plain Python
+    and as the original pure Python implementations
+    """
+    def assertArrayEqual(self, a, b):
+        self.assertEqual(len(a), len(b))
+        for x, y in zip(a, b):
+            self.assertAlmostEqual(float(x), float(y), 12)
+
+    def test_kernels_are_compiled(self):
+        for kernel in [kernels.re_roll_less_than, kernels.max_of_two, kernels.kill_dist, kernels.slice_patterns]:
+            self.assertTrue(hasattr(kernel, 'py_func'), kernel)
+
+    def test_re_roll_less_than(self):
+        for dist in [PMF.dn(6), PMFCollection.mdn(2, 3).convolve()]:
+            for value in [0, 1, 3, 3.5, 7]:
+                compiled = kernels.re_roll_less_than(array(dist.values), value)
+                self.assertArrayEqual(compiled, kernels.re_roll_less_than.py_func(array(dist.values), value))
+                with patch.object(kernels, 'JIT_ENABLED', False):
+                    self.assertArrayEqual(compiled, dist.re_roll_less_than(value).values)
+
+    def test_max_of_two(self):
+        first, second = PMF.match_sizes([PMF.dn(6), PMFCollection.mdn(2, 3).convolve()])
+        compiled = kernels.max_of_two(array(first.values), array(second.values))
+        self.assertArrayEqual(compiled, kernels.max_of_two.py_func(array(first.values), array(second.values)))
+        with patch.object(kernels, 'JIT_ENABLED', False):
+            self.assertArrayEqual(compiled, PMF.max_of_two_pmf(first, second).values)
+
+    def test_kill_dist(self):
+        mortals = PMF([0.5, 0.0, 0.0, 0.5])
+        for wounds in [1, 3, 8]:
+            for dice in [0, 1, 4, 9]:
+                for damage in [PMF.dn(3), PMF([0.5, 0.25, 0.25]), PMFCollection.mdn(2, 6).convolve()]:
+                    args = (wounds, dice, array(damage.values), array(mortals.values))
+                    compiled = kernels.kill_dist(*args)
+                    self.assertArrayEqual(compiled, kernels.kill_dist.py_func(*args))
+                    self.assertArrayEqual(compiled, calculate_kills_tree(wounds, dice, damage, mortals).values)
+
+    def test_slice_patterns(self):
+        thresholds = array([0, 5, 6, 6])
+        for modifier in [-1, 0, 2]:
+            self.assertEqual(kernels.slice_patterns(thresholds, modifier, 7).tolist(),
+                             kernels.slice_patterns.py_func(thresholds, modifier, 7).tolist())
@@ -0,0 +1,46 @@
+from itertools import product
+from unittest import TestCase
+
+from warhammer_stats import MultiAttack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.loadout import KILL_CHANCE, POINTS, optimize_loadout
+
+
+class TestLoadout(TestCase):
+    def setUp(self):
+        self.weapons = [
+            Weapon(bs=3, shots=PMFCollection.static(2), strength=4, ap=0, damage=PMFCollection.static(1), name='bolter', cost=3),
+            Weapon(bs=3, shots=PMFCollection.static(1), strength=9, ap=3, damage=PMFCollection.mdn(1, 6), name='lascannon', cost=15),
+            Weapon(bs=3, shots=PMFCollection.static(2), strength=7, ap=2, damage=PMFCollection.static(2), name='plasma', cost=10),
+        ]
+        self.marines = Target(toughness=4, save=3, invuln=7, fnp=7, wounds=2, cost=18)
+        self.terminator = Target(toughness=5, save=2, invuln=4, fnp=7, wounds=3, cost=40)
+
+    def brute_force(self, budget, value):
+        best = 0.0
+        for counts in product(*[range(int(budget // weapon.cost) + 1) for weapon in self.weapons]):
+            if sum(n * weapon.cost for n, weapon in zip(counts, self.weapons)) <= budget and any(counts):
+                best = max(best, value(sum([[weapon] * n for n, weapon in zip(counts, self.weapons)], [])))
+        return best
+
+    def test_expected_kills(self):
+        loadout, value = optimize_loadout(self.weapons, 40, self.marines)
+        self.assertLessEqual(sum(weapon.cost for weapon in loadout), 40)
+        self.assertAlmostEqual(value, MultiAttack(loadout, self.marines).run().kills_dist.mean())
+        self.assertAlmostEqual(value, self.brute_force(40, lambda ws: MultiAttack(ws, self.marines).run().kills_dist.mean()))
+
+        # Weighted targets count the points killed of each
+        _, value = optimize_loadout(self.weapons, 30, [(self.marines, 1.0), (self.terminator, 0.5)], objective=POINTS)
+        self.assertAlmostEqual(value, self.brute_force(30, lambda ws: (
+            18 * MultiAttack(ws, self.marines).run().kills_dist.mean() + 20 * MultiAttack(ws, self.terminator).run().kills_dist.mean()
+        )))
+
+    def test_kill_chance(self):
+        loadout, value = optimize_loadout(self.weapons, 35, self.terminator, objective=KILL_CHANCE, models=2)
+        self.assertAlmostEqual(value, 1 - sum(MultiAttack(loadout, self.terminator).run().kills_dist.values[:2]))
+        self.assertAlmostEqual(value, self.brute_force(35, lambda ws: 1 - sum(MultiAttack(ws, self.terminator).run().kills_dist.values[:2])))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            optimize_loadout(self.weapons + [Weapon(bs=3, shots=PMFCollection.static(1), strength=4, ap=0, damage=PMFCollection.static(1))], 10, self.marines)
+        with self.assertRaises(ValueError):
+            optimize_loadout(self.weapons, 10, self.marines, objective='wounds')
@@ -1,6 +1,9 @@
+from itertools import product
 from unittest import TestCase
 
-from warhammer_stats.utils.pmf import PMF
+from warhammer_stats.attack.results import descendants_dist
+from warhammer_stats.utils.joint_pmf import JointPMF
+from warhammer_stats.utils.pmf import ORDER_STATISTIC_CACHE_SIZE, PMF, order_statistic
 
 class TestAttack(TestCase):
     def setUp(self):
@@ -60,10 +63,77 @@ class TestAttack(TestCase):
 
     def test_convolution_pmfs(self):
         """
-        test that pmfs from convolution have list type values
+        test that pmfs from convolution have tuple type values
         """
         self.assertTrue(
-            isinstance(PMF.convolve_many(self.pmf_examples).values, list)
+            isinstance(PMF.convolve_many(self.pmf_examples).values, tuple)
         )
 
 
+
+    def test_value_semantics(self):
+        """
+        test that pmfs are immutable, compare by value and that common dice are interned
+        """
+        self.assertIs(PMF.dn(6), PMF.dn(6))
+        self.assertIs(PMF.static(3), PMF.static(3))
+        self.assertEqual(PMF([0.0, 0.5, 0.5]), PMF.dn(2))
+        self.assertEqual(hash(PMF([0.0, 0.5, 0.5])), hash(PMF.dn(2)))
+        self.assertNotEqual(PMF.dn(3), PMF.dn(2))
+        with self.assertRaises(AttributeError):
+            PMF.dn(6).values = [1.0]
+        with self.assertRaises(TypeError):
+            PMF.dn(6).values[0] = 0.5
+        self.assertEqual(PMF.dn(6).expand_to(8).add_value(1).roll(-1).min(2), PMF([0.0, 0.0, 1 / 3] + [1 / 6] * 4 + [0.0]))
+
+    def test_joint_pmf(self):
+        """
+        test that joint pmfs of independent outcomes agree with the pmfs of each outcome
+        """
+        first, second = PMF.dn(6), PMF.dn(3)
+        joint = JointPMF.independent(first, second)
+        self.assertEqual(joint.marginal(0), first)
+        for x, y in zip(joint.total().values, PMF.convolve_many([first, second]).values):
+            self.assertAlmostEqual(x, y)
+
+        doubled = JointPMF.convolve_many([joint, joint])
+        self.assertEqual(doubled.shape, (13, 7))
+        for x, y in zip(doubled.marginal(1).values, PMF.convolve_many([second, second]).values):
+            self.assertAlmostEqual(x, y)
+
+        # Compounding by a count distribution is a weighted sum of convolutions
+        compounded = joint.compound(PMF.dn(2))
+        expected = JointPMF.flatten([joint * 0.5, doubled * 0.5])
+        for row, expected_row in zip(compounded.values, expected.values):
+            for x, y in zip(row, expected_row):
+                self.assertAlmostEqual(x, y)
+
+    def test_joint_progeny(self):
+        """
+        test that the rolls counted by a joint progeny match the number of descendants, even
+        when the rolls almost never or never die out
+        """
+        for probs in [[0.5, 0.3, 0.2], [0.05, 0.95], [0.2, 0.3, 0.5]]:
+            joint = JointPMF.progeny({extra: JointPMF.static(1, 0) * prob for extra, prob in enumerate(probs)})
+            rolls = descendants_dist(PMF(probs)).add_value(1)
+            self.assertAlmostEqual(sum(joint.marginal(0).values), 1.0)
+            for x, y in zip(joint.marginal(0).values, rolls.values):
+                self.assertAlmostEqual(x, y)
+
+    def test_order_statistic(self):
+        """
+        test the k-th highest of n rolls against counting every combination of rolls
+        """
+        for count in range(1, 4):
+            for rank in range(1, count + 1):
+                rolls = list(product(range(1, 7), repeat=count))
+                kept = PMF.dn(6).order_statistic(count, rank)
+                for value in range(1, 7):
+                    expected = sum(sorted(roll)[-rank] == value for roll in rolls) / len(rolls)
+                    self.assertAlmostEqual(kept.get(value), expected)
+        self.assertEqual(PMF.dn(6).max_of_two().rounded(), PMF.max_of_two_pmf(PMF.dn(6), PMF.dn(6)).rounded())
+        with self.assertRaises(ValueError):
+            PMF.dn(6).order_statistic(2, 3)
+        # Equal PMFs share a bounded cache rather than each instance keeping its own
+        self.assertIs(PMF([0.0, 0.5, 0.5]).order_statistic(3), PMF.dn(2).order_statistic(3))
+        self.assertEqual(order_statistic.cache_info().maxsize, ORDER_STATISTIC_CACHE_SIZE)
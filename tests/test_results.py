@@ -0,0 +1,98 @@
+from unittest import TestCase
+
+from warhammer_stats.attack.results import HitPhaseResults, SavePhaseResults, descendants_dist
+from warhammer_stats.utils.pmf import PMF, PMFCollection
+from warhammer_stats.utils.progeny import MAX_DESCENDANTS
+
+
+class TestResults(TestCase):
+    def setUp(self):
+        self.results = HitPhaseResults(
+            successful_hit_dist=PMF.dn(6).convert_binomial(4),
+            extra_hit_roll_dist=PMF.dn(6).convert_binomial(6),
+            extra_automatic_wound_dist=PMF.static(0),
+            extra_automatic_hit_dist=PMF.dn(3),
+            mortal_wound_dist=PMF.dn(6),
+            self_wound_dist=PMF.static(0),
+        )
+
+    def assertPMFEqual(self, a, b):
+        self.assertEqual(len(a), len(b))
+        for x, y in zip(a.values, b.values):
+            self.assertAlmostEqual(x, y, 10)
+
+    def test_multiply_by(self):
+        """
+        Batched compounding matches compounding each field on its own
+        """
+        count_dist = PMF.dn(6)
+        multiplied = self.results.multiply_by(count_dist)
+        for name, dist in self.results.items():
+            expected = PMF.flatten([PMF.convolve_many([dist] * n) * p for n, p in enumerate(count_dist.values)])
+            self.assertPMFEqual(getattr(multiplied, name), expected)
+
+    def test_combine(self):
+        """
+        Combining results convolves each field
+        """
+        combined = SavePhaseResults.combine([SavePhaseResults(PMF.dn(3))] * 3)
+        self.assertPMFEqual(combined.failed_armour_save_dist, PMF.convolve_many([PMF.dn(3)] * 3))
+
+    def test_set_field(self):
+        self.results.successful_hit_dist = PMF.static(8)
+        self.assertPMFEqual(self.results.successful_hit_dist, PMF.static(8))
+        self.assertPMFEqual(self.results.mortal_wound_dist, PMF.dn(6))
+
+    def test_descendants_dist(self):
+        """
+        The total number of extra rolls matches the branching process mean m / (1 - m)
+        """
+        for offspring in [PMF.dn(6).convert_binomial(6), PMF([0.5, 0.3, 0.2]), PMF.static(0)]:
+            mean = offspring.mean()
+            descendants = descendants_dist(offspring)
+            self.assertAlmostEqual(sum(descendants.values), 1.0, 6)
+            self.assertAlmostEqual(descendants.mean(), mean / (1 - mean), 5)
+
+    def test_descendants_dist_near_critical(self):
+        """
+        Extra rolls that almost always generate another are resolved until they die out
+        """
+        descendants = descendants_dist(PMF([0.05, 0.95]))
+        self.assertAlmostEqual(sum(descendants.values), 1.0)
+        self.assertAlmostEqual(descendants.mean(), 19.0, 3)
+
+    def test_descendants_dist_never_dies_out(self):
+        """
+        When the rolls generate more than one extra roll on average, the chance that they never
+        die out is counted at the cap rather than lost
+        """
+        for offspring in [PMF([0.2, 0.3, 0.5]), PMF([0.5, 0.0, 0.5])]:
+            descendants = descendants_dist(offspring)
+            self.assertAlmostEqual(sum(descendants.values), 1.0)
+            self.assertEqual(len(descendants), MAX_DESCENDANTS + 1)
+            self.assertAlmostEqual(descendants.get(0), offspring.get(0))
+        # A roll only has finitely many descendants with the extinction probability, 0.4
+        self.assertAlmostEqual(descendants_dist(PMF([0.2, 0.3, 0.5])).values[-1], 0.6, 6)
+
+    def test_with_recursive(self):
+        """
+        Each extra hit roll can generate mortal wounds, to any depth
+        """
+        results = self.results.with_recursive()
+        rolls = 1 / (1 - self.results.extra_hit_roll_dist.mean())
+        self.assertAlmostEqual(results.mortal_wound_dist.mean(), self.results.mortal_wound_dist.mean() * rolls, 6)
+        self.assertAlmostEqual(results.successful_hit_dist.mean(), self.results.successful_hit_dist.mean())
+
+    def test_approximate_by(self):
+        """
+        The approximation keeps the mean and variance of the exact compound distribution
+        """
+        count_dist = PMFCollection.mdn(60, 6).convolve()
+        exact = self.results.multiply_by(count_dist)
+        approximate, error = self.results.approximate_by(count_dist)
+        self.assertGreater(error, 0.0)
+        for name, dist in exact.items():
+            approximated = getattr(approximate, name)
+            self.assertAlmostEqual(sum(approximated.values), 1.0, 4)
+            self.assertAlmostEqual(approximated.mean(), dist.mean(), 1)
+            self.assertAlmostEqual(approximated.std(), dist.std(), delta=0.05 * dist.std())
@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.dependencies import STEPS
+from warhammer_stats.attack.schedule import GRAPH, Scheduler, needed
+from warhammer_stats.modifiers.generator_modifiers import GenerateMortalWoundsUnmodifiable
+from warhammer_stats.modifiers.reroll_modifiers import ReRollOnes
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+
+
+class TestSchedule(TestCase):
+    def setUp(self):
+        self.weapon = Weapon(bs=3, shots=PMFCollection.mdn(2, 6), strength=5, ap=1, damage=PMFCollection.mdn(1, 3),
+                             modifiers=ModifierCollection(hit_mods=[GenerateMortalWoundsUnmodifiable(6, 1), ReRollOnes()]))
+        self.target = Target(toughness=4, save=3, invuln=7, fnp=6, wounds=3)
+
+    def test_graph(self):
+        self.assertEqual(set(GRAPH), set(STEPS))
+        for step, dependencies in GRAPH.items():
+            for dependency in dependencies:
+                # A step depends on every field the steps it uses depend on
+                self.assertLessEqual(STEPS[dependency], STEPS[step])
+
+        order = needed(['kills_dist'])
+        self.assertEqual(order[-1], 'kills_dist')
+        self.assertLess(order.index('failed_saves_results'), order.index('kill_failed_saves_dist'))
+        self.assertNotIn('final_self_wound_dist', order)
+        with self.assertRaises(ValueError):
+            needed(['unknown'])
+
+    def test_only_needed_steps_run(self):
+        attack = Attack(self.weapon, self.target)
+        Scheduler(attack).evaluate(['total_successful_hits_dist'])
+        self.assertIn('hit_phase_results', vars(attack))
+        self.assertNotIn('wound_phase_results', vars(attack))
+
+    def test_parallel_matches_sequential(self):
+        sequential = Attack(self.weapon, self.target).run()
+        parallel = Attack(self.weapon, self.target).run(workers=4)
+        for (_, x), (_, y) in zip(sequential.items(), parallel.items()):
+            self.assertEqual(x.values, y.values)
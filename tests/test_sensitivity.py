@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.dependencies import invalidated, perturbed_fields
+from warhammer_stats.attack.sensitivity import Sensitivity, sensitivity
+from warhammer_stats.modifiers.additive_modifiers import AddND3, AddNToAP, AddNToSave, AddNToThreshold, AddNToVolume
+from warhammer_stats.modifiers.generator_modifiers import GenerateMortalWoundsUnmodifiable
+from warhammer_stats.modifiers.reroll_modifiers import ReRollOnes
+from warhammer_stats.modifiers.splitter_modifiers import OnAModifiableRollOfNAddAP
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+
+
+class TestSensitivity(TestCase):
+    def setUp(self):
+        self.weapon = Weapon(bs=3, shots=PMFCollection.mdn(1, 6), strength=5, ap=1, damage=PMFCollection.mdn(1, 3),
+                             modifiers=ModifierCollection(hit_mods=[GenerateMortalWoundsUnmodifiable(6, 1)]))
+        self.target = Target(toughness=4, save=3, invuln=7, fnp=6, wounds=3)
+        self.perturbations = [
+            ModifierCollection(attacks_mods=[AddNToVolume(1)]),
+            ModifierCollection(hit_mods=[AddNToThreshold(1)]),
+            ModifierCollection(hit_mods=[ReRollOnes()]),
+            ModifierCollection(wound_mods=[OnAModifiableRollOfNAddAP(6, 2)]),
+            ModifierCollection(save_mods=[AddNToAP(1)]),
+            ModifierCollection(fnp_mods=[AddNToSave(1)]),
+            ModifierCollection(damage_mods=[AddND3(1)]),
+        ]
+
+    def test_matches_separate_attacks(self):
+        base = Attack(self.weapon, self.target)
+        deltas = sensitivity(self.weapon, self.target, self.perturbations)
+        for perturbation, (damage, kills) in zip(self.perturbations, deltas):
+            attack = Attack(self.weapon.replace(modifiers=self.weapon.modifiers + perturbation), self.target)
+            self.assertAlmostEqual(damage, attack.final_total_damage_dist.mean() - base.final_total_damage_dist.mean())
+            self.assertAlmostEqual(kills, attack.kills_dist.mean() - base.kills_dist.mean())
+        self.assertGreater(deltas[1][0], 0)
+
+    def test_reuses_unchanged_steps(self):
+        analysis = Sensitivity(self.weapon, self.target, self.perturbations)
+        analysis.deltas()
+        variant = analysis.variant(ModifierCollection(save_mods=[AddNToAP(1)]))
+        self.assertIs(variant.hit_die_joint, analysis.base.hit_die_joint)
+        self.assertIs(variant.memo, analysis.base.memo)
+        self.assertIsNot(variant.kill_failed_saves_dist, analysis.base.kill_failed_saves_dist)
+
+        steps = invalidated(perturbed_fields(ModifierCollection(damage_mods=[AddND3(1)])))
+        self.assertIn('failed_save_damage_dist', steps)
+        self.assertNotIn('final_mortal_wound_dist', steps)
+        self.assertNotIn('attacks_phase_results', invalidated(perturbed_fields(ModifierCollection(hit_mods=[ReRollOnes()]))))
@@ -0,0 +1,116 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from warhammer_stats import Attack, PMF, PMFCollection, Target, Weapon
+from warhammer_stats.attack.atlas import Atlas, use_atlas
+from warhammer_stats.attack.phases.kill_table import KillTable, use_kill_table
+from warhammer_stats.modifiers.reroll_modifiers import ReRollOnes
+from warhammer_stats.tables import atlas_axes, atlas_results, kill_table_rows, memo_tables
+from warhammer_stats.utils.modifier_collection import ModifierCollection
+from warhammer_stats.utils.memo import DiceMemo
+from warhammer_stats.utils import snapshot
+from warhammer_stats.utils.snapshot import Snapshot, use_snapshot
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'snapshot.npy')
+
+    def tearDown(self):
+        use_snapshot(None)
+        use_kill_table(None)
+        use_atlas(None)
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        Snapshot.build([
+            ('dice', (6,), PMF.dn(6)),
+            ('dice', (3,), PMF.dn(3)),
+        ]).save(self.path)
+        loaded = Snapshot.load(self.path)
+
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.get('dice', 3), PMF.dn(3))
+        self.assertEqual(loaded.get('dice', 6), PMF.dn(6))
+        self.assertIsNone(loaded.get('dice', 4))
+
+    def test_memo_uses_snapshot(self):
+        use_snapshot(Snapshot.build([('memo', ('hit', 'dist', (), 4, 4), PMF.static(3))]))
+        memo = DiceMemo()
+        self.assertEqual(memo.get(('hit', 'dist', (), 4, 4), lambda: PMF.static(1)), PMF.static(3))
+        self.assertEqual(memo.get(('hit', 'dist', (), 3, 3), lambda: PMF.static(1)), PMF.static(1))
+
+        # Each key is only serialized the first time it is looked up, even by another memo
+        with patch.object(snapshot, 'table_key', wraps=snapshot.table_key) as table_key:
+            for _ in range(3):
+                DiceMemo().get(('hit', 'dist', (ReRollOnes(),), 3, 3), lambda: PMF.static(1))
+            self.assertEqual(table_key.call_count, 1)
+
+        # Only the most recent lookups are kept
+        with patch.object(snapshot, 'LOOKUP_CACHE_SIZE', 2):
+            small = Snapshot.build([('dice', (6,), PMF.dn(6))])
+        with patch.object(snapshot, 'table_key', wraps=snapshot.table_key) as table_key:
+            for sides in [6, 3, 4, 6]:
+                small.get('dice', sides)
+            self.assertEqual(table_key.call_count, 4)
+            small.get('dice', 6)
+            self.assertEqual(table_key.call_count, 4)
+
+    def test_results_match(self):
+        weapon = Weapon(bs=3, shots=PMFCollection.mdn(2, 6), strength=5, ap=1, damage=PMFCollection.mdn(1, 6))
+        target = Target(toughness=4, save=3, invuln=5, fnp=5, wounds=3)
+        expected = Attack(weapon, target).run()
+
+        Snapshot.build(memo_tables()).save(self.path)
+        use_snapshot(Snapshot.load(self.path))
+        results = Attack(weapon, target).run()
+        for name, dist in expected.items():
+            for x, y in zip(getattr(results, name).values, dist.values):
+                self.assertAlmostEqual(x, y, 8)
+
+    def test_kill_table(self):
+        weapon = Weapon(bs=3, shots=PMFCollection.static(6), strength=5, ap=1, damage=PMFCollection.mdn(1, 3))
+        target = Target(toughness=4, save=3, invuln=7, fnp=6, wounds=3)
+        expected = Attack(weapon, target).run().kills_dist
+
+        KillTable.build(kill_table_rows(wounds=[3], damages=[weapon.damage], fnps=[6], dice=4)).save(self.path)
+        table = KillTable.load(self.path)
+        use_kill_table(table)
+        attack = Attack(weapon, target)
+        self.assertIsNotNone(table.row(3, attack.apply_feel_no_pain(attack.damage_phase_results.damage_dist), PMF.zero()))
+        self.assertIsNone(table.get(0, 5))
+
+        # Dice counts beyond the table fall back to computing the kills
+        for x, y in zip(attack.run().kills_dist.values, expected.values):
+            self.assertAlmostEqual(x, y, 8)
+
+        # Rows can hold kills for different numbers of dice
+        table = KillTable.build([(1, PMF.static(1), PMF.zero(), [PMF.static(0), PMF.static(1), PMF.static(2)]),
+                                 (2, PMF.static(1), PMF.zero(), [PMF.static(0)])])
+        self.assertEqual(table.get(0, 2), PMF.static(2))
+        self.assertEqual(table.get(1, 0), PMF.static(0))
+        self.assertIsNone(table.get(1, 1))
+
+    def test_atlas(self):
+        axes = {**atlas_axes(), 'shots': [PMFCollection.static(3)], 'damage': [PMFCollection.mdn(1, 3)], 'wounds': [2]}
+        Atlas.build(axes, lambda jobs: atlas_results(jobs, processes=1)).save(self.path)
+        use_atlas(Atlas.load(self.path))
+
+        # Strength 5 against toughness 4 with AP 1 against a 4+ save and 5++ is on the grid
+        weapon = Weapon(bs=3, shots=PMFCollection.static(3), strength=5, ap=1, damage=PMFCollection.mdn(1, 3))
+        target = Target(toughness=4, save=4, invuln=5, fnp=6, wounds=2)
+        looked_up = Attack(weapon, target).run()
+        use_atlas(None)
+        expected = Attack(weapon, target).run()
+        for name, dist in expected.items():
+            for x, y in zip(getattr(looked_up, name).values, dist.values):
+                self.assertAlmostEqual(x, y, 10)
+
+        # Modified attacks and attacks off the grid are not in the atlas
+        atlas = Atlas.load(self.path)
+        self.assertIsNotNone(atlas.lookup(weapon, target))
+        self.assertIsNone(atlas.lookup(weapon.replace(modifiers=ModifierCollection(hit_mods=[ReRollOnes()])), target))
+        self.assertIsNone(atlas.lookup(weapon, target.replace(wounds=3)))
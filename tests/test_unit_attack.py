@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.unit_attack import UnitAttack
+from warhammer_stats.utils.unit import UnitTarget
+
+
+class TestUnitAttack(TestCase):
+    def setUp(self):
+        self.weapon = Weapon(bs=3, shots=PMFCollection.static(6), strength=5, ap=1, damage=PMFCollection.mdn(1, 3))
+        self.marine = Target(toughness=4, save=3, invuln=7, fnp=7, wounds=2)
+        self.captain = Target(toughness=4, save=2, invuln=4, fnp=5, wounds=5)
+
+    def test_identical_models(self):
+        # With enough models a unit of one profile matches the kills of the attack
+        unit = UnitAttack(self.weapon, UnitTarget([(self.marine, 20)]))
+        expected = Attack(self.weapon, self.marine).run().kills_dist
+        for x, y in zip(unit.kills_dist.values, expected.values):
+            self.assertAlmostEqual(x, y, 4)
+        self.assertAlmostEqual(sum(unit.remaining_wounds_dist.values), 1.0)
+
+    def test_allocation_order(self):
+        guarded = UnitAttack(self.weapon, UnitTarget([(self.marine, 2), (self.captain, 1)]))
+        exposed = UnitAttack(self.weapon, UnitTarget([(self.captain, 1), (self.marine, 2)]))
+        for attack in [guarded, exposed]:
+            self.assertEqual(len(attack.profile_kill_dists), 2)
+            self.assertAlmostEqual(sum(attack.kills_dist.values), 1.0)
+            self.assertAlmostEqual(
+                attack.kills_dist.mean(), sum(dist.mean() for dist in attack.profile_kill_dists)
+            )
+
+        # The captain only dies behind its bodyguard once they are both dead
+        self.assertLess(guarded.profile_kill_dists[1].mean(), exposed.profile_kill_dists[0].mean())
+        self.assertGreater(guarded.profile_kill_dists[0].mean(), exposed.profile_kill_dists[1].mean())
+        self.assertLessEqual(guarded.profile_kill_dists[1].values[1], guarded.profile_kill_dists[0].values[2])
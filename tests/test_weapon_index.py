@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from warhammer_stats import Attack, PMFCollection, Target, Weapon
+from warhammer_stats.attack.weapon_index import WeaponIndex
+
+
+class TestWeaponIndex(TestCase):
+    def setUp(self):
+        self.bolter = Weapon(bs=3, shots=PMFCollection.static(2), strength=4, ap=0, damage=PMFCollection.static(1), name='bolter', cost=2)
+        self.lascannon = Weapon(bs=3, shots=PMFCollection.static(1), strength=9, ap=3, damage=PMFCollection.mdn(1, 6), name='lascannon', cost=20)
+        self.plasma = Weapon(bs=3, shots=PMFCollection.static(2), strength=7, ap=2, damage=PMFCollection.static(1), name='plasma')
+        self.marine = Target(toughness=4, save=3, invuln=7, fnp=7, wounds=2)
+        self.tank = Target(toughness=8, save=3, invuln=7, fnp=7, wounds=12)
+
+    def test_rankings(self):
+        index = WeaponIndex([self.bolter, self.lascannon], [self.marine])
+        index.add_weapon(self.plasma)
+
+        ranked = index.top(self.marine, 'kills')
+        self.assertEqual([weapon for weapon, _ in ranked], sorted(
+            [self.bolter, self.lascannon, self.plasma], key=lambda w: -Attack(w, self.marine).run().kills_dist.mean()
+        ))
+        self.assertAlmostEqual(ranked[0][1], Attack(ranked[0][0], self.marine).run().kills_dist.mean())
+
+        # New targets are ranked on first query and weapons without a cost aren't ranked per point
+        self.assertEqual(index.top(self.tank, 'damage', k=1)[0][0], self.lascannon)
+        self.assertEqual([weapon for weapon, _ in index.top(self.tank, 'damage_per_point')], [self.lascannon, self.bolter])
+
+        index.remove_weapon(self.lascannon)
+        self.assertNotIn(self.lascannon, [weapon for weapon, _ in index.top(self.tank, 'damage')])
+        with self.assertRaises(ValueError):
+            index.top(self.marine, 'points')
+
+    def test_ties_after_removal(self):
+        # Weapons with equal scores stay in the order they were added, even after a removal
+        a, b, c, d = (self.bolter.replace(name=name) for name in 'abcd')
+        index = WeaponIndex([a, b, c], [self.marine])
+        index.remove_weapon(a)
+        index.add_weapon(d)
+        self.assertEqual([weapon for weapon, _ in index.top(self.marine, 'damage')], [b, c, d])
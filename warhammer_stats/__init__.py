@@ -10,5 +10,8 @@ from .attack.attack import Attack  # noqa: F401
 from .attack.multi_attack import MultiAttack  # noqa: F401
 from .utils.target import Target  # noqa: F401
 from .utils.weapon import Weapon  # noqa: F401
+from .utils.unit import Unit, UnitTarget  # noqa: F401
 from .utils.pmf import PMF, PMFCollection  # noqa: F401
+from .utils.joint_pmf import JointPMF  # noqa: F401
+from .utils.dice import dice_pmf, parse_dice  # noqa: F401
 from .utils.modifier_collection import ModifierCollection  # noqa: F401
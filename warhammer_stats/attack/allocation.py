@@ -0,0 +1,208 @@
+"""
+Allocate the fire of an army's units across several target units.
+
+Each target is a profile and a number of models, so the kills against it are capped at its
+models and the value of an allocation isn't simply the sum over the attackers. The search
+assigns the attackers greedily by their gain and then improves the assignment by moving
+and swapping attackers between targets until neither helps.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from numpy import arange, array, ndarray
+
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+from .loadout import capped_sum
+from .results import AttackResults
+
+# The objectives an allocation can be optimized for
+POINTS = 'points'
+DESTROYED = 'destroyed'
+OBJECTIVES = (POINTS, DESTROYED)
+
+
+def gain(old: tuple[float, float], new: tuple[float, float]) -> tuple[float, float]:
+    """
+    How much a score improves, with differences small enough to be rounding error counted as none
+    """
+    return tuple(0.0 if abs(n - o) < 1e-12 else n - o for o, n in zip(old, new))  # type: ignore[return-value]
+
+
+class FireAllocation:
+    """
+    Finds the assignment of attacking units to target units that maximizes an objective
+
+    Args:
+        attackers (list[list[Weapon]]): The weapons of each attacking unit
+        targets (list[tuple[Target, int]]): The profile and number of models of each target unit
+        objective (str): The expected points of the models killed, or the expected points of
+            the target units destroyed outright. Targets without a cost count one point per model
+        split (bool): Assign each weapon separately rather than each unit as a whole
+    """
+    def __init__(self, attackers: list[list[Weapon]], targets: list[tuple[Target, int]],
+                 objective: str = POINTS, split: bool = False) -> None:
+        if objective not in OBJECTIVES:
+            raise ValueError(f'unknown objective {objective}, expected one of {", ".join(OBJECTIVES)}')
+        self.units = attackers
+        self.split = split
+        self.attackers = [[weapon] for unit in attackers for weapon in unit] if split else attackers
+        self.targets = targets
+        self.objective = objective
+        self._results: dict[tuple[Weapon, Target], AttackResults] = {}
+        self.kills = [[self.unit_kills(unit, index) for index in range(len(targets))] for unit in self.attackers]
+
+    def results(self, weapon: Weapon, target: Target) -> AttackResults:
+        """
+        The results of the weapon against the target, each pair is only attacked once
+        """
+        if (weapon, target) not in self._results:
+            self._results[weapon, target] = Attack(weapon, target).run()
+        return self._results[weapon, target]
+
+    def unit_kills(self, unit: list[Weapon], index: int) -> ndarray:
+        """
+        The kills of a unit against a target, capped at the models in the target
+        """
+        target, models = self.targets[index]
+        kills = self.nothing(index)
+        for weapon in unit:
+            dist = self.results(weapon, target).kills_dist.ceiling(models).expand_to(models + 1)
+            kills = capped_sum(kills, array(dist.values), models)
+        return kills
+
+    def nothing(self, index: int) -> ndarray:
+        return array([1.0] + [0.0] * self.targets[index][1])
+
+    def value(self, index: int, kills: ndarray, objective: Optional[str] = None) -> float:
+        """
+        The value of the capped kills against a target
+        """
+        target, models = self.targets[index]
+        if (objective or self.objective) == DESTROYED:
+            return (target.cost or 1.0) * models * float(kills[-1])
+        return (target.cost or 1.0) * float(kills.dot(arange(models + 1)))
+
+    def score(self, index: int, kills: ndarray) -> tuple[float, float]:
+        """
+        The value of the capped kills against a target, and the expected points killed to break
+        ties. Units are rarely destroyed by a single attacker, so without it most assignments
+        would look as good as each other when optimizing for destroying them
+        """
+        return self.value(index, kills), self.value(index, kills, POINTS)
+
+    def target_kills(self, assignment: list[int], index: int) -> ndarray:
+        kills = self.nothing(index)
+        for unit, assigned in enumerate(assignment):
+            if assigned == index:
+                kills = capped_sum(kills, self.kills[unit][index], self.targets[index][1])
+        return kills
+
+    def total(self, assignment: list[int]) -> float:
+        """
+        The value of an assignment of each attacker to the index of a target
+        """
+        return sum(self.value(index, self.target_kills(assignment, index)) for index in range(len(self.targets)))
+
+    def greedy(self) -> list[int]:
+        """
+        Repeatedly assign the attacker with the largest gain to its best target
+        """
+        assignment: list[Optional[int]] = [None] * len(self.attackers)
+        kills = [self.nothing(index) for index in range(len(self.targets))]
+        for _ in self.attackers:
+            gains = [
+                (gain(self.score(index, kills[index]), self.score(index, capped_sum(kills[index], self.kills[unit][index], models))), unit, index)
+                for unit, assigned in enumerate(assignment) if assigned is None
+                for index, (_, models) in enumerate(self.targets)
+            ]
+            _, unit, index = max(gains, key=lambda option: option[0])
+            assignment[unit] = index
+            kills[index] = capped_sum(kills[index], self.kills[unit][index], self.targets[index][1])
+        return assignment  # type: ignore[return-value]
+
+    def without(self, assignment: list[int], index: int) -> dict[Optional[int], ndarray]:
+        """
+        The kills against a target from all of its attackers (keyed by None) and from all but
+        each one of them, from the prefix and suffix sums of their kills
+        """
+        models = self.targets[index][1]
+        members = [unit for unit, assigned in enumerate(assignment) if assigned == index]
+        prefixes = [self.nothing(index)]
+        suffixes = [self.nothing(index)]
+        for unit, other in zip(members, reversed(members)):
+            prefixes.append(capped_sum(prefixes[-1], self.kills[unit][index], models))
+            suffixes.append(capped_sum(suffixes[-1], self.kills[other][index], models))
+        kills: dict[Optional[int], ndarray] = {None: prefixes[-1]}
+        for i, unit in enumerate(members):
+            kills[unit] = capped_sum(prefixes[i], suffixes[len(members) - i - 1], models)
+        return kills
+
+    def changes(self, assignment: list[int], unit: int, kills: list[dict[Optional[int], ndarray]]):
+        """
+        Every change that moves the attacker or swaps it with another attacker, as the new
+        assignment and the new kills against the two targets it affects
+        """
+        assigned = assignment[unit]
+        for index, (_, models) in enumerate(self.targets):
+            if index != assigned:
+                yield assignment[:unit] + [index] + assignment[unit + 1:], {
+                    assigned: kills[assigned][unit],
+                    index: capped_sum(kills[index][None], self.kills[unit][index], models),
+                }
+        for other, index in enumerate(assignment):
+            if index != assigned:
+                swapped = list(assignment)
+                swapped[unit], swapped[other] = index, assigned
+                yield swapped, {
+                    assigned: capped_sum(kills[assigned][unit], self.kills[other][assigned], self.targets[assigned][1]),
+                    index: capped_sum(kills[index][other], self.kills[unit][index], self.targets[index][1]),
+                }
+
+    def improve(self, assignment: list[int]) -> list[int]:
+        """
+        Move and swap attackers between targets until neither helps
+        """
+        kills = [self.without(assignment, index) for index in range(len(self.targets))]
+        scores = [self.score(index, kills[index][None]) for index in range(len(self.targets))]
+        improved = True
+        while improved:
+            improved = False
+            for unit in range(len(assignment)):
+                for changed_assignment, changed in self.changes(assignment, unit, kills):
+                    new_scores = {index: self.score(index, dist) for index, dist in changed.items()}
+                    old = tuple(map(sum, zip(*[scores[index] for index in changed])))
+                    new = tuple(map(sum, zip(*new_scores.values())))
+                    if gain(old, new) > (0.0, 0.0):
+                        assignment, improved = changed_assignment, True
+                        for index, score in new_scores.items():
+                            scores[index], kills[index] = score, self.without(assignment, index)
+                        break
+        return assignment
+
+    def optimize(self) -> tuple[list[int], float]:
+        """
+        The index of the target each attacker is assigned to and the value of the assignment
+        """
+        if not self.attackers or not self.targets:
+            return [], 0.0
+        starts = [self.greedy()]
+        if self.split:
+            # Also start from the best assignment of whole units so splitting them never does worse
+            whole, _ = FireAllocation(self.units, self.targets, self.objective).optimize()
+            starts.append([index for unit, index in zip(self.units, whole) for _ in unit])
+        options = [self.improve(start) for start in starts]
+        values = [self.total(option) for option in options]
+        return options[values.index(max(values))], max(values)
+
+
+def allocate_fire(attackers: list[list[Weapon]], targets: list[tuple[Target, int]],
+                  objective: str = POINTS, split: bool = False) -> tuple[list[int], float]:
+    """
+    The index of the target each attacking unit (or weapon, when split) should shoot at to
+    maximize the objective, and the value it achieves
+    """
+    return FireAllocation(attackers, targets, objective, split).optimize()
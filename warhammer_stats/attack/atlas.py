@@ -0,0 +1,179 @@
+"""
+A precomputed atlas of the results of unmodified attacks over a grid of stat lines.
+
+Without modifiers the results of an attack only depend on the shots, the thresholds to hit,
+wound and save, the feel no pain, the damage and the target's wounds. Strength and toughness
+reduce to the wound threshold, and the save, AP and invulnerable save reduce to the save
+threshold, so the atlas is indexed on those directly. Every point of the grid maps to an
+entry of stored results, and points with the same chance of an attack getting through share
+an entry.
+"""
+
+from __future__ import annotations
+
+import json
+from itertools import product
+from typing import Optional
+
+from numpy import array, int64, ndarray, zeros
+
+from ..utils.modifier_collection import ModifierCollection
+from ..utils.pmf import PMF, PMFCollection
+from ..utils.snapshot import LazyFile, map_arrays, pmf_key, write_arrays
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .results import AttackResults
+from .rolls.roll import RollBase
+
+# The atlas to load on first use, if any
+ATLAS_ENV = 'WARHAMMER_STATS_ATLAS'
+
+# The axes of the atlas grid, in index order
+AXES = ('shots', 'bs', 'wound_thresh', 'save_thresh', 'fnp', 'damage', 'wounds')
+
+
+def collection_key(collection: PMFCollection) -> str:
+    return json.dumps([pmf_key(pmf) for pmf in collection.pmfs])
+
+
+def grid_point(weapon: Weapon, target: Target) -> dict:
+    """
+    The point on the atlas grid for an unmodified weapon and target
+    """
+    return {
+        'shots': collection_key(weapon.shots),
+        'bs': weapon.bs,
+        'wound_thresh': RollBase.calc_wound_thresh(weapon.strength, target.toughness),
+        'save_thresh': min(ModifierCollection().modify_pen_thresh(target.save, weapon.ap, target.invuln), 7),
+        'fnp': min(target.fnp, 7),
+        'damage': collection_key(weapon.damage),
+        'wounds': target.wounds,
+    }
+
+
+def through_chance(bs: int, wound_thresh: int, save_thresh: int) -> int:
+    """
+    The chance of a single attack hitting, wounding and not being saved, in 216ths
+    """
+    return (7 - bs) * (7 - wound_thresh) * (save_thresh - 1)
+
+
+class Atlas:
+    """
+    Results of unmodified attacks, indexed by their point on the atlas grid
+
+    Args:
+        axes (dict): The values along each axis of the grid
+        index (ndarray): The entry for every point of the grid
+        offsets (ndarray): Where each field of each entry starts in the values
+        lengths (ndarray): The length of each field of each entry
+        values (ndarray): The values of every field of every entry
+    """
+    def __init__(self, axes: dict[str, list], index: ndarray, offsets: ndarray, lengths: ndarray, values: ndarray) -> None:
+        self.axes = axes
+        self.index = index
+        self.offsets = offsets
+        self.lengths = lengths
+        self.values = values
+        self._positions = {axis: {value: i for i, value in enumerate(axes[axis])} for axis in AXES}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def position(self, weapon: Weapon, target: Target) -> Optional[tuple[int, ...]]:
+        """
+        The position of the weapon and target on the grid, None if they are off the grid or
+        either has modifiers
+        """
+        if weapon.modifiers != ModifierCollection() or target.modifiers != ModifierCollection():
+            return None
+        point = grid_point(weapon, target)
+        position = tuple(self._positions[axis].get(point[axis]) for axis in AXES)
+        return None if None in position else position  # type: ignore[return-value]
+
+    def lookup(self, weapon: Weapon, target: Target) -> Optional[AttackResults]:
+        """
+        The results of the attack, or None if the atlas doesn't cover it
+        """
+        position = self.position(weapon, target)
+        if position is None:
+            return None
+        entry = self.index[position]
+        return AttackResults(*[
+            PMF([float(x) for x in self.values[offset:offset + length]])
+            for offset, length in zip(self.offsets[entry], self.lengths[entry])
+        ])
+
+    @classmethod
+    def build(cls, axes: dict[str, list], results) -> Atlas:
+        """
+        Build the atlas for the grid, calling results with a weapon and target for each
+        entry that needs computing. The weapons and targets are unmodified and strength
+        4 against toughness 4 is used for a 4+ to wound and so on.
+        """
+        shots = {collection_key(x): x for x in axes['shots']}
+        damages = {collection_key(x): x for x in axes['damage']}
+        axes = {**axes, 'shots': list(shots), 'damage': list(damages)}
+
+        index = zeros([len(axes[axis]) for axis in AXES], dtype=int64)
+        entries: dict[tuple, int] = {}
+        jobs = []
+        for position in product(*[range(len(axes[axis])) for axis in AXES]):
+            point = dict(zip(AXES, (axes[axis][i] for axis, i in zip(AXES, position))))
+            key = (
+                point['shots'], through_chance(point['bs'], point['wound_thresh'], point['save_thresh']),
+                point['fnp'], point['damage'], point['wounds'],
+            )
+            if key not in entries:
+                entries[key] = len(jobs)
+                jobs.append(_representative(point, shots[point['shots']], damages[point['damage']]))
+            index[position] = entries[key]
+
+        offsets, lengths, values = [], [], []
+        for attack_results in results(jobs):
+            offsets.append([])
+            lengths.append([])
+            for _, dist in attack_results.items():
+                trimmed = dist.trim_tail(1e-12)
+                offsets[-1].append(len(values))
+                lengths[-1].append(len(trimmed))
+                values += trimmed.values
+        return cls(axes, index, array(offsets, dtype=int64), array(lengths, dtype=int64), array(values, dtype=float))
+
+    def save(self, path: str) -> None:
+        write_arrays(path, self.axes, [self.index, self.offsets, self.lengths, self.values])
+
+    @classmethod
+    def load(cls, path: str) -> Atlas:
+        """
+        Load the axes of an atlas file and memory-map its index and results
+        """
+        axes, (index, offsets, lengths, values) = map_arrays(path)
+        return cls(axes, index, offsets, lengths, values)
+
+
+# Strength against toughness 4 for each wound threshold
+_STRENGTHS = {2: 8, 3: 5, 4: 4, 5: 3, 6: 2}
+
+
+def _representative(point: dict, shots: PMFCollection, damage: PMFCollection) -> tuple[Weapon, Target]:
+    weapon = Weapon(bs=point['bs'], shots=shots, strength=_STRENGTHS[point['wound_thresh']], ap=0, damage=damage)
+    target = Target(toughness=4, save=point['save_thresh'], invuln=7, fnp=point['fnp'], wounds=point['wounds'])
+    return weapon, target
+
+
+_active = LazyFile(ATLAS_ENV, Atlas.load)
+
+
+def use_atlas(atlas: Optional[Atlas]) -> None:
+    """
+    Set the atlas used to answer unmodified attacks, None turns the lookups off
+    """
+    _active.use(atlas)
+
+
+def active_atlas() -> Optional[Atlas]:
+    """
+    The atlas in use, loading the one named by the environment variable on first use
+    """
+    return _active.get()
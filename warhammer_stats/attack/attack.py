@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from concurrent.futures import Executor
 from functools import cached_property
+from typing import Optional
 
+from ..utils.approximation import variance_error
+from ..utils.budget import (MemoryBudget, approximate_footprint, compound_footprint, convolve_footprint, joint_footprint, powers_footprint,
+                            streaming_footprint)
+from ..utils.joint_pmf import JointPMF, powers
+from ..utils.memo import DiceMemo
 from ..utils.modifier_collection import ModifierCollection
 from ..utils.pmf import PMF, PMFCollection
 from ..utils.target import Target
@@ -11,10 +19,22 @@ from .phases.damage_phase import DamagePhase
 from .phases.hit_phase import HitPhase
 from .phases.save_phase import SavePhase
 from .phases.wound_phase import WoundPhase
-from .phases.kill_phase import KillPhase
-from .results import AttackResults
+from .phases.kill_phase import KillPhase, kill_footprint
+from .atlas import active_atlas
+from .results import AttackResults, R
+from .schedule import OUTPUTS, Scheduler
 
 DEBUG = False
+
+# Evaluation modes, auto approximates any step compounding more than the threshold of dice
+EXACT = 'exact'
+APPROXIMATE = 'approximate'
+AUTO = 'auto'
+APPROXIMATE_THRESHOLD = 200
+# Below this many dice the normal approximation is poor, so even approximate mode is exact
+# unless the exact compound would go over the memory budget
+MIN_APPROXIMATE_DICE = 20
+OVER_BUDGET_HINT = 'evaluate it in approximate or auto mode to approximate it instead'
 # pylint: disable=R0201,C0302,R0913,R0902,R0903,R0904,R0913
 
 
@@ -28,37 +48,78 @@ class Attack:
     Args:
         weapon (Weapon): The weapon being used to make the attack
         target (Target): The target of the the attack
+        mode (str): One of exact, approximate or auto. Approximate replaces compounding over
+            more than a few dice with a skew-corrected normal distribution
+        threshold (int): In auto mode, the number of dice above which compounding is approximated
+        pool (Executor): A worker pool, which may be shared between attacks, that evaluates the
+            slices of each roll concurrently. The slices are always reduced in the same order
+        memory_budget (int): The most bytes any one step may allocate, None for no limit. A step
+            over the budget is approximated if the mode allows it, otherwise it raises
+            MemoryBudgetExceeded before allocating anything
 
     Attributes:
         msg (str): Human readable string describing the exception.
         code (int): Exception error code.
     """
-    def __init__(self, weapon: Weapon, target: Target) -> None:
+    def __init__(self, weapon: Weapon, target: Target, mode: str = EXACT,
+                 threshold: int = APPROXIMATE_THRESHOLD, pool: Optional[Executor] = None,
+                 memory_budget: Optional[int] = None) -> None:
+        if mode not in (EXACT, APPROXIMATE, AUTO):
+            raise ValueError(f'unknown evaluation mode {mode}')
         self.weapon = weapon
         self.target = target
+        self.mode = mode
+        self.threshold = threshold
+        self.pool = pool
+        self.budget = MemoryBudget(memory_budget)
+        self.approximation_errors: dict[str, float] = {}
+        self.memo = DiceMemo()
+        self._modifiers: Optional[tuple[ModifierCollection, ModifierCollection, ModifierCollection]] = None
 
     def _hit_phase(self) -> HitPhase:
-        return HitPhase(self.weapon, self.target, self.modifiers)
+        return HitPhase(self.weapon, self.target, self.modifiers, self.memo, self.pool)
 
     def _wound_phase(self) -> WoundPhase:
-        return WoundPhase(self.weapon, self.target, self.modifiers)
+        return WoundPhase(self.weapon, self.target, self.modifiers, self.memo, self.pool)
 
     def _save_phase(self) -> SavePhase:
-        return SavePhase(self.weapon, self.target, self.modifiers)
+        return SavePhase(self.weapon, self.target, self.modifiers, self.memo, self.pool)
 
     def _attacks_phase(self) -> AttacksPhase:
-        return AttacksPhase(self.weapon, self.target, self.modifiers)
+        return AttacksPhase(self.weapon, self.target, self.modifiers, self.memo, self.pool)
 
     def _damage_phase(self) -> DamagePhase:
-        return DamagePhase(self.weapon, self.target, self.modifiers)
+        return DamagePhase(self.weapon, self.target, self.modifiers, self.memo, self.pool)
 
     def _kill_phase(self) -> KillPhase:
-        return KillPhase(self.weapon, self.target, self.modifiers)
+        return KillPhase(self.weapon, self.target, self.modifiers, self.memo, self.pool)
 
     @property
     def modifiers(self) -> ModifierCollection:
         """Return a combined list of modifers for both the weapon and the target"""
-        return self.weapon.modifiers + self.target.modifiers
+        # Only re-merge if the weapon or target modifiers have been swapped out
+        weapon_mods, target_mods = self.weapon.modifiers, self.target.modifiers
+        if self._modifiers is None or self._modifiers[0] is not weapon_mods or self._modifiers[1] is not target_mods:
+            self._modifiers = (weapon_mods, target_mods, weapon_mods + target_mods)
+        return self._modifiers[2]
+
+    def _multiply(self, step: str, results: R, count_dist: PMF) -> R:
+        """Compound the results by the count distribution, approximating large counts if the mode allows it"""
+        threshold = {EXACT: None, APPROXIMATE: MIN_APPROXIMATE_DICE, AUTO: self.threshold}[self.mode]
+        dice = len(count_dist) - 1
+        footprint = compound_footprint(len(results.lengths), max(results.lengths), dice)
+        # Compounding that doesn't fit in the budget is approximated whenever the mode allows it
+        if threshold is not None and (dice > threshold or not self.budget.fits(footprint)):
+            self.budget.check(step, approximate_footprint(len(results.lengths), max(results.lengths), dice))
+            results, self.approximation_errors[step] = results.approximate_by(count_dist)
+            return results
+        self.budget.check(step, footprint, OVER_BUDGET_HINT)
+        return results.multiply_by(count_dist)
+
+    @property
+    def approximation_error(self) -> float:
+        """An estimate of the largest error in the cumulative distributions from approximations"""
+        return min(sum(self.approximation_errors.values()), 1.0)
 
     @cached_property
     def hit_phase_results(self) -> AttackResults:
@@ -102,31 +163,38 @@ class Attack:
             self.hit_phase_results.extra_automatic_wound_dist
         ])
 
+    @cached_property
+    def failed_saves_results(self) -> AttackResults:
+        """Return the results of the save phase multiplied by the number of successful wounds"""
+        return self._multiply(
+            'failed_saves',
+            self.save_phase_results,
+            self.total_successful_wounds_dist,
+        )
+
     @cached_property
     def actual_failed_saves_dist(self) -> PMF:
         """Return the probability distribution of failed saves"""
-        return self.save_phase_results.multiply_by(
-            self.total_successful_wounds_dist
-        ).failed_armour_save_dist
+        return self.failed_saves_results.failed_armour_save_dist
 
     @cached_property
     def hit_wound_phase_results(self) -> AttackResults:
         """Return the results of the wound phase multiplied by the number of successful hits"""
-        return self.wound_phase_results.multiply_by(self.total_successful_hits_dist)
+        return self._multiply('hit_wound', self.wound_phase_results, self.total_successful_hits_dist)
 
     @cached_property
     def total_damage_results(self) -> AttackResults:
-        return self.damage_phase_results.multiply_by(
-            self.actual_failed_saves_dist
-        ).multiply_by(
-            self.attacks_phase_results.attack_number_dist
+        return self._multiply(
+            'total_damage',
+            self._multiply('damage', self.damage_phase_results, self.actual_failed_saves_dist),
+            self.attacks_phase_results.attack_number_dist,
         )
 
     @cached_property
     def total_mortal_wounds(self) -> PMF:
         return PMF.convolve_many([
-            self.hit_phase_results.multiply_by(self.attacks_phase_results.attack_number_dist).mortal_wound_dist,
-            self.hit_wound_phase_results.multiply_by(self.attacks_phase_results.attack_number_dist).mortal_wound_dist,
+            self._multiply('hit_mortals', self.hit_phase_results, self.attacks_phase_results.attack_number_dist).mortal_wound_dist,
+            self._multiply('wound_mortals', self.hit_wound_phase_results, self.attacks_phase_results.attack_number_dist).mortal_wound_dist,
         ])
 
     @cached_property
@@ -136,18 +204,32 @@ class Attack:
             self.hit_wound_phase_results.self_wound_dist,
         ])
 
+    def _convolve(self, step: str, collection: PMFCollection) -> PMF:
+        """Convolve the dice in one batch, or one at a time if the batch doesn't fit in the budget"""
+        length = 1 + sum(len(pmf) - 1 for pmf in collection.pmfs)
+        if self.budget.fits(convolve_footprint(len(collection), length)):
+            return collection.convolve()
+        self.budget.check(step, streaming_footprint(length))
+        return PMF.convolve_streaming(collection.pmfs)
+
     def apply_feel_no_pain(self, dist: PMF) -> PMF:
         dists = []
-        mod_thresh = self.modifiers.modify_fnp_thresh(self.target.fnp)
+        fingerprint = self.memo.fingerprint(self.modifiers.fnp_mods)
+        mod_thresh = self.memo.get(
+            ('fnp', 'thresh', fingerprint, self.target.fnp),
+            lambda: self.modifiers.modify_fnp_thresh(self.target.fnp),
+        )
         for dice, event_prob in enumerate(dist.values):
             if PMF.is_null_prob(event_prob):
                 continue
-            dice_dists = self.modifiers.modify_fnp_dice(
-                PMFCollection.mdn(dice, 6),
-                self.target.fnp,
-                mod_thresh,
+            binom_dists = self.memo.get(
+                ('fnp', 'dist', fingerprint, self.target.fnp, mod_thresh, dice),
+                lambda: self._convolve('feel_no_pain', self.modifiers.modify_fnp_dice(
+                    PMFCollection.mdn(dice, 6),
+                    self.target.fnp,
+                    mod_thresh,
+                ).convert_binomial_less_than(mod_thresh)),
             )
-            binom_dists = dice_dists.convert_binomial_less_than(mod_thresh).convolve()
             dists.append(binom_dists * event_prob)
         return PMF.flatten(dists)
 
@@ -163,48 +245,134 @@ class Attack:
     def final_self_wound_dist(self) -> PMF:
         return self.apply_feel_no_pain(self.total_self_wounds)
 
+    @cached_property
+    def wound_die_joint(self) -> JointPMF:
+        """Return the joint distribution of the wounds to save and the mortal wounds from a wound roll and its extra rolls"""
+        root, offspring = defaultdict(list), defaultdict(list)
+        for (wounds, extra, automatic, mortals, _), prob in self._wound_phase().kernel.calc_joint().items():
+            root[extra].append(JointPMF.static(wounds + automatic, mortals) * prob)
+            # Extra wound rolls don't generate automatic wounds
+            offspring[extra].append(JointPMF.static(wounds, mortals) * prob)
+        return JointPMF.progeny(
+            {extra: JointPMF.flatten(outcomes) for extra, outcomes in offspring.items()},
+            {extra: JointPMF.flatten(outcomes) for extra, outcomes in root.items()},
+        )
+
+    @cached_property
+    def hit_die_joint(self) -> JointPMF:
+        """Return the joint distribution of the wounds to save and the mortal wounds from a hit roll and its extra rolls"""
+        wound_rolls = [JointPMF.static(0, 0)]
+        root, offspring = defaultdict(list), defaultdict(list)
+        for (hits, extra, wounds, automatic, mortals, _), prob in self._hit_phase().kernel.calc_joint().items():
+            while len(wound_rolls) <= hits + automatic:
+                wound_rolls.append(JointPMF.convolve_many([wound_rolls[-1], self.wound_die_joint]))
+            root[extra].append(wound_rolls[hits + automatic].shift(wounds, mortals) * prob)
+            # Extra hit rolls only generate mortal wounds
+            offspring[extra].append(JointPMF.static(0, mortals) * prob)
+        return JointPMF.progeny(
+            {extra: JointPMF.flatten(outcomes) for extra, outcomes in offspring.items()},
+            {extra: JointPMF.flatten(outcomes) for extra, outcomes in root.items()},
+        )
+
+    @cached_property
+    def damage_mortal_dist(self) -> JointPMF:
+        """Return the joint distribution of the damage and the mortal wounds after feel no pain,
+        which are correlated when the same dice cause both"""
+        per_attack = self.hit_die_joint
+        failed_saves = per_attack.map_axis(0, powers(self.save_phase_results.failed_armour_save_dist, per_attack.shape[0] - 1))
+        total = failed_saves.compound(self.attacks_phase_results.attack_number_dist)
+        damage = total.map_axis(0, powers(self.damage_phase_results.damage_dist, total.shape[0] - 1))
+        # Feel no pain is rolled for each point of damage on its own
+        feel_no_pain = self.apply_feel_no_pain(PMF.static(1))
+        if feel_no_pain == PMF.static(1):
+            return damage
+        return damage.map_axis(0, powers(feel_no_pain, damage.shape[0] - 1)).map_axis(1, powers(feel_no_pain, damage.shape[1] - 1))
+
+    def damage_mortal_footprint(self) -> int:
+        """Estimate the memory used by the largest array built for damage_mortal_dist"""
+        rows, columns = self.hit_die_joint.shape
+        failed_save_dist = self.save_phase_results.failed_armour_save_dist
+        failed_rows = 1 + (rows - 1) * (len(failed_save_dist) - 1)
+        dice = len(self.attacks_phase_results.attack_number_dist) - 1
+        shape = (1 + dice * (failed_rows - 1), 1 + dice * (columns - 1))
+        damage_dist = self.damage_phase_results.damage_dist
+        damage_rows = 1 + (shape[0] - 1) * (len(damage_dist) - 1)
+        footprints = [
+            powers_footprint(len(failed_save_dist), rows - 1),
+            joint_footprint(shape),
+            powers_footprint(len(damage_dist), shape[0] - 1),
+            joint_footprint((damage_rows, shape[1])),
+        ]
+        feel_no_pain = self.apply_feel_no_pain(PMF.static(1))
+        if feel_no_pain != PMF.static(1):
+            footprints.append(powers_footprint(len(feel_no_pain), damage_rows - 1))
+        return max(footprints)
+
+    def independence_error(self) -> float:
+        """Estimate the error from treating the damage and mortal wounds as independent, from the
+        covariance between them that convolving the two leaves out"""
+        per_attack = self.hit_die_joint
+        wounds, mortals = per_attack.mean()
+        feel_no_pain = self.apply_feel_no_pain(PMF.static(1)).mean()
+        # The expected damage from each wound to save, after feel no pain
+        per_wound = self.save_phase_results.failed_armour_save_dist.mean() * self.damage_phase_results.damage_dist.mean() * feel_no_pain
+        # Each attack adds its own covariance, and the number of attacks moves both together
+        attack_number_dist = self.attacks_phase_results.attack_number_dist
+        covariance = per_wound * feel_no_pain * (
+            attack_number_dist.mean() * per_attack.covariance() + attack_number_dist.std()**2 * wounds * mortals
+        )
+        independent = self.final_damage_dist.std()**2 + self.final_mortal_wound_dist.std()**2
+        return variance_error(independent + 2 * covariance, independent)
+
     @cached_property
     def final_total_damage_dist(self) -> PMF:
+        # Dice that cause both damage and mortal wounds make the two correlated, if the joint
+        # distribution doesn't fit in the budget the mode may allow treating them as independent
+        if len(self.final_mortal_wound_dist) > 1:
+            footprint = self.damage_mortal_footprint()
+            if self.mode == EXACT or self.budget.fits(footprint):
+                self.budget.check('damage_mortal_dist', footprint, OVER_BUDGET_HINT)
+                return self.damage_mortal_dist.total()
+            self.approximation_errors['damage_mortal_dist'] = self.independence_error()
         return PMF.convolve_many([
             self.final_damage_dist,
             self.final_mortal_wound_dist,
         ])
 
     @cached_property
-    def kills_dist(self) -> PMF:
-        total_successful_hits_dist = PMF.convolve_many([
-            self.hit_phase_results.successful_hit_dist,
-            self.hit_phase_results.extra_automatic_hit_dist,
-        ])
-
-        hit_and_wound_phase_results = self.wound_phase_results.multiply_by(total_successful_hits_dist)
-
-        hit_and_wounds_dist = PMF.convolve_many([
-            hit_and_wound_phase_results.successful_wound_dist,
-            hit_and_wound_phase_results.extra_automatic_wound_dist,
-            self.hit_phase_results.extra_automatic_wound_dist
-        ])
-
-        failed_saves_dist = self.save_phase_results.multiply_by(
-            hit_and_wounds_dist
-        ).multiply_by(
-            self.attacks_phase_results.attack_number_dist
+    def kill_failed_saves_dist(self) -> PMF:
+        """Return the distribution of failed saves the kills are rolled for"""
+        return self._multiply(
+            'total_failed_saves',
+            self.failed_saves_results,
+            self.attacks_phase_results.attack_number_dist,
         ).failed_armour_save_dist
 
+    @cached_property
+    def failed_save_damage_dist(self) -> PMF:
+        """Return the distribution of damage from a single failed save, after feel no pain"""
+        return self.apply_feel_no_pain(self.damage_phase_results.damage_dist)
 
-        damage_dist = self.apply_feel_no_pain(self.damage_phase_results.damage_dist)
-
-        return self._kill_phase().calc_dist(failed_saves_dist, damage_dist, self.final_mortal_wound_dist)
+    @cached_property
+    def kills_dist(self) -> PMF:
+        self.budget.check('kills_dist', kill_footprint(self.target.wounds, len(self.kill_failed_saves_dist) - 1))
+        return self._kill_phase().calc_dist(self.kill_failed_saves_dist, self.failed_save_damage_dist, self.final_mortal_wound_dist)
 
-    def run(self):
+    def run(self, mode: Optional[str] = None, threshold: Optional[int] = None, workers: int = 1):
         """
-        Generate the resulting PMF
+        Generate the resulting PMF, optionally with a different evaluation mode or threshold.
+        With more than one worker the independent steps are evaluated on a thread pool.
         """
-
-        return AttackResults(
-            self.final_damage_dist,
-            self.final_mortal_wound_dist,
-            self.final_self_wound_dist,
-            self.final_total_damage_dist,
-            self.kills_dist,
-        )
+        mode = self.mode if mode is None else mode
+        threshold = self.threshold if threshold is None else threshold
+        if mode != self.mode or threshold != self.threshold:
+            return Attack(self.weapon, self.target, mode, threshold, self.pool, self.budget.limit).run(workers=workers)
+
+        # Unmodified attacks on the grid of a precomputed atlas are answered from it
+        atlas = active_atlas() if self.mode == EXACT else None
+        precomputed = atlas.lookup(self.weapon, self.target) if atlas is not None else None
+        if precomputed is not None:
+            return precomputed
+
+        outputs = Scheduler(self, workers).evaluate(OUTPUTS)
+        return AttackResults(*(outputs[output] for output in OUTPUTS), error=self.approximation_error)
@@ -0,0 +1,190 @@
+"""
+Simulate several rounds of two units shooting at each other as a Markov chain.
+
+Each round the attacker fires at the defender, then the defender's survivors fire back. The
+state of each unit is the number of wounds it has left. Damage doesn't spill over from one
+model to the next, so the wounds left on the model currently taking damage matter, and the
+wounds a unit has left determine both its models and the wounds on its current model. The
+transitions out of each state are built from the distributions of the Attack pipeline and
+cached, so every round is a single pass over the states that are still possible.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from functools import cache
+
+from numpy import arange, bincount, minimum, ndarray, zeros
+
+from ..utils.pmf import PMF
+from ..utils.unit import Unit
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+from .results import ResultsBase
+
+# Probabilities below this are dropped, small enough that the lost mass stays negligible over many rounds
+EPSILON = 1e-12
+
+
+@cache
+def power(dist: PMF, count: int) -> PMF:
+    """
+    The distribution of the sum of count independent draws from the distribution
+    """
+    return PMF.convolve_many([dist] * count) if count else PMF.static(0)
+
+
+def models_left(wounds: int, wounds_per_model: int) -> int:
+    return math.ceil(wounds / wounds_per_model)
+
+
+def damage_targets(wounds: int, wounds_per_model: int, damage: int) -> ndarray:
+    """
+    The wounds a unit has left after one dice of damage, for each number of wounds it has
+    left before it. Damage beyond the wounds of the current model is lost
+    """
+    before = arange(wounds + 1)
+    current = (before - 1) % wounds_per_model + 1
+    return before - minimum(damage, current) * (before > 0)
+
+
+def apply_damage(wounds: ndarray, wounds_per_model: int, count_dist: PMF, damage_dist: PMF) -> ndarray:
+    """
+    The distribution of wounds left after a random number of dice of damage
+    """
+    steps = [
+        (damage_targets(len(wounds) - 1, wounds_per_model, damage), prob)
+        for damage, prob in enumerate(damage_dist.values) if prob > EPSILON
+    ]
+    result = zeros(len(wounds))
+    for count, count_prob in enumerate(count_dist.values):
+        if count:
+            wounds = sum(bincount(targets, weights=wounds * prob, minlength=len(wounds)) for targets, prob in steps)
+        if count_prob > EPSILON:
+            result += wounds * count_prob
+    return result
+
+
+def apply_mortal_wounds(wounds: ndarray, mortal_dist: PMF) -> ndarray:
+    """
+    The distribution of wounds left after mortal wounds, which spill over from model to model
+    """
+    result = zeros(len(wounds))
+    for mortals, prob in enumerate(mortal_dist.values):
+        if prob > EPSILON:
+            result[0] += wounds[:mortals + 1].sum() * prob
+            # Mortal wounds past the wounds of the unit are already counted at zero
+            if mortals < len(wounds):
+                result[1:len(wounds) - mortals] += wounds[mortals + 1:] * prob
+    return result
+
+
+class AttritionResults(ResultsBase):
+    """Holds the results of several rounds of attrition
+
+    Args:
+        rounds_to_destroy_dist (PMF): The distribution of the round the defender is destroyed
+            in, with the last value the chance it survives every round
+        attacker_survivors_dist (PMF): The distribution of the attacker's models left at the end
+        defender_survivors_dist (PMF): The distribution of the defender's models left at the end
+    """
+    fields = ('rounds_to_destroy_dist', 'attacker_survivors_dist', 'defender_survivors_dist')
+
+    def __init__(self, rounds_to_destroy_dist: PMF, attacker_survivors_dist: PMF, defender_survivors_dist: PMF):
+        super().__init__(rounds_to_destroy_dist, attacker_survivors_dist, defender_survivors_dist)
+
+
+class Attrition:
+    """
+    Repeated exchanges of fire between two units
+
+    Args:
+        attacker (Unit): The unit that fires first each round
+        defender (Unit): The unit that fires back with its survivors each round
+        rounds (int): The number of rounds
+    """
+    def __init__(self, attacker: Unit, defender: Unit, rounds: int) -> None:
+        self.attacker = attacker
+        self.defender = defender
+        self.rounds = rounds
+        self._attacks: dict[tuple[Weapon, Target], Attack] = {}
+        self._volleys: dict[tuple[bool, int, int], ndarray] = {}
+        self._transitions: dict[tuple[int, int], dict[tuple[int, int], float]] = {}
+
+    def attack(self, weapon: Weapon, target: Target) -> Attack:
+        if (weapon, target) not in self._attacks:
+            self._attacks[weapon, target] = Attack(weapon, target)
+        return self._attacks[weapon, target]
+
+    def volley(self, shooter: Unit, firing: int, target: Unit, wounds: int) -> ndarray:
+        """
+        The distribution of the wounds the target has left after some of the shooter's models
+        fire at it, with each weapon resolved in turn
+        """
+        key = (shooter is self.attacker, firing, wounds)
+        if key not in self._volleys:
+            dist = zeros(target.wounds + 1)
+            dist[wounds] = 1.0
+            for weapon in shooter.weapons:
+                attack = self.attack(weapon, target.target)
+                dist = apply_damage(dist, target.target.wounds, power(attack.kill_failed_saves_dist, firing), attack.failed_save_damage_dist)
+                dist = apply_mortal_wounds(dist, power(attack.final_mortal_wound_dist, firing))
+            self._volleys[key] = dist
+        return self._volleys[key]
+
+    def transition(self, state: tuple[int, int]) -> dict[tuple[int, int], float]:
+        """
+        The distribution of the wounds both units have left after a round, from the wounds
+        they have left before it
+        """
+        if state not in self._transitions:
+            attacker_wounds, defender_wounds = state
+            transitions: dict[tuple[int, int], float] = defaultdict(float)
+            shot = self.volley(self.attacker, models_left(attacker_wounds, self.attacker.target.wounds), self.defender, defender_wounds)
+            for defender_left, prob in enumerate(shot):
+                if prob <= EPSILON:
+                    continue
+                returned = self.volley(self.defender, models_left(defender_left, self.defender.target.wounds), self.attacker, attacker_wounds)
+                for attacker_left, returned_prob in enumerate(returned):
+                    if returned_prob > EPSILON:
+                        transitions[attacker_left, defender_left] += prob * returned_prob
+            self._transitions[state] = dict(transitions)
+        return self._transitions[state]
+
+    def step(self, states: dict[tuple[int, int], float]) -> dict[tuple[int, int], float]:
+        """
+        The distribution of the states after one more round, once either unit is destroyed the
+        exchange is over
+        """
+        stepped: dict[tuple[int, int], float] = defaultdict(float)
+        for state, prob in states.items():
+            if 0 in state:
+                stepped[state] += prob
+                continue
+            for next_state, next_prob in self.transition(state).items():
+                stepped[next_state] += prob * next_prob
+        return stepped
+
+    def survivors(self, states: dict[tuple[int, int], float], index: int, unit: Unit) -> PMF:
+        values = [0.0] * (unit.models + 1)
+        for state, prob in states.items():
+            values[models_left(state[index], unit.target.wounds)] += prob
+        return PMF(values)
+
+    def run(self) -> AttritionResults:
+        """
+        Propagate the exchange through every round
+        """
+        states: dict[tuple[int, int], float] = {(self.attacker.wounds, self.defender.wounds): 1.0}
+        destroyed = [0.0]
+        for _ in range(self.rounds):
+            states = self.step(states)
+            destroyed.append(sum(prob for (_, defender_wounds), prob in states.items() if not defender_wounds))
+        rounds_to_destroy = [0.0] + [after - before for before, after in zip(destroyed, destroyed[1:])] + [1.0 - destroyed[-1]]
+        return AttritionResults(
+            rounds_to_destroy_dist=PMF(rounds_to_destroy),
+            attacker_survivors_dist=self.survivors(states, 0, self.attacker),
+            defender_survivors_dist=self.survivors(states, 1, self.defender),
+        )
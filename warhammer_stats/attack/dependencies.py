@@ -0,0 +1,89 @@
+"""
+The fields of the weapon, target and modifiers that each cached step of an Attack depends on.
+
+When some of the fields change, a new attack can take over the results of every step that
+doesn't depend on them from the previous attack, along with its dice memo. Memo entries are
+keyed by the thresholds and modifiers that produced them, so they stay valid as the fields change.
+"""
+
+from __future__ import annotations
+
+from ..utils.modifier_collection import ModifierCollection
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+
+# The lists of modifiers, from the weapon and target combined
+MODIFIER_LISTS = ('attacks_mods', 'hit_mods', 'wound_mods', 'save_mods', 'fnp_mods', 'damage_mods')
+
+# Hit and wound modifiers can split the later rolls, so they reach every phase after their own
+ATTACKS = ('shots', 'attacks_mods')
+HITS = ('bs', 'hit_mods')
+WOUNDS = HITS + ('strength', 'toughness', 'wound_mods')
+SAVES = WOUNDS + ('ap', 'save', 'invuln', 'save_mods')
+# Damage is capped at the wounds of the target
+DAMAGE = WOUNDS + ('damage', 'wounds', 'damage_mods')
+FEEL_NO_PAIN = ('fnp', 'fnp_mods')
+TOTAL = ATTACKS + SAVES + DAMAGE + FEEL_NO_PAIN
+
+# The fields each step depends on, directly or through the steps before it
+STEPS: dict[str, frozenset[str]] = {step: frozenset(fields) for step, fields in {
+    'attacks_phase_results': ATTACKS,
+    'hit_phase_results': HITS,
+    'wound_phase_results': WOUNDS,
+    'save_phase_results': SAVES,
+    'damage_phase_results': DAMAGE,
+    'total_successful_hits_dist': HITS,
+    'total_successful_wounds_dist': WOUNDS,
+    'hit_wound_phase_results': WOUNDS,
+    'failed_saves_results': SAVES,
+    'actual_failed_saves_dist': SAVES,
+    'total_damage_results': ATTACKS + SAVES + DAMAGE,
+    'total_mortal_wounds': ATTACKS + WOUNDS,
+    'total_self_wounds': WOUNDS,
+    'final_damage_dist': TOTAL,
+    'final_mortal_wound_dist': ATTACKS + WOUNDS + FEEL_NO_PAIN,
+    'final_self_wound_dist': WOUNDS + FEEL_NO_PAIN,
+    'wound_die_joint': WOUNDS,
+    'hit_die_joint': WOUNDS,
+    'damage_mortal_dist': TOTAL,
+    'final_total_damage_dist': TOTAL,
+    'kill_failed_saves_dist': ATTACKS + SAVES,
+    'failed_save_damage_dist': DAMAGE + FEEL_NO_PAIN,
+    'kills_dist': TOTAL,
+}.items()}
+
+
+def changed_fields(attack: Attack, weapon: Weapon, target: Target) -> set[str]:
+    """
+    The fields that differ between the attack and one of the weapon against the target
+    """
+    changed = {field for field in Weapon.__slots__ if field != 'modifiers' and getattr(attack.weapon, field) != getattr(weapon, field)}
+    changed |= {field for field in Target.__slots__ if field != 'modifiers' and getattr(attack.target, field) != getattr(target, field)}
+    modifiers = weapon.modifiers + target.modifiers
+    return changed | {mods for mods in MODIFIER_LISTS if getattr(attack.modifiers, mods) != getattr(modifiers, mods)}
+
+
+def perturbed_fields(perturbation: ModifierCollection) -> set[str]:
+    """
+    The lists of modifiers that adding the perturbation changes
+    """
+    return {mods for mods in MODIFIER_LISTS if getattr(perturbation, mods)}
+
+
+def invalidated(changed: set[str]) -> set[str]:
+    """
+    The steps whose results change with the fields
+    """
+    return {step for step, fields in STEPS.items() if fields & changed}
+
+
+def take_over(attack: Attack, previous: Attack, changed: set[str]) -> None:
+    """
+    Give the attack the dice memo of the previous attack and the results it has already found
+    for every step that doesn't depend on the changed fields
+    """
+    attack.memo = previous.memo
+    for step in set(STEPS) - invalidated(changed):
+        if step in vars(previous):
+            vars(attack)[step] = vars(previous)[step]
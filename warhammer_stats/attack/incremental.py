@@ -0,0 +1,54 @@
+"""
+Keep the results of an attack up to date as the fields of its weapon and target change one at a
+time, recomputing only the steps that depend on the fields that changed.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+from .dependencies import changed_fields, invalidated, take_over
+from .results import AttackResults
+
+
+class IncrementalAttack:
+    """
+    An attack whose weapon and target can be updated in place
+
+    Args:
+        weapon (Weapon): The weapon being used to make the attack
+        target (Target): The target of the the attack
+    """
+    def __init__(self, weapon: Weapon, target: Target) -> None:
+        self.attack = Attack(weapon, target)
+
+    @property
+    def weapon(self) -> Weapon:
+        return self.attack.weapon
+
+    @property
+    def target(self) -> Target:
+        return self.attack.target
+
+    def update(self, weapon: Weapon, target: Target) -> set[str]:
+        """
+        Switch to a new weapon and target, keeping the results of the steps that don't depend
+        on anything that changed. Returns the steps that will be recomputed
+        """
+        changed = changed_fields(self.attack, weapon, target)
+        attack = Attack(weapon, target)
+        take_over(attack, self.attack, changed)
+        self.attack = attack
+        return invalidated(changed)
+
+    def update_weapon(self, **changes: Any) -> set[str]:
+        return self.update(self.weapon.replace(**changes), self.target)
+
+    def update_target(self, **changes: Any) -> set[str]:
+        return self.update(self.weapon, self.target.replace(**changes))
+
+    def run(self) -> AttackResults:
+        return self.attack.run()
@@ -0,0 +1,212 @@
+"""
+Search a catalog of weapons for the loadout that does the most to a target within a points budget.
+
+The search is a branch and bound over the number of copies of each weapon. Each branch is
+pruned using only the moments of the kills of the weapons left to choose from (their means,
+variances and chance of killing nothing, per point), so the kill distributions are only
+convolved for the branches that could beat the best loadout found so far.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Union
+
+from numpy import arange, array, concatenate, convolve, ndarray
+
+from ..utils.pmf import PMF
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+from .results import AttackResults
+
+# The objectives a loadout can be optimized for
+KILLS = 'kills'
+POINTS = 'points'
+KILL_CHANCE = 'kill_chance'
+OBJECTIVES = (KILLS, POINTS, KILL_CHANCE)
+
+
+def suffix_max(values: list[float]) -> list[float]:
+    """
+    The largest of the values from each index onwards, and zero past the end
+    """
+    maxima = [0.0]
+    for value in reversed(values):
+        maxima.append(max(value, maxima[-1]))
+    return maxima[::-1]
+
+
+def cantelli_bound(mean: float, variance: float, kills: int) -> float:
+    """
+    An upper bound on the chance of at least the given kills for any distribution with the
+    mean and variance
+    """
+    if mean >= kills:
+        return 1.0
+    if variance <= 0:
+        return 0.0
+    return variance / (variance + (kills - mean) ** 2)
+
+
+def capped_sum(left: ndarray, right: ndarray, models: int) -> ndarray:
+    """
+    The distribution of the sum of two capped kill distributions, capped again
+    """
+    total = convolve(left, right)
+    return concatenate([total[:models], [total[models:].sum()]])
+
+
+class LoadoutOptimizer:
+    """
+    Finds the loadout of weapons that maximizes an objective against one or more targets
+
+    Args:
+        weapons (list[Weapon]): The candidate weapons, each needs a positive cost
+        targets (Target or list[tuple[Target, float]]): The target, or the targets and how much
+            each one counts towards the objective
+        objective (str): Expected kills, expected points killed (using the cost of the
+            targets) or the chance of killing at least the given number of models
+        models (int): The number of kills needed when optimizing the chance of killing them
+        max_copies (int): The most copies of any one weapon in the loadout, unlimited if None
+    """
+    def __init__(self, weapons: list[Weapon], targets: Union[Target, list[tuple[Target, float]]],
+                 objective: str = KILLS, models: int = 1, max_copies: Optional[int] = None) -> None:
+        if objective not in OBJECTIVES:
+            raise ValueError(f'unknown objective {objective}, expected one of {", ".join(OBJECTIVES)}')
+        if any(not weapon.cost or weapon.cost <= 0 for weapon in weapons):
+            raise ValueError('every weapon needs a positive cost')
+        self.targets = [(targets, 1.0)] if isinstance(targets, Target) else list(targets)
+        self.objective = objective
+        self.models = models
+        self.max_copies = max_copies
+        self._results: dict[tuple[Weapon, Target], AttackResults] = {}
+        self._powers: dict[tuple[int, int, int], ndarray] = {}
+
+        # Best value per point first so that the search finds good loadouts early
+        self.weapons = sorted(weapons, key=lambda weapon: -self.value_per_point(weapon))
+        costs = [weapon.cost for weapon in self.weapons]
+        self.cheapest = [min(costs[i:], default=math.inf) for i in range(len(costs) + 1)]
+        self.means = [[self.kills(weapon, target).mean() for weapon in self.weapons] for target, _ in self.targets]
+        self.variances = [[self.kills(weapon, target).std() ** 2 for weapon in self.weapons] for target, _ in self.targets]
+        self.capped = [[self.capped_kills(weapon, target) for weapon in self.weapons] for target, _ in self.targets]
+
+        # The most any weapon from each index onwards adds per point, for bounding the search
+        self.best_values = suffix_max([self.value_per_point(weapon) for weapon in self.weapons])
+        self.best_means = [suffix_max([m / c for m, c in zip(means, costs)]) for means in self.means]
+        self.best_variances = [suffix_max([v / c for v, c in zip(variances, costs)]) for variances in self.variances]
+        self.best_capped_means = [
+            suffix_max([float(capped.dot(arange(models + 1))) / c for capped, c in zip(row, costs)]) for row in self.capped
+        ]
+        self.worst_miss_rates = [
+            suffix_max([-math.log(capped[0]) / c if capped[0] > 0 else math.inf for capped, c in zip(row, costs)]) for row in self.capped
+        ]
+
+    def results(self, weapon: Weapon, target: Target) -> AttackResults:
+        """
+        The results of the weapon against the target, each pair is only attacked once
+        """
+        if (weapon, target) not in self._results:
+            self._results[weapon, target] = Attack(weapon, target).run()
+        return self._results[weapon, target]
+
+    def kills(self, weapon: Weapon, target: Target) -> PMF:
+        return self.results(weapon, target).kills_dist
+
+    def capped_kills(self, weapon: Weapon, target: Target) -> ndarray:
+        """
+        The kills of the weapon against the target with every kill beyond the models needed
+        counted as the models needed
+        """
+        return array(self.kills(weapon, target).ceiling(self.models).expand_to(self.models + 1).values)
+
+    def weight(self, index: int) -> float:
+        """
+        How much each expected kill of the target counts towards the objective
+        """
+        target, weight = self.targets[index]
+        return weight * (target.cost or 0.0) if self.objective == POINTS else weight
+
+    def value_per_point(self, weapon: Weapon) -> float:
+        return sum(self.weight(i) * self.kills(weapon, target).mean() for i, (target, _) in enumerate(self.targets)) / weapon.cost
+
+    def power(self, weapon: int, target: int, copies: int) -> ndarray:
+        """
+        The capped kills of copies of a weapon against a target
+        """
+        key = (weapon, target, copies)
+        if key not in self._powers:
+            if copies == 1:
+                self._powers[key] = self.capped[target][weapon]
+            else:
+                self._powers[key] = capped_sum(self.power(weapon, target, copies - 1), self.capped[target][weapon], self.models)
+        return self._powers[key]
+
+    def value(self, means: list[float], dists: list[ndarray]) -> float:
+        if self.objective == KILL_CHANCE:
+            return sum(weight * float(dist[-1]) for (_, weight), dist in zip(self.targets, dists))
+        return sum(self.weight(i) * mean for i, mean in enumerate(means))
+
+    def bound(self, index: int, budget: float, state: tuple) -> float:
+        """
+        An upper bound on the value of any loadout that adds weapons from the index onwards
+        """
+        means, variances, dists = state
+        if self.objective != KILL_CHANCE:
+            return self.value(means, dists) + budget * self.best_values[index]
+        bound = 0.0
+        for i, (_, weight) in enumerate(self.targets):
+            mean, variance = means[i] + budget * self.best_means[i][index], variances[i] + budget * self.best_variances[i][index]
+            # Markov's inequality on the capped kills, which add up to at most the sum of their caps
+            capped_mean = float(dists[i].dot(arange(self.models + 1))) + budget * self.best_capped_means[i][index]
+            # The models survive at least when they already would and the weapons added kill nothing
+            survive = float(dists[i][:-1].sum()) * math.exp(-budget * self.worst_miss_rates[i][index])
+            bound += weight * min(cantelli_bound(mean, variance, self.models), capped_mean / self.models, 1 - survive)
+        return bound
+
+    def add(self, index: int, copies: int, state: tuple) -> tuple:
+        """
+        The means, variances and capped kills against each target after adding copies of a weapon
+        """
+        means, variances, dists = state
+        if copies and self.objective == KILL_CHANCE:
+            dists = [capped_sum(dist, self.power(index, i, copies), self.models) for i, dist in enumerate(dists)]
+        return (
+            [m + copies * self.means[i][index] for i, m in enumerate(means)],
+            [v + copies * self.variances[i][index] for i, v in enumerate(variances)],
+            dists,
+        )
+
+    def optimize(self, budget: float) -> tuple[list[Weapon], float]:
+        """
+        The loadout with the highest value of the objective within the budget, and that value
+        """
+        empty = [0.0] * len(self.targets)
+        nothing = array([1.0] + [0.0] * self.models)
+        best: dict = {'weapons': [], 'value': 0.0}
+
+        def visit(index, chosen, budget, state):
+            # Adding a weapon never lowers the value, so only loadouts that can't afford any more are scored
+            if index == len(self.weapons) or budget < self.cheapest[index]:
+                value = self.value(state[0], state[2])
+                if value > best['value']:
+                    best.update(weapons=chosen, value=value)
+                return
+            if self.bound(index, budget, state) <= best['value'] + 1e-12:
+                return
+            weapon = self.weapons[index]
+            most = int(budget // weapon.cost) if self.max_copies is None else min(int(budget // weapon.cost), self.max_copies)
+            for copies in range(most, -1, -1):
+                visit(index + 1, chosen + [weapon] * copies, budget - copies * weapon.cost, self.add(index, copies, state))
+
+        visit(0, [], budget, (empty, empty, [nothing] * len(self.targets)))
+        return best['weapons'], best['value']
+
+
+def optimize_loadout(weapons: list[Weapon], budget: float, targets: Union[Target, list[tuple[Target, float]]],
+                     objective: str = KILLS, models: int = 1, max_copies: Optional[int] = None) -> tuple[list[Weapon], float]:
+    """
+    The loadout of weapons within the budget that maximizes the objective against the targets,
+    and the value it achieves
+    """
+    return LoadoutOptimizer(weapons, targets, objective, models, max_copies).optimize(budget)
@@ -1,5 +1,11 @@
-from .attack import Attack
+import math
+from typing import Optional
+
+from .attack import Attack, EXACT, APPROXIMATE_THRESHOLD
+from .unit_attack import UnitAttack
+from ..utils.pmf import PMF
 from ..utils.target import Target
+from ..utils.unit import UnitTarget
 from ..utils.weapon import Weapon
 
 from .results import AttackResults
@@ -13,12 +19,45 @@ class MultiAttack:
         self.target = target
     
     @cache
-    def run_attack(self, weapon: Weapon, target: Target) -> Attack:
-        return Attack(weapon, target).run()
+    def attack(self, weapon: Weapon, target: Target, mode: str = EXACT,
+               threshold: int = APPROXIMATE_THRESHOLD) -> Attack:
+        return Attack(weapon, target, mode, threshold)
+
+    @cache
+    def run_attack(self, weapon: Weapon, target: Target, mode: str = EXACT,
+                   threshold: int = APPROXIMATE_THRESHOLD) -> AttackResults:
+        return self.attack(weapon, target, mode, threshold).run()
     
-    def run(self) -> AttackResults:
-        results = []
-        for weapon in self.weapons:
-            results.append(self.run_attack(weapon, self.target))
+    def run(self, mode: Optional[str] = None, threshold: Optional[int] = None, sequential: bool = False) -> AttackResults:
+        """
+        Combine the results of every weapon. Sequentially, each weapon starts on the model the
+        previous weapon left wounded rather than the kills of each weapon being independent
+        """
+        mode = EXACT if mode is None else mode
+        threshold = APPROXIMATE_THRESHOLD if threshold is None else threshold
+        attacks = [self.attack(weapon, self.target, mode, threshold) for weapon in self.weapons]
+        results = [self.run_attack(weapon, self.target, mode, threshold) for weapon in self.weapons]
+
+        combined = AttackResults.combine(results)
+        if sequential:
+            combined.kills_dist = self.sequential_kills_dist(attacks, results)
+        return combined
+
+    def sequential_kills_dist(self, attacks: list[Attack], results: list[AttackResults]) -> PMF:
+        """
+        The kills of the weapons fired in order, propagating the distribution of the models
+        killed and the wounds left on the current model from each weapon to the next. For a
+        single weapon this matches the kills of its attack.
+        """
+        wounds = self.target.wounds
+        # Every kill takes at least the target's wounds in damage, which bounds the models needed
+        models = 1 + sum(len(r.total_damage_dist) - 1 for r in results) // wounds
+        unit = UnitTarget([(self.target, models)])
+        remaining = PMF.static(unit.wounds)
+        for attack in attacks:
+            remaining = UnitAttack(attack.weapon, unit, [attack]).apply(remaining)
 
-        return AttackResults.combine(results)
+        kills = [0.0] * (models + 1)
+        for left, prob in enumerate(remaining.values):
+            kills[models - math.ceil(left / wounds)] += prob
+        return PMF(kills)
@@ -18,4 +18,6 @@ class AttacksPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
@@ -1,17 +1,21 @@
 from .phase import PhaseBase
 from ..results import HitPhaseResults
 
-from ..rolls.hit_rolls import (SuccessfulHitRoll, ExtraHitRollRoll, ExtraAutomaticWoundRoll, ExtraAutomaticHitRoll, MortalWoundRoll, SelfWoundRoll)
+from ..rolls.hit_rolls import (SuccessfulHitRoll, ExtraHitRollRoll, ExtraAutomaticWoundRoll, ExtraAutomaticHitRoll, MortalWoundRoll, SelfWoundRoll,
+                               HitPhaseKernel)
 
 class HitPhase(PhaseBase):
     def results(self):
-        return HitPhaseResults(
-            successful_hit_dist=self.successful_hit_roll.calc_dist(),
-            extra_hit_roll_dist=self.extra_hit_roll_roll.calc_dist(),
-            extra_automatic_hit_dist=self.extra_automatic_hit_roll.calc_dist(),
-            extra_automatic_wound_dist=self.extra_automatic_wound_roll.calc_dist(),
-            mortal_wound_dist=self.mortal_wound_roll.calc_dist(),
-            self_wound_dist=self.self_wound_roll.calc_dist(),
+        return HitPhaseResults(**self.kernel.calc_dists())
+
+    @property
+    def kernel(self):
+        return HitPhaseKernel(
+            weapon=self.weapon,
+            target=self.target,
+            modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -20,6 +24,8 @@ class HitPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -28,6 +34,8 @@ class HitPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -36,6 +44,8 @@ class HitPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -44,6 +54,8 @@ class HitPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -52,6 +64,8 @@ class HitPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -60,4 +74,6 @@ class HitPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
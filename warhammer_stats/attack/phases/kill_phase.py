@@ -3,10 +3,19 @@ from __future__ import annotations
 import math
 from collections import defaultdict
 from functools import cache
+from typing import Optional
 
+from numpy import array
+
+from ...utils import kernels
+from ...utils.budget import FLOAT
 from ...utils.pmf import PMF
+from .kill_table import KillTable, active_kill_table
 from .phase import PhaseBase
 
+# The bytes held for each (kills, probability) entry of the cached kill trees
+TREE_ENTRY = 56
+
 
 def get_max_depth(wounds: int, dice: int, dam_pmf: PMF) -> int:
     """Returns the maximum number of dice rolls"""
@@ -22,7 +31,8 @@ def get_max_depth(wounds: int, dice: int, dam_pmf: PMF) -> int:
 def generate_kill_tree(wounds: int, dice: int, damage_pmf: PMF, mortals_pmf: PMF) -> list[tuple[int, float]]:
     """Generates the tree composed of the one-kill trees"""
     if dice <= 0:
-        return [(0, 1)]
+        # Any mortal wounds are dealt to the fresh model the last kill left
+        return generate_mortal_kill_tree(wounds, wounds, mortals_pmf)
     else:
         kills = []
         max_depth = get_max_depth(wounds, dice, damage_pmf)
@@ -38,7 +48,8 @@ def generate_kill_tree(wounds: int, dice: int, damage_pmf: PMF, mortals_pmf: PMF
 
 @cache
 def generate_mortal_kill_tree(wounds: int, wounds_left: int, mortal_pmf: PMF) -> list[tuple[int, float]]:
-    """Generates the tree composed of the one-kill trees"""
+    """Generates the kills from mortal wounds dealt to a model with wounds left, which spill
+    over to the next model"""
     kills = []
 
     for damage, damage_prob in enumerate(mortal_pmf.values):
@@ -46,10 +57,8 @@ def generate_mortal_kill_tree(wounds: int, wounds_left: int, mortal_pmf: PMF) ->
             continue
         if damage < wounds_left:
             kills.append((0, damage_prob))
-        elif damage == wounds_left:
-            kills.append((1, damage_prob))
         else:
-            kills.append((1 + wounds//(damage - wounds_left), damage_prob))
+            kills.append((1 + (damage - wounds_left) // wounds, damage_prob))
     return normalize_tree(kills)
 
 
@@ -103,12 +112,32 @@ def normalize_tree_zeros(tree: list[tuple[int, float, int]]) -> list[tuple[int,
     return [(k[0], tree_values[k], k[1])for k in sorted(tree_values.keys())]
 
 
-@cache
 def calculate_kills(wounds: int, dice: int, dam_pmf: PMF, mortal_pmf: PMF) -> PMF:
+    if kernels.JIT_ENABLED:
+        return calculate_kills_compiled(wounds, dice, dam_pmf, mortal_pmf)
+    return calculate_kills_tree(wounds, dice, dam_pmf, mortal_pmf)
+
+
+@cache
+def calculate_kills_tree(wounds: int, dice: int, dam_pmf: PMF, mortal_pmf: PMF) -> PMF:
     kill_tree = generate_kill_tree(wounds, dice, dam_pmf, mortal_pmf)
     return tree_to_pmf(kill_tree)
 
 
+@cache
+def calculate_kills_compiled(wounds: int, dice: int, dam_pmf: PMF, mortal_pmf: PMF) -> PMF:
+    return PMF(list(kernels.kill_dist(wounds, dice, array(dam_pmf.values, dtype=float), array(mortal_pmf.values, dtype=float))))
+
+
+def kill_footprint(wounds: int, dice: int) -> int:
+    """The memory used to find the kills from a number of dice. The compiled kernel holds a
+    table of the states of the dice, the kill tree caches a tree for every smaller number of dice
+    """
+    if kernels.JIT_ENABLED:
+        return 2 * FLOAT * (wounds + 2) * (dice + 1)
+    return TREE_ENTRY * (dice + 1)**2
+
+
 class KillPhase(PhaseBase):
     """
     Generate the PMF for the kills dealt to the target
@@ -120,10 +149,21 @@ class KillPhase(PhaseBase):
         and other damage modifiers.
         """
 
+        # Look the kill distributions up in the precomputed table if this profile is in it
+        table = active_kill_table()
+        row = table.row(self.target.wounds, damage_dist, mortal_wound_dist) if table is not None else None
+
         damage_dists = []
         for dice, event_prob in enumerate(dist.values):
             if PMF.is_null_prob(event_prob):
                 continue
-            damage_dists.append(calculate_kills(self.target.wounds, dice, damage_dist, mortal_wound_dist) * event_prob)
+            damage_dists.append(self.kills(table, row, dice, damage_dist, mortal_wound_dist) * event_prob)
 
         return PMF.flatten(damage_dists)
+
+    def kills(self, table: Optional[KillTable], row: Optional[int], dice: int, damage_dist: PMF, mortal_wound_dist: PMF) -> PMF:
+        """The kill distribution for a number of dice, from the table if possible"""
+        kills = table.get(row, dice) if table is not None and row is not None else None
+        if kills is None:
+            kills = calculate_kills(self.target.wounds, dice, damage_dist, mortal_wound_dist)
+        return kills
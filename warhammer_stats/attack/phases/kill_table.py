@@ -0,0 +1,104 @@
+"""
+A precomputed table of kill distributions, memory-mapped so that every process shares the
+pages it reads.
+
+Each row of the table is a combination of target wounds, damage distribution (after feel no
+pain) and mortal wound distribution, and holds the kill distribution for every number of
+failed saves up to the row's maximum. Past it the length of the distribution is zero.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+from numpy import array, int64, ndarray, zeros
+
+from ...utils.pmf import PMF
+from ...utils.snapshot import LazyFile, map_arrays, pmf_key, write_arrays
+
+# The kill table to load on first use, if any
+KILL_TABLE_ENV = 'WARHAMMER_STATS_KILL_TABLE'
+
+
+def row_key(wounds: int, damage: PMF, mortals: PMF) -> str:
+    return json.dumps([wounds, pmf_key(damage), pmf_key(mortals)])
+
+
+class KillTable:
+    """
+    Kill distributions indexed by row (wounds, damage and mortals) and number of dice
+    """
+    def __init__(self, rows: dict[str, int], offsets: ndarray, lengths: ndarray, values: ndarray) -> None:
+        self.rows = rows
+        self.offsets = offsets
+        self.lengths = lengths
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def max_dice(self) -> int:
+        return self.offsets.shape[1] - 1
+
+    def row(self, wounds: int, damage: PMF, mortals: PMF) -> Optional[int]:
+        """
+        The row holding the kill distributions for the profile, if there is one
+        """
+        return self.rows.get(row_key(wounds, damage, mortals))
+
+    def get(self, row: int, dice: int) -> Optional[PMF]:
+        """
+        The kill distribution for a number of dice, or None if it is beyond the row
+        """
+        if dice > self.max_dice or self.lengths[row, dice] == 0:
+            return None
+        offset = self.offsets[row, dice]
+        return PMF([float(x) for x in self.values[offset:offset + self.lengths[row, dice]]])
+
+    @classmethod
+    def build(cls, rows: list[tuple[int, PMF, PMF, list[PMF]]]) -> KillTable:
+        """
+        Build the table from the wounds, damage and mortals of each row and the kill
+        distributions for 0 up to its maximum number of dice
+        """
+        max_dice = max(len(kills) for *_, kills in rows) - 1
+        offsets = zeros((len(rows), max_dice + 1), dtype=int64)
+        lengths = zeros((len(rows), max_dice + 1), dtype=int64)
+        values: list[float] = []
+        keys = {}
+        for i, (wounds, damage, mortals, kills) in enumerate(rows):
+            keys[row_key(wounds, damage, mortals)] = i
+            for dice, dist in enumerate(kills):
+                offsets[i, dice], lengths[i, dice] = len(values), len(dist)
+                values += dist.values
+        return cls(keys, offsets, lengths, array(values, dtype=float))
+
+    def save(self, path: str) -> None:
+        write_arrays(path, self.rows, [self.offsets, self.lengths, self.values])
+
+    @classmethod
+    def load(cls, path: str) -> KillTable:
+        """
+        Load the row index of a kill table file and memory-map the distributions
+        """
+        rows, (offsets, lengths, values) = map_arrays(path)
+        return cls(rows, offsets, lengths, values)
+
+
+_active = LazyFile(KILL_TABLE_ENV, KillTable.load)
+
+
+def use_kill_table(table: Optional[KillTable]) -> None:
+    """
+    Set the kill table used to look up kill distributions, None turns the lookups off
+    """
+    _active.use(table)
+
+
+def active_kill_table() -> Optional[KillTable]:
+    """
+    The kill table in use, loading the one named by the environment variable on first use
+    """
+    return _active.get()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
+
+from ...utils.memo import DiceMemo
 from ...utils.modifier_collection import ModifierCollection
 from ...utils.pmf import PMFCollection
 from ...utils.target import Target
@@ -14,12 +17,19 @@ class PhaseBase:
         This is just a base class that contains a number of common methods
 
     Args:
-        attack (Attack): A reference to the attack being made
+        weapon (Weapon): The weapon making the attack
+        target (Target): The target of the attack
+        modifiers (ModifierCollection): The combined modifiers of the weapon and target
+        memo (DiceMemo): Shared store of the dice distributions derived for the attack
+        pool (Executor): Evaluates the slices of each roll concurrently, if given
     """
-    def __init__(self, weapon: Weapon, target: Target, modifiers: ModifierCollection):
+    def __init__(self, weapon: Weapon, target: Target, modifiers: ModifierCollection,
+                 memo: Optional[DiceMemo] = None, pool: Optional[Executor] = None):
         self.weapon = weapon
         self.target = target
         self.modifiers = modifiers
+        self.memo = memo if memo is not None else DiceMemo()
+        self.pool = pool
         self._thresh_mod: Optional[int] = None
 
     @property
@@ -15,4 +15,6 @@ class SavePhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
@@ -1,16 +1,21 @@
 from .phase import PhaseBase
 from ..results import WoundPhaseResults
-from ..rolls.wound_rolls import (SuccessfulWoundRoll, ExtraWoundRollRoll, ExtraAutomaticWoundRoll, MortalWoundRoll, SelfWoundRoll)
+from ..rolls.wound_rolls import (SuccessfulWoundRoll, ExtraWoundRollRoll, ExtraAutomaticWoundRoll, MortalWoundRoll, SelfWoundRoll,
+                                 WoundPhaseKernel)
 
 
 class WoundPhase(PhaseBase):
     def results(self):
-        return WoundPhaseResults(
-            successful_wound_dist=self.successful_wound_roll.calc_dist(),
-            extra_wound_roll_dist=self.extra_wound_roll_roll.calc_dist(),
-            extra_automatic_wound_dist=self.extra_automatic_wound_roll.calc_dist(),
-            mortal_wound_dist=self.mortal_wound_roll.calc_dist(),
-            self_wound_dist=self.self_wound_roll.calc_dist(),
+        return WoundPhaseResults(**self.kernel.calc_dists())
+
+    @property
+    def kernel(self):
+        return WoundPhaseKernel(
+            weapon=self.weapon,
+            target=self.target,
+            modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -19,6 +24,8 @@ class WoundPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -27,6 +34,8 @@ class WoundPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -35,6 +44,8 @@ class WoundPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -43,6 +54,8 @@ class WoundPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
 
     @property
@@ -51,4 +64,6 @@ class WoundPhase(PhaseBase):
             weapon=self.weapon,
             target=self.target,
             modifiers=self.modifiers,
+            memo=self.memo,
+            pool=self.pool,
         )
@@ -1,27 +1,195 @@
 from __future__ import annotations
 
-import inspect
+from typing import Type, TypeVar
 
+from numpy import abs as np_abs, fft, ndarray, ones, zeros
+
+from ..utils.approximation import approximate_compound
 from ..utils.pmf import PMF
+from ..utils.progeny import MAX_DESCENDANTS, PROGENY_EPSILON, cap_tail, resolve_generations
+
+R = TypeVar('R', bound='ResultsBase')
+
+def compound_transform(rows: ndarray, lengths: list[int], counts: list[tuple[int, float]]) -> ndarray:
+    """
+    Return the fourier transform of each row compounded by the (count, probability) pairs. The
+    count distribution's generating function is evaluated with Horner's method, each pass adding
+    one more convolution of the rows.
+    """
+    fft_of_rows = fft.fft(rows, n=max(lengths))
+    probs = dict(counts)
+    fft_of_result = zeros(fft_of_rows.shape, dtype=complex)
+    for count in range(counts[-1][0], -1, -1):
+        fft_of_result = fft_of_result * fft_of_rows + probs.get(count, 0.0)
+    return fft_of_result
+
+
+def descendants_dist(offspring_dist: PMF, epsilon: float = PROGENY_EPSILON) -> PMF:
+    """
+    The distribution of the total number of rolls descended from a single roll, where every roll
+    generates extra rolls according to offspring_dist. This is the total progeny of a branching
+    process, found as the fixed point of D = sum of K copies of (1 + D) where K ~ offspring_dist.
+
+    Generations are added until the distribution changes by less than epsilon. The far tail,
+    once it holds less than epsilon, is folded into the largest count kept, and processes that
+    never die out are counted as MAX_DESCENDANTS, so the distribution keeps all of its mass.
+    """
+    counts = [(count, prob) for count, prob in enumerate(offspring_dist.values) if prob > 0.0]
+
+    def generation(descendants: ndarray) -> ndarray:
+        # Each extra roll counts itself plus its own descendants
+        shifted = zeros((1, len(descendants) + 1))
+        shifted[0, 1:] = descendants
+        lengths = [1 + counts[-1][0] * len(descendants)]
+        updated = np_abs(fft.ifft(compound_transform(shifted, lengths, counts)).real[0])
+        tail = updated[::-1].cumsum()[::-1]
+        updated = cap_tail(updated, (min(max(1, int((tail >= epsilon).sum())), MAX_DESCENDANTS + 1),))
+        # When the rolls can go on forever any mass lost to rounding grows each generation, so
+        # it is counted with the rolls that never die out
+        updated[-1] += 1.0 - updated.sum()
+        return updated
+
+    def change(updated: ndarray, descendants: ndarray) -> float:
+        difference = np_abs(updated[:len(descendants)] - descendants[:len(updated)]).sum()
+        return difference + updated[len(descendants):].sum() + descendants[len(updated):].sum()
+
+    return PMF(list(resolve_generations(generation, ones(1), change, epsilon)))
+
+
+class ResultField:
+    """Exposes a single row of the results array as a PMF"""
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.get_dist(self.index)
+
+    def __set__(self, instance, dist: PMF) -> None:
+        instance.set_dist(self.index, dist)
 
 
 class ResultsBase:
+    """The base class for the results of an attack or a phase of an attack
+
+    Note:
+        Subclasses declare the names of their distributions in ``fields``. The distributions
+        are stored as the rows of a single array so that ``multiply_by``, ``merge`` and
+        ``combine`` transform every field in one batched FFT.
+
+    Args:
+        *dists (PMF): The distributions, in the order declared in ``fields``
+    """
+    fields: tuple[str, ...] = ()
+    # The field counting extra rolls generated by the roll, and the fields extra rolls don't produce
+    extra_roll_field: str = ''
+    extra_roll_ignores: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for index, name in enumerate(cls.fields):
+            setattr(cls, name, ResultField(index))
+
+    def __init__(self, *dists: PMF) -> None:
+        self.lengths = [len(dist) for dist in dists]
+        self.rows = zeros((len(dists), max(self.lengths)))
+        for i, dist in enumerate(dists):
+            self.rows[i, :len(dist)] = dist.values
+
     @classmethod
-    def merge(cls, left, right):
-        if not (isinstance(left, cls) and isinstance(right, cls)):
-            raise TypeError('incorrect class types')
+    def from_rows(cls: Type[R], rows: ndarray, lengths: list[int]) -> R:
+        """
+        Build the results directly from an array of distributions
+        """
+        results = cls.__new__(cls)
+        results.rows = rows
+        results.lengths = lengths
+        return results
 
-        input_names = [k for k in inspect.signature(cls.__init__).parameters.keys() if k != 'self']
+    @classmethod
+    def from_transform(cls: Type[R], transformed: ndarray, lengths: list[int]) -> R:
+        """
+        Build the results from the fourier transform of the rows, trimmed to the lengths
+        """
+        rows = np_abs(fft.ifft(transformed).real[:, :max(lengths)])
+        for i, length in enumerate(lengths):
+            rows[i, length:] = 0.0
+        return cls.from_rows(rows, lengths)
 
-        merged_pmfs = {k: PMF.convolve_many([getattr(left, k), getattr(right, k)]) for k in input_names if isinstance(getattr(left, k), PMF)}
+    def get_dist(self, index: int) -> PMF:
+        """
+        Fetch the distribution stored in a row
+        """
+        return PMF(list(self.rows[index, :self.lengths[index]]))
 
-        return cls(
-            **merged_pmfs
-        )
+    def set_dist(self, index: int, dist: PMF) -> None:
+        """
+        Replace the distribution stored in a row, widening the array if needed
+        """
+        if len(dist) > self.rows.shape[1]:
+            rows = zeros((self.rows.shape[0], len(dist)))
+            rows[:, :self.rows.shape[1]] = self.rows
+            self.rows = rows
+        self.rows[index, :] = 0.0
+        self.rows[index, :len(dist)] = dist.values
+        self.lengths = self.lengths[:index] + [len(dist)] + self.lengths[index + 1:]
+
+    def multiply_by(self: R, other_pmf: PMF) -> R:
+        """
+        Compound every field by a distribution of the number of times it occurs. The count
+        distribution's generating function is evaluated in the frequency space of all rows at once.
+        """
+        return self.compound([(count, prob) for count, prob in enumerate(other_pmf.values) if not PMF.is_null_prob(prob)])
+
+    def approximate_by(self: R, other_pmf: PMF) -> tuple[R, float]:
+        """
+        Approximate multiply_by with a skew-corrected normal for every field, for when the
+        number of dice is large. Also returns an estimate of the error in the distributions.
+        """
+        rows, lengths, error = approximate_compound(self.rows, self.lengths, other_pmf)
+        return self.from_rows(rows, lengths), error
+
+    def compound(self: R, counts: list[tuple[int, float]]) -> R:
+        """
+        Compound every field by a list of (count, probability) pairs
+        """
+        lengths = [1 + counts[-1][0] * (length - 1) for length in self.lengths]
+        return self.from_transform(compound_transform(self.rows, lengths, counts), lengths)
+
+    @classmethod
+    def merge(cls: Type[R], left: R, right: R) -> R:
+        return cls.combine([left, right])
+
+    def extra_roll_results(self: R, epsilon: float = PROGENY_EPSILON) -> R:
+        """
+        The results of every extra roll descended from a single roll. Each extra roll contributes
+        the fields it can generate, and the extra roll field holds the total number of extra rolls.
+        """
+        descendants = descendants_dist(getattr(self, self.extra_roll_field), epsilon)
+        child = self.from_rows(self.rows.copy(), self.lengths)
+        for name in self.extra_roll_ignores + (self.extra_roll_field,):
+            setattr(child, name, PMF.static(0))
+        # Keep every count, the long tail of small probabilities still carries mass
+        results = child.compound([(count, prob) for count, prob in enumerate(descendants.values) if prob > 0.0])
+        setattr(results, self.extra_roll_field, descendants)
+        return results
+
+    def with_recursive(self: R, epsilon: float = PROGENY_EPSILON) -> R:
+        """
+        Add the results of the extra rolls, to any depth, to the results of a single roll
+        """
+        extra_results = self.extra_roll_results(epsilon)
+        merged = self.merge(self, extra_results)
+        # The total count of extra rolls already includes the roll's own extra rolls
+        setattr(merged, self.extra_roll_field, getattr(extra_results, self.extra_roll_field))
+        return merged
 
     def repr_items(self):
-        return [f'  {k:30s} - avg: {round(v.mean(), 4):.4f}, std: {round(v.std(), 4):.4f}' for k, v in self.__dict__.items() if isinstance(v, PMF)]
+        return [f'  {k:30s} - avg: {round(v.mean(), 4):.4f}, std: {round(v.std(), 4):.4f}' for k, v in self.items()]
 
+    def items(self) -> list[tuple[str, PMF]]:
+        return [(name, self.get_dist(i)) for i, name in enumerate(self.fields)]
 
     def __repr__(self) -> str:
         output = [
@@ -32,44 +200,60 @@ class ResultsBase:
         return '\n'.join(output)
 
     @classmethod
-    def combine(cls, results: list[ResultsBase]) -> ResultsBase:
+    def combine(cls: Type[R], results: list[R]) -> R:
         if not all(isinstance(r, cls) for r in results):
             raise TypeError('incorrect class types')
 
-        input_names = [k for k in inspect.signature(cls.__init__).parameters.keys() if k != 'self']
+        lengths = [1 + sum(r.lengths[i] - 1 for r in results) for i in range(len(cls.fields))]
+        fft_of_result = fft.fft(results[0].rows, n=max(lengths))
+        for result in results[1:]:
+            fft_of_result = fft_of_result * fft.fft(result.rows, n=max(lengths))
+        return cls.from_transform(fft_of_result, lengths)
 
-        merged_pmfs = {k: PMF.convolve_many([getattr(r, k) for r in results]) for k in input_names if isinstance(getattr(results[0], k), PMF)}
 
-        return cls(
-            **merged_pmfs
-        )
+class AttackResults(ResultsBase):
+    """Holds the final results of an attack
 
+    Args:
+        error (float): An estimate of the largest error in the cumulative distributions when
+            the attack was approximated, zero when it was computed exactly
+    """
+    fields = ('damage_dist', 'mortal_wound_dist', 'self_wound_dist', 'total_damage_dist', 'kills_dist')
+    error = 0.0
 
-class AttackResults(ResultsBase):
-    def __init__(self, damage_dist, mortal_wound_dist, self_wound_dist, total_damage_dist, kills_dist):
-        self.damage_dist = damage_dist
-        self.mortal_wound_dist = mortal_wound_dist
-        self.self_wound_dist = self_wound_dist
-        self.total_damage_dist = total_damage_dist
-        self.kills_dist = kills_dist
+    def __init__(self, damage_dist, mortal_wound_dist, self_wound_dist, total_damage_dist, kills_dist, error: float = 0.0):
+        super().__init__(damage_dist, mortal_wound_dist, self_wound_dist, total_damage_dist, kills_dist)
+        self.error = error
+
+    @classmethod
+    def combine(cls, results: list[AttackResults]) -> AttackResults:
+        combined = super().combine(results)
+        # The error in the distribution of a sum is at most the sum of the errors
+        combined.error = min(sum(r.error for r in results), 1.0)
+        return combined
 
     def repr_items(self):
-        return [
+        items = [
             f'  {"Mortal Wounds":20s} - avg: {self.mortal_wound_dist.mean():.4f}, std: {self.mortal_wound_dist.std():.4f}',
             f'  {"Self Wounds":20s} - avg: {self.self_wound_dist.mean():.4f}, std: {self.self_wound_dist.std():.4f}',
             f'  {"Total Damage":20s} - avg: {self.total_damage_dist.mean():.4f}, std: {self.total_damage_dist.std():.4f}',
             f'  {"Kills":20s} - avg: {self.kills_dist.mean():.4f}, std: {self.kills_dist.std():.4f}',
         ]
+        if self.error:
+            items.append(f'  {"Approximation Error":20s} - {self.error:.4f}')
+        return items
 
 
-class AttacksPhaseResults:
+class AttacksPhaseResults(ResultsBase):
     """Holds the results of determining the number of attacks.
 
     Args:
         shot_dist (PMF): The distribution of shots to be made
     """
+    fields = ('attack_number_dist',)
+
     def __init__(self, attack_number_dist: PMF):
-        self.attack_number_dist = attack_number_dist
+        super().__init__(attack_number_dist)
 
 
 class HitPhaseResults(ResultsBase):
@@ -82,14 +266,15 @@ class HitPhaseResults(ResultsBase):
         mortal_wound_dist (PMF): The distribution of mortal wounds generated
         self_inflicted_dist (PMF): The distribution of wounds inflicted on the attacker
     """
+    fields = ('successful_hit_dist', 'extra_hit_roll_dist', 'extra_automatic_wound_dist',
+              'extra_automatic_hit_dist', 'mortal_wound_dist', 'self_wound_dist')
+    extra_roll_field = 'extra_hit_roll_dist'
+    extra_roll_ignores = ('successful_hit_dist', 'extra_automatic_hit_dist', 'extra_automatic_wound_dist')
+
     def __init__(self, successful_hit_dist: PMF, extra_hit_roll_dist: PMF, extra_automatic_wound_dist: PMF,
                  extra_automatic_hit_dist: PMF, mortal_wound_dist: PMF, self_wound_dist: PMF) -> None:
-        self.successful_hit_dist = successful_hit_dist
-        self.extra_hit_roll_dist = extra_hit_roll_dist
-        self.extra_automatic_wound_dist = extra_automatic_wound_dist
-        self.extra_automatic_hit_dist = extra_automatic_hit_dist
-        self.mortal_wound_dist = mortal_wound_dist
-        self.self_wound_dist = self_wound_dist
+        super().__init__(successful_hit_dist, extra_hit_roll_dist, extra_automatic_wound_dist,
+                         extra_automatic_hit_dist, mortal_wound_dist, self_wound_dist)
 
     @property
     def combined_hit_dists(self) -> PMF:
@@ -112,40 +297,6 @@ class HitPhaseResults(ResultsBase):
             self_wound_dist=PMF.static(0),
         )
 
-    def multiply_by(self, other_pmf: PMF) -> HitPhaseResults:
-        pmfs: dict = {
-            'successful_hit_dist': [],
-            'extra_hit_roll_dist': [],
-            'extra_automatic_wound_dist': [],
-            'extra_automatic_hit_dist': [],
-            'mortal_wound_dist': [],
-            'self_wound_dist': [],
-        }
-
-        for dice_count, event_prob in enumerate(other_pmf.values):
-            # If the probability is zero then no-op
-            if PMF.is_null_prob(event_prob):
-                continue
-
-            pmfs['successful_hit_dist'].append(PMF.convolve_many([self.successful_hit_dist] * dice_count) * event_prob)
-            pmfs['extra_hit_roll_dist'].append(PMF.convolve_many([self.extra_hit_roll_dist] * dice_count) * event_prob)
-            pmfs['extra_automatic_wound_dist'].append(PMF.convolve_many([self.extra_automatic_wound_dist] * dice_count) * event_prob)
-            pmfs['extra_automatic_hit_dist'].append(PMF.convolve_many([self.extra_automatic_hit_dist] * dice_count) * event_prob)
-            pmfs['mortal_wound_dist'].append(PMF.convolve_many([self.mortal_wound_dist] * dice_count) * event_prob)
-            pmfs['self_wound_dist'].append(PMF.convolve_many([self.self_wound_dist] * dice_count) * event_prob)
-
-        return HitPhaseResults(**{k: PMF.flatten(pmfs[k]) for k in pmfs})
-
-    def recursive_results(self) -> HitPhaseResults:
-        results = self.multiply_by(self.extra_hit_roll_dist)
-        results.successful_hit_dist = PMF.static(0)
-        results.extra_automatic_hit_dist = PMF.static(0)
-        results.extra_automatic_wound_dist = PMF.static(0)
-        return results
-
-    def with_recursive(self):
-        return self.merge(self, self.recursive_results())
-
 
 class WoundPhaseResults(ResultsBase):
     """Holds the results from the to wound phase of the attack
@@ -154,44 +305,15 @@ class WoundPhaseResults(ResultsBase):
         wounds_dist (PMF): The distribution of successful wounds
         mortal_wound_dist (PMF): The distribution of mortal wounds generated
     """
+    fields = ('successful_wound_dist', 'extra_wound_roll_dist', 'extra_automatic_wound_dist',
+              'mortal_wound_dist', 'self_wound_dist')
+    extra_roll_field = 'extra_wound_roll_dist'
+    extra_roll_ignores = ('extra_automatic_wound_dist',)
+
     def __init__(self, successful_wound_dist: PMF, extra_wound_roll_dist: PMF, extra_automatic_wound_dist: PMF,
                  mortal_wound_dist: PMF, self_wound_dist: PMF):
-        self.successful_wound_dist = successful_wound_dist
-        self.extra_wound_roll_dist = extra_wound_roll_dist
-        self.extra_automatic_wound_dist = extra_automatic_wound_dist
-        self.mortal_wound_dist = mortal_wound_dist
-        self.self_wound_dist = self_wound_dist
-
-    def multiply_by(self, other_pmf: PMF) -> WoundPhaseResults:
-        pmfs: dict = {
-            'successful_wound_dist': [],
-            'extra_wound_roll_dist': [],
-            'extra_automatic_wound_dist': [],
-            'mortal_wound_dist': [],
-            'self_wound_dist': [],
-        }
-
-        for dice_count, event_prob in enumerate(other_pmf.values):
-            # If the probability is zero then no-op
-            if PMF.is_null_prob(event_prob):
-                continue
-
-            pmfs['successful_wound_dist'].append(PMF.convolve_many([self.successful_wound_dist] * dice_count) * event_prob)
-            pmfs['extra_wound_roll_dist'].append(PMF.convolve_many([self.extra_wound_roll_dist] * dice_count) * event_prob)
-            pmfs['extra_automatic_wound_dist'].append(PMF.convolve_many([self.extra_automatic_wound_dist] * dice_count) * event_prob)
-            pmfs['mortal_wound_dist'].append(PMF.convolve_many([self.mortal_wound_dist] * dice_count) * event_prob)
-            pmfs['self_wound_dist'].append(PMF.convolve_many([self.self_wound_dist] * dice_count) * event_prob)
-
-        return WoundPhaseResults(**{k: PMF.flatten(pmfs[k]) for k in pmfs})
-
-    def recursive_results(self) -> WoundPhaseResults:
-        results: WoundPhaseResults = self.multiply_by(self.extra_wound_roll_dist)
-        results.extra_wound_roll_dist = PMF.static(0)
-        results.extra_automatic_wound_dist = PMF.static(0)
-        return results
-
-    def with_recursive(self):
-        return self.merge(self, self.recursive_results())
+        super().__init__(successful_wound_dist, extra_wound_roll_dist, extra_automatic_wound_dist,
+                         mortal_wound_dist, self_wound_dist)
 
 
 class SavePhaseResults(ResultsBase):
@@ -201,22 +323,10 @@ class SavePhaseResults(ResultsBase):
         wounds_dist (PMF): The distribution of successful wounds
         mortal_wound_dist (PMF): The distribution of mortal wounds generated
     """
-    def multiply_by(self, other_pmf: PMF) -> SavePhaseResults:
-        pmfs: dict = {
-            'failed_armour_save_dist': [],
-        }
-
-        for dice_count, event_prob in enumerate(other_pmf.values):
-            # If the probability is zero then no-op
-            if PMF.is_null_prob(event_prob):
-                continue
-
-            pmfs['failed_armour_save_dist'].append(PMF.convolve_many([self.failed_armour_save_dist] * dice_count) * event_prob)
-
-        return SavePhaseResults(**{k: PMF.flatten(pmfs[k]) for k in pmfs})
+    fields = ('failed_armour_save_dist',)
 
     def __init__(self, failed_armour_save_dist: PMF):
-        self.failed_armour_save_dist = failed_armour_save_dist
+        super().__init__(failed_armour_save_dist)
 
 
 class DamagePhaseResults(ResultsBase):
@@ -226,44 +336,20 @@ class DamagePhaseResults(ResultsBase):
         wounds_dist (PMF): The distribution of successful wounds
         mortal_wound_dist (PMF): The distribution of mortal wounds generated
     """
-    def multiply_by(self, other_pmf: PMF) -> DamagePhaseResults:
-        pmfs: dict = {
-            'damage_dist': [],
-        }
-
-        for dice_count, event_prob in enumerate(other_pmf.values):
-            # If the probability is zero then no-op
-            if PMF.is_null_prob(event_prob):
-                continue
-
-            pmfs['damage_dist'].append(PMF.convolve_many([self.damage_dist] * dice_count) * event_prob)
-
-        return DamagePhaseResults(**{k: PMF.flatten(pmfs[k]) for k in pmfs})
+    fields = ('damage_dist',)
 
     def __init__(self, damage_dist: PMF):
-        self.damage_dist = damage_dist
+        super().__init__(damage_dist)
 
 
-class KillPhaseResults:
+class KillPhaseResults(ResultsBase):
     """Holds the results from the kill phase
 
     Args:
         wounds_dist (PMF): The distribution of successful wounds
         mortal_wound_dist (PMF): The distribution of mortal wounds generated
     """
-    def multiply_by(self, other_pmf: PMF) -> KillPhaseResults:
-        pmfs: dict = {
-            'kill_dist': [],
-        }
-
-        for dice_count, event_prob in enumerate(other_pmf.values):
-            # If the probability is zero then no-op
-            if PMF.is_null_prob(event_prob):
-                continue
-
-            pmfs['kill_dist'].append(PMF.convolve_many([self.kill_dist] * dice_count) * event_prob)
-
-        return KillPhaseResults(**{k: PMF.flatten(pmfs[k]) for k in pmfs})
+    fields = ('kill_dist',)
 
     def __init__(self, kill_dist: PMF):
-        self.kill_dist = kill_dist
+        super().__init__(kill_dist)
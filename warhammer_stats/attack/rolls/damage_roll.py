@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+from typing import Hashable
+
 from .roll import RollBase
 from ...utils.pmf import PMF, PMFCollection
 
 class DamageRollBase(RollBase):
     def split_generator(self):
         return self.modifiers.split_damage_roll(
-            self.hit_dice_dists(self.modifiers).convolve(),
+            self.hit_dice_dist(self.modifiers),
             self.hit_thresh_modifier(self.modifiers),
-            self.wound_dice_dists(self.modifiers).convolve(),
+            self.wound_dice_dist(self.modifiers),
             self.wound_thresh_modifier(self.modifiers)
         )
 
+    def effect_key(self, modifiers) -> Hashable:
+        # Only the damage modifiers change the damage dice
+        return modifiers.dice_fingerprint(modifiers.damage_mods)
+
 
 class DamageRoll(DamageRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from ...utils.pmf import PMF, PMFCollection
+from .kernel import FAILURE, SUCCESS, FaceTable, PhaseKernelBase
 from .roll import RollBase
 
 
@@ -16,7 +17,7 @@ class SuccessfulHitRoll(HitRollBase):
 
 class ExtraAutomaticHitRoll(HitRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        hit_dist = self.hit_dice_dists(modifiers).convolve()
+        hit_dist = self.hit_dice_dist(modifiers)
         return PMFCollection([
             modifiers.extra_automatic_hit_dist_modifiable().mul_pmf(hit_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.extra_automatic_hit_dist_unmodifiable().mul_pmf(hit_dist),
@@ -25,7 +26,7 @@ class ExtraAutomaticHitRoll(HitRollBase):
 
 class ExtraAutomaticWoundRoll(HitRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        hit_dist = self.hit_dice_dists(modifiers).convolve()
+        hit_dist = self.hit_dice_dist(modifiers)
         return PMFCollection([
             modifiers.hit_generated_extra_automatic_wound_dist_modifiable().mul_pmf(hit_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.hit_generated_extra_automatic_wound_dist_unmodifiable().mul_pmf(hit_dist),
@@ -34,7 +35,7 @@ class ExtraAutomaticWoundRoll(HitRollBase):
 
 class ExtraHitRollRoll(HitRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        hit_dist = self.hit_dice_dists(modifiers).convolve()
+        hit_dist = self.hit_dice_dist(modifiers)
         return PMFCollection([
             modifiers.extra_hit_roll_dist_modifiable().mul_pmf(hit_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.extra_hit_roll_dist_unmodifiable().mul_pmf(hit_dist),
@@ -43,7 +44,7 @@ class ExtraHitRollRoll(HitRollBase):
 
 class MortalWoundRoll(HitRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        hit_dist = self.hit_dice_dists(modifiers).convolve()
+        hit_dist = self.hit_dice_dist(modifiers)
         return PMFCollection([
             modifiers.hit_generated_mortal_wounds_dist_modifiable().mul_pmf(hit_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.hit_generated_mortal_wounds_dist_unmodifiable().mul_pmf(hit_dist),
@@ -59,3 +60,36 @@ class SelfWoundRoll(HitRollBase):
             return self.hit_dice_dists(modifiers).convert_binomial_less_than(self_wound_thresh).convolve()
         else:
             return PMF.static(0)
+
+
+class HitPhaseKernel(PhaseKernelBase, HitRollBase):
+    outputs = ('successful_hit_dist', 'extra_hit_roll_dist', 'extra_automatic_wound_dist',
+               'extra_automatic_hit_dist', 'mortal_wound_dist', 'self_wound_dist')
+
+    def face_table(self, modifiers) -> FaceTable:
+        hit_dist = self.hit_dice_dist(modifiers)
+        hit_thresh = self.hit_thresh_modifiable(modifiers)
+        # Generators on a modifiable roll look at the face shifted by the hit modifier
+        shift = self.hit_thresh_modifier(self.modifiers)
+        generators = [
+            (modifiers.extra_hit_roll_dist_modifiable(), modifiers.extra_hit_roll_dist_unmodifiable()),
+            (modifiers.hit_generated_extra_automatic_wound_dist_modifiable(), modifiers.hit_generated_extra_automatic_wound_dist_unmodifiable()),
+            (modifiers.extra_automatic_hit_dist_modifiable(), modifiers.extra_automatic_hit_dist_unmodifiable()),
+            (modifiers.hit_generated_mortal_wounds_dist_modifiable(), modifiers.hit_generated_mortal_wounds_dist_unmodifiable()),
+        ]
+        thresh_self_wounds = modifiers.hit_self_wound_thresh()
+        self_wound_thresh = max(thresh_self_wounds + self.hit_thresh_modifier(modifiers), 0)
+
+        table = []
+        for face, face_prob in enumerate(hit_dist.values):
+            mod_face = max(face + shift, 0)
+            if not thresh_self_wounds:
+                self_wound = PMF.static(0)
+            else:
+                self_wound = SUCCESS if face < self_wound_thresh else FAILURE
+            table.append((face_prob, (
+                SUCCESS if face >= hit_thresh else FAILURE,
+                *[self.generated(modifiable, unmodifiable, mod_face, face) for modifiable, unmodifiable in generators],
+                self_wound,
+            )))
+        return table
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from itertools import product
+
+from ...utils.pmf import PMF, PMFCollection
+from .roll import RollBase
+
+FaceTable = list[tuple[float, tuple[PMF, ...]]]
+
+SUCCESS = PMF([0.0, 1.0])
+FAILURE = PMF([1.0, 0.0])
+
+
+class PhaseKernelBase(RollBase):
+    """The base class for evaluating every output of a phase in a single pass
+
+    Note:
+        Subclasses build a table mapping each face of the modified die to the vector of
+        effects that face produces, one PMF per name in ``outputs``. The per-die distribution
+        of every output is then reduced from that one table rather than each output walking
+        the modified die on its own.
+    """
+    outputs: tuple[str, ...] = ()
+
+    def face_table(self, modifiers) -> FaceTable:
+        """Return a list of (probability, effects) pairs, one for each face of the die"""
+        return []
+
+    def face_tables(self):
+        """Yield the face table of every distinct split of the roll and its probability"""
+        effects = self.collect_effects(self.split_generator())
+        for (prob, _), table in zip(effects, self.map_effects(self.face_table, effects)):
+            yield prob, table
+
+    def calc_dists(self) -> dict[str, PMF]:
+        """Reduce the face tables into the per-die distribution of each output"""
+        weighted: list[list[PMF]] = [[] for _ in self.outputs]
+        for prob, table in self.face_tables():
+            for face_prob, effects in table:
+                for dists, effect in zip(weighted, effects):
+                    dists.append(effect * (prob * face_prob))
+        return {name: PMF.flatten(dists) for name, dists in zip(self.outputs, weighted)}
+
+    def calc_joint(self) -> dict[tuple[int, ...], float]:
+        """The joint per-die distribution of the outputs, mapping a tuple of output values
+        (ordered as ``outputs``) to its probability
+        """
+        joint: defaultdict = defaultdict(float)
+        for prob, table in self.face_tables():
+            for face_prob, effects in table:
+                if PMF.is_null_prob(face_prob):
+                    continue
+                supports = [[(value, p) for value, p in enumerate(effect.values) if not PMF.is_null_prob(p)] for effect in effects]
+                for outcome in product(*supports):
+                    outcome_prob = prob * face_prob
+                    for _, p in outcome:
+                        outcome_prob *= p
+                    joint[tuple(value for value, _ in outcome)] += outcome_prob
+        return dict(joint)
+
+    @staticmethod
+    def generated(modifiable: PMFCollection, unmodifiable: PMFCollection, mod_face: int, face: int) -> PMF:
+        """The effects generated by a face, combining generators on the modified and unmodified value"""
+        mod_dist = modifiable.get(mod_face, PMF.static(0))
+        unmod_dist = unmodifiable.get(face, PMF.static(0))
+        if len(mod_dist) == 1:
+            return unmod_dist
+        if len(unmod_dist) == 1:
+            return mod_dist
+        return PMF.convolve_many([mod_dist, unmod_dist])
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
+from typing import Any, Callable, Hashable, Optional
+
+from ...utils.memo import DiceMemo
 from ...utils.modifier_collection import ModifierCollection
 from ...utils.pmf import PMF, PMFCollection
 from ...utils.target import Target
@@ -12,19 +16,53 @@ class RollBase:
         This is just a base class that contains a number of common methods
 
     Args:
-        attack (Attack): A reference to the attack being made
+        weapon (Weapon): The weapon making the attack
+        target (Target): The target of the attack
+        modifiers (ModifierCollection): The combined modifiers of the weapon and target
+        memo (DiceMemo): Shared store of the dice distributions derived for the attack
+        pool (Executor): Evaluates the slices of the roll concurrently, if given
     """
-    def __init__(self, weapon: Weapon, target: Target, modifiers: ModifierCollection):
+    def __init__(self, weapon: Weapon, target: Target, modifiers: ModifierCollection,
+                 memo: Optional[DiceMemo] = None, pool: Optional[Executor] = None):
         self.weapon = weapon
         self.target = target
         self.modifiers = modifiers
+        self.memo = memo if memo is not None else DiceMemo()
+        self.pool = pool
         self._thresh_mod = None
 
     def calc_dist(self) -> PMF:
-        dists = []
-        for prob, modifiers in self.split_generator():
-            dists.append(self.calc_sub_dist(modifiers) * prob)
-        return PMF.flatten(dists)
+        effects = self.collect_effects(self.split_generator())
+        sub_dists = self.map_effects(self.calc_sub_dist, effects)
+        return PMF.flatten([sub_dist * prob for sub_dist, (prob, _) in zip(sub_dists, effects)])
+
+    def map_effects(self, func: Callable[[ModifierCollection], Any], effects: list) -> list:
+        """Apply func to the modifiers of each effect, on the pool if there is one. The
+        results are always in the order of the effects so they are reduced the same way
+        """
+        modifiers = [mods for _, mods in effects]
+        if self.pool is None or len(modifiers) < 2:
+            return [func(mods) for mods in modifiers]
+        return list(self.pool.map(func, modifiers))
+
+    def collect_effects(self, slices) -> list:
+        """Merge the probability of slices that have the same effect on this roll so that
+        calc_sub_dist is only evaluated once for each distinct effect
+        """
+        effects: dict = {}
+        for prob, modifiers in slices:
+            key = self.effect_key(modifiers)
+            if key in effects:
+                effects[key][0] += prob
+            else:
+                effects[key] = [prob, modifiers]
+        return list(effects.values())
+
+    def effect_key(self, modifiers) -> Hashable:
+        """A key that is equal for any two sets of modifiers that produce the same sub
+        distribution for this roll
+        """
+        return modifiers
 
     def split_generator(self):
         return [[1.0, self.modifiers]]
@@ -40,19 +78,33 @@ class RollBase:
         """
         # The bare threshold to hit is the weapons to hit value
         thresh = self.weapon.bs
+        mod_thresh = self.hit_thresh_modifiable(modifiers)
 
-        # Create a dice distribution for 'dice_count' d6 dice
-        dice_dists = PMFCollection.mdn(1, 6)
+        # Apply modifiers to a dice distribution for a single d6
+        return self.memo.get(
+            ('hit', 'dice', self.memo.fingerprint(self.modifiers.hit_mods), thresh, mod_thresh),
+            lambda: self.modifiers.modify_hit_dice(PMFCollection.mdn(1, 6), thresh, mod_thresh),
+        )
 
-        # Apply modifiers to the dice distribution
-        return self.modifiers.modify_hit_dice(dice_dists, thresh, self.hit_thresh_modifiable(modifiers))
+    def hit_dice_dist(self, modifiers) -> PMF:
+        """The convolved distribution of the modified hit dice"""
+        return self.memo.get(
+            ('hit', 'dist', self.memo.fingerprint(self.modifiers.hit_mods), self.weapon.bs, self.hit_thresh_modifiable(modifiers)),
+            lambda: self.hit_dice_dists(modifiers).convolve(),
+        )
 
     def hit_thresh_modifiable(self, modifiers) -> int:
-        return modifiers.modify_hit_thresh(self.weapon.bs)
+        return self._modified_hit_thresh(modifiers, self.weapon.bs)
 
     def hit_thresh_modifier(self, modifiers):
         # This is a bit of a hack to get the delta between the threshold and the modified threshold
-        return modifiers.modify_hit_thresh(6) - 6
+        return self._modified_hit_thresh(modifiers, 6) - 6
+
+    def _modified_hit_thresh(self, modifiers, thresh: int) -> int:
+        return self.memo.get(
+            ('hit', 'thresh', self.memo.fingerprint(modifiers.hit_mods), thresh),
+            lambda: modifiers.modify_hit_thresh(thresh),
+        )
 
     # Wound Dice
     def wound_dice_dists(self, modifiers) -> PMFCollection:
@@ -60,28 +112,46 @@ class RollBase:
         in the attack phase. This takes into account modifiers and other effects as
         extra hits and shots.
         """
+        thresh = self.wound_thresh(modifiers)
+        mod_thresh = self.wound_thresh_modifiable(modifiers)
 
         # Apply modifiers to the dice distribution
-        return modifiers.modify_wound_dice(
-            PMFCollection.mdn(1, 6),
-            self.wound_thresh(modifiers),
-            self.wound_thresh_modifiable(modifiers)
+        return self.memo.get(
+            ('wound', 'dice', self.memo.fingerprint(modifiers.wound_mods), thresh, mod_thresh),
+            lambda: modifiers.modify_wound_dice(PMFCollection.mdn(1, 6), thresh, mod_thresh),
+        )
+
+    def wound_dice_dist(self, modifiers) -> PMF:
+        """The convolved distribution of the modified wound dice"""
+        return self.memo.get(
+            ('wound', 'dist', self.memo.fingerprint(modifiers.wound_mods), self.wound_thresh(modifiers), self.wound_thresh_modifiable(modifiers)),
+            lambda: self.wound_dice_dists(modifiers).convolve(),
         )
 
     def wound_thresh(self, modifiers) -> int:
-        return self.calc_wound_thresh(
-            modifiers.modify_weapon_strength(self.weapon.strength),
-            modifiers.modify_target_toughness(self.target.toughness),
+        return self.memo.get(
+            ('wound', 'base_thresh', self.memo.fingerprint(modifiers.wound_mods), self.weapon.strength, self.target.toughness),
+            lambda: self.calc_wound_thresh(
+                modifiers.modify_weapon_strength(self.weapon.strength),
+                modifiers.modify_target_toughness(self.target.toughness),
+            ),
         )
 
     def wound_thresh_modifiable(self, modifiers) -> int:
-        return modifiers.modify_wound_thresh(self.wound_thresh(modifiers))
+        return self._modified_wound_thresh(modifiers, self.wound_thresh(modifiers))
 
     def wound_thresh_modifier(self, modifiers):
         # This is a bit of a hack to get the delta between the threshold and the modified threshold
-        return modifiers.modify_wound_thresh(6) - 6
+        return self._modified_wound_thresh(modifiers, 6) - 6
+
+    def _modified_wound_thresh(self, modifiers, thresh: int) -> int:
+        return self.memo.get(
+            ('wound', 'thresh', self.memo.fingerprint(modifiers.wound_mods), thresh),
+            lambda: modifiers.modify_wound_thresh(thresh),
+        )
 
-    def calc_wound_thresh(self, strength: int, toughness: int) -> int:
+    @staticmethod
+    def calc_wound_thresh(strength: int, toughness: int) -> int:
         # Generate the wound threshold
         if strength <= toughness/2.0:  # pylint: disable=no-else-return
             # If the toughness is greater than twice the strength wound on a 6+
@@ -101,16 +171,18 @@ class RollBase:
 
     # Save Dice
     def save_dice_dists(self, modifiers) -> PMFCollection:
-        dice_dists = PMFCollection.mdn(1, 6)
-        return modifiers.modify_save_dice(
-            dice_dists,
-            self.save_thresh_modifiable(modifiers),
-            self.save_thresh_modifiable(modifiers),
+        thresh = self.save_thresh_modifiable(modifiers)
+        return self.memo.get(
+            ('save', 'dice', self.memo.fingerprint(modifiers.save_mods), thresh),
+            lambda: modifiers.modify_save_dice(PMFCollection.mdn(1, 6), thresh, thresh),
         )
 
     def save_thresh_modifiable(self, modifiers) -> int:
-        return modifiers.modify_pen_thresh(
-            self.target.save,
-            self.weapon.ap,
-            self.target.invuln
+        return self.memo.get(
+            ('save', 'thresh', self.memo.fingerprint(modifiers.save_mods), self.target.save, self.weapon.ap, self.target.invuln),
+            lambda: modifiers.modify_pen_thresh(
+                self.target.save,
+                self.weapon.ap,
+                self.target.invuln
+            ),
         )
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Hashable
+
 from ...utils.pmf import PMF
 from .roll import RollBase
 
@@ -7,13 +9,17 @@ from .roll import RollBase
 class SaveRollBase(RollBase):
     def split_generator(self):
         return self.modifiers.split_save_roll(
-            self.hit_dice_dists(self.modifiers).convolve(),
+            self.hit_dice_dist(self.modifiers),
             self.hit_thresh_modifier(self.modifiers),
-            self.wound_dice_dists(self.modifiers).convolve(),
+            self.wound_dice_dist(self.modifiers),
             self.wound_thresh_modifier(self.modifiers)
         )
 
 
 class FailedArmourSaveRoll(SaveRollBase):
+    def effect_key(self, modifiers) -> Hashable:
+        # Only the pen threshold and any re-rolls of the save dice change the result
+        return self.save_thresh_modifiable(modifiers), modifiers.dice_fingerprint(modifiers.save_mods)
+
     def calc_sub_dist(self, modifiers) -> PMF:
         return self.save_dice_dists(modifiers).convert_binomial_less_than(self.save_thresh_modifiable(modifiers)).convolve()
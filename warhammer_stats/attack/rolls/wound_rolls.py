@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from ...utils.pmf import PMF, PMFCollection
+from .kernel import FAILURE, SUCCESS, FaceTable, PhaseKernelBase
 from .roll import RollBase
 
 
 class WoundRollBase(RollBase):
     def split_generator(self):
         return self.modifiers.split_wound_roll(
-            self.hit_dice_dists(self.modifiers).convolve(),
+            self.hit_dice_dist(self.modifiers),
             self.hit_thresh_modifier(self.modifiers),
         )
 
@@ -20,7 +21,7 @@ class SuccessfulWoundRoll(WoundRollBase):
 
 class ExtraAutomaticWoundRoll(WoundRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        wound_dist = self.wound_dice_dists(modifiers).convolve()
+        wound_dist = self.wound_dice_dist(modifiers)
         return PMFCollection([
             modifiers.wound_generated_extra_automatic_wound_dist_modifiable().mul_pmf(wound_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.wound_generated_extra_automatic_wound_dist_unmodifiable().mul_pmf(wound_dist),
@@ -29,7 +30,7 @@ class ExtraAutomaticWoundRoll(WoundRollBase):
 
 class ExtraWoundRollRoll(WoundRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        wound_dist = self.wound_dice_dists(modifiers).convolve()
+        wound_dist = self.wound_dice_dist(modifiers)
         return PMFCollection([
             modifiers.extra_wound_roll_dist_modifiable().mul_pmf(wound_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.extra_wound_roll_dist_unmodifiable().mul_pmf(wound_dist),
@@ -38,7 +39,7 @@ class ExtraWoundRollRoll(WoundRollBase):
 
 class MortalWoundRoll(WoundRollBase):
     def calc_sub_dist(self, modifiers) -> PMF:
-        wound_dist = self.wound_dice_dists(modifiers).convolve()
+        wound_dist = self.wound_dice_dist(modifiers)
         return PMFCollection([
             modifiers.wound_generated_mortal_wounds_dist_modifiable().mul_pmf(wound_dist.roll(self.hit_thresh_modifier(self.modifiers))),
             modifiers.wound_generated_mortal_wounds_dist_unmodifiable().mul_pmf(wound_dist),
@@ -53,3 +54,35 @@ class SelfWoundRoll(WoundRollBase):
             return self.wound_dice_dists(modifiers).convert_binomial_less_than(self_thresh).convolve()
         else:
             return PMF.static(0)
+
+
+class WoundPhaseKernel(PhaseKernelBase, WoundRollBase):
+    outputs = ('successful_wound_dist', 'extra_wound_roll_dist', 'extra_automatic_wound_dist',
+               'mortal_wound_dist', 'self_wound_dist')
+
+    def face_table(self, modifiers) -> FaceTable:
+        wound_dist = self.wound_dice_dist(modifiers)
+        wound_thresh = self.wound_thresh_modifiable(modifiers)
+        # Generators on a modifiable roll look at the face shifted by the modifier
+        shift = self.hit_thresh_modifier(self.modifiers)
+        generators = [
+            (modifiers.extra_wound_roll_dist_modifiable(), modifiers.extra_wound_roll_dist_unmodifiable()),
+            (modifiers.wound_generated_extra_automatic_wound_dist_modifiable(), modifiers.wound_generated_extra_automatic_wound_dist_unmodifiable()),
+            (modifiers.wound_generated_mortal_wounds_dist_modifiable(), modifiers.wound_generated_mortal_wounds_dist_unmodifiable()),
+        ]
+        thresh_self_wounds = modifiers.wound_self_wound_thresh()
+        self_wound_thresh = max(thresh_self_wounds + self.wound_thresh_modifier(modifiers), 0)
+
+        table = []
+        for face, face_prob in enumerate(wound_dist.values):
+            mod_face = max(face + shift, 0)
+            if not thresh_self_wounds:
+                self_wound = PMF.static(0)
+            else:
+                self_wound = SUCCESS if face < self_wound_thresh else FAILURE
+            table.append((face_prob, (
+                SUCCESS if face >= wound_thresh else FAILURE,
+                *[self.generated(modifiable, unmodifiable, mod_face, face) for modifiable, unmodifiable in generators],
+                self_wound,
+            )))
+        return table
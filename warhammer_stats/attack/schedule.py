@@ -0,0 +1,116 @@
+"""
+The steps of an Attack as an explicit graph, and a scheduler that evaluates the steps needed
+for some outputs.
+
+Each step is one of the cached properties of an Attack, so a step is only ever computed once
+however many later steps use it. The scheduler only evaluates the steps the requested outputs
+need, in dependency order, and with more than one worker it runs the steps whose inputs are
+ready on a thread pool. NumPy releases the GIL in its FFTs, so the branches for the hits,
+the saves and the damage can overlap.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    from .attack import Attack
+
+# The steps each step of an Attack uses directly
+GRAPH: dict[str, tuple[str, ...]] = {
+    'attacks_phase_results': (),
+    'hit_phase_results': (),
+    'wound_phase_results': (),
+    'save_phase_results': (),
+    'damage_phase_results': (),
+    'total_successful_hits_dist': ('hit_phase_results',),
+    'hit_wound_phase_results': ('wound_phase_results', 'total_successful_hits_dist'),
+    'total_successful_wounds_dist': ('hit_phase_results', 'hit_wound_phase_results'),
+    'failed_saves_results': ('save_phase_results', 'total_successful_wounds_dist'),
+    'actual_failed_saves_dist': ('failed_saves_results',),
+    'total_damage_results': ('attacks_phase_results', 'damage_phase_results', 'actual_failed_saves_dist'),
+    'total_mortal_wounds': ('attacks_phase_results', 'hit_phase_results', 'hit_wound_phase_results'),
+    'total_self_wounds': ('hit_phase_results', 'hit_wound_phase_results'),
+    'final_damage_dist': ('total_damage_results',),
+    'final_mortal_wound_dist': ('total_mortal_wounds',),
+    'final_self_wound_dist': ('total_self_wounds',),
+    'wound_die_joint': (),
+    'hit_die_joint': ('wound_die_joint',),
+    'damage_mortal_dist': ('attacks_phase_results', 'save_phase_results', 'damage_phase_results', 'hit_die_joint'),
+    # Only uses the joint distribution when mortal wounds are possible, which is computed then
+    'final_total_damage_dist': ('final_damage_dist', 'final_mortal_wound_dist'),
+    'kill_failed_saves_dist': ('attacks_phase_results', 'failed_saves_results'),
+    'failed_save_damage_dist': ('damage_phase_results',),
+    'kills_dist': ('kill_failed_saves_dist', 'failed_save_damage_dist', 'final_mortal_wound_dist'),
+}
+
+# The steps that make up the results of Attack.run
+OUTPUTS = ('final_damage_dist', 'final_mortal_wound_dist', 'final_self_wound_dist', 'final_total_damage_dist', 'kills_dist')
+
+
+def needed(outputs: Iterable[str]) -> list[str]:
+    """
+    Every step the outputs need, each after the steps it uses
+    """
+    order: list[str] = []
+
+    def visit(step: str) -> None:
+        if step not in order:
+            for dependency in GRAPH[step]:
+                visit(dependency)
+            order.append(step)
+
+    for output in outputs:
+        if output not in GRAPH:
+            raise ValueError(f'unknown step {output}')
+        visit(output)
+    return order
+
+
+class Scheduler:
+    """
+    Evaluates the steps of an attack that some outputs need
+
+    Args:
+        attack (Attack): The attack whose steps are evaluated
+        workers (int): The number of threads, one evaluates the steps in order without a pool
+    """
+    def __init__(self, attack: Attack, workers: int = 1) -> None:
+        self.attack = attack
+        self.workers = workers
+
+    def step(self, step: str) -> Any:
+        return getattr(self.attack, step)
+
+    def evaluate(self, outputs: Iterable[str]) -> dict[str, Any]:
+        """
+        The value of each output, evaluating each step they need once
+        """
+        outputs = list(outputs)
+        # Steps the attack already holds are done
+        remaining = [step for step in needed(outputs) if step not in vars(self.attack)]
+        if self.workers > 1 and len(remaining) > 1:
+            self.run_parallel(remaining)
+        else:
+            for step in remaining:
+                self.step(step)
+        return {output: self.step(output) for output in outputs}
+
+    def run_parallel(self, steps: list[str]) -> None:
+        """
+        Run each step on the pool as soon as the steps it uses are done
+        """
+        waiting = {step: {dependency for dependency in GRAPH[step] if dependency in steps} for step in steps}
+        running: dict[Future, str] = {}
+        with ThreadPoolExecutor(self.workers) as pool:
+            while waiting or running:
+                for step in [step for step, dependencies in waiting.items() if not dependencies]:
+                    del waiting[step]
+                    running[pool.submit(self.step, step)] = step
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished = running.pop(future)
+                    future.result()
+                    for dependencies in waiting.values():
+                        dependencies.discard(finished)
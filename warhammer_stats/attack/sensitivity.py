@@ -0,0 +1,57 @@
+"""
+What an extra modifier is worth to an attack, for several candidate modifiers at once.
+
+Each perturbation adds modifiers to the base attack. A modifier only changes the steps of the
+attack that depend on its list of modifiers, so the variant attacks reuse the base attack's
+results for every other step and share its dice memo. Only the invalidated steps are recomputed.
+"""
+
+from __future__ import annotations
+
+from ..utils.modifier_collection import ModifierCollection
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+from .dependencies import perturbed_fields, take_over
+
+
+class Sensitivity:
+    """
+    The change in the mean damage and kills of an attack from each of a list of perturbations
+
+    Args:
+        weapon (Weapon): The weapon of the base attack
+        target (Target): The target of the base attack
+        perturbations (list[ModifierCollection]): The modifiers each variant adds to the weapon
+    """
+    def __init__(self, weapon: Weapon, target: Target, perturbations: list[ModifierCollection]) -> None:
+        self.weapon = weapon
+        self.target = target
+        self.perturbations = perturbations
+        self.base = Attack(weapon, target)
+
+    def variant(self, perturbation: ModifierCollection) -> Attack:
+        """
+        The attack with the perturbation added, holding the base results of the steps it doesn't change
+        """
+        attack = Attack(self.weapon.replace(modifiers=self.weapon.modifiers + perturbation), self.target)
+        take_over(attack, self.base, perturbed_fields(perturbation))
+        return attack
+
+    def deltas(self) -> list[tuple[float, float]]:
+        """
+        The change in the mean total damage and the mean kills for each perturbation
+        """
+        damage, kills = self.base.final_total_damage_dist.mean(), self.base.kills_dist.mean()
+        deltas = []
+        for perturbation in self.perturbations:
+            attack = self.variant(perturbation)
+            deltas.append((attack.final_total_damage_dist.mean() - damage, attack.kills_dist.mean() - kills))
+        return deltas
+
+
+def sensitivity(weapon: Weapon, target: Target, perturbations: list[ModifierCollection]) -> list[tuple[float, float]]:
+    """
+    The change in the mean total damage and the mean kills of the attack from each perturbation
+    """
+    return Sensitivity(weapon, target, perturbations).deltas()
@@ -0,0 +1,144 @@
+"""
+Attacks against units with models of different profiles.
+
+Wounds are allocated to the models in order, each model taking its own saves, feel no pain
+and damage until it is destroyed, and damage beyond the wounds of a model is lost. The state
+of the unit is the model wounds are being allocated to and the wounds it has left, which is
+the same as the number of wounds the unit has left, so the attack is a Markov chain over at
+most one more state than the unit has wounds.
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Callable, Optional
+
+from numpy import array, identity, ndarray, zeros
+
+from ..utils.pmf import PMF
+from ..utils.unit import UnitTarget
+from ..utils.weapon import Weapon
+from .attack import Attack
+
+
+def chain(step: Callable[[ndarray], ndarray], count_dist: PMF, states: ndarray) -> ndarray:
+    """
+    Propagate the distribution of the states through a random number of steps. The states may
+    be a matrix with a distribution in each column.
+    """
+    result = zeros(states.shape)
+    for count, prob in enumerate(count_dist.values):
+        if count:
+            states = step(states)
+        result += states * prob
+    return result
+
+
+class UnitAttack:
+    """
+    The attack of a weapon against a unit target
+
+    Note:
+        Hits and wounds are rolled against the first profile in the allocation order, saves,
+        damage and feel no pain against the model the wound is allocated to.
+
+    Args:
+        weapon (Weapon): The weapon being used to make the attack
+        unit (UnitTarget): The target of the attack
+        attacks (list[Attack]): The attacks of the weapon against each profile of the unit, if
+            they have already been run
+    """
+    def __init__(self, weapon: Weapon, unit: UnitTarget, attacks: Optional[list[Attack]] = None) -> None:
+        self.weapon = weapon
+        self.unit = unit
+        self.attacks = attacks or [Attack(weapon, target) for target, _ in unit.profiles]
+
+    @cached_property
+    def pool(self) -> list[tuple[int, int]]:
+        """
+        The profile of the model wounds are being allocated to and the wounds it has left,
+        for each number of wounds the unit has left
+        """
+        pool = [(-1, 0)]
+        for profile in reversed(self.unit.models):
+            wounds = self.unit.profiles[profile][0].wounds
+            pool += [(profile, left) for left in range(1, wounds + 1)]
+        return pool
+
+    def transitions(self, outcome) -> ndarray:
+        """
+        The transition matrix between the wounds the unit has left, from the distribution of
+        the wounds lost by the current model given its profile and wounds left
+        """
+        matrix = zeros((len(self.pool), len(self.pool)))
+        matrix[0, 0] = 1.0
+        for remaining, (profile, left) in enumerate(self.pool[1:], start=1):
+            for lost, prob in enumerate(outcome(profile, left).values):
+                matrix[remaining - lost, remaining] += prob
+        return matrix
+
+    @cached_property
+    def damage_matrix(self) -> ndarray:
+        """Return the transitions for a single failed save"""
+        return self.transitions(lambda profile, left: self.attacks[profile].failed_save_damage_dist.ceiling(left))
+
+    @cached_property
+    def wound_matrix(self) -> ndarray:
+        """Return the transitions for a single successful wound, saved against by the current model"""
+        matrix = zeros(self.damage_matrix.shape)
+        matrix[0, 0] = 1.0
+        for profile, attack in enumerate(self.attacks):
+            columns = [remaining for remaining, (p, _) in enumerate(self.pool) if p == profile]
+            saved = chain(self.damage_matrix.__matmul__, attack.save_phase_results.failed_armour_save_dist, identity(len(matrix)))
+            matrix[:, columns] = saved[:, columns]
+        return matrix
+
+    @cached_property
+    def mortal_wound_matrix(self) -> ndarray:
+        """Return the transitions for a single mortal wound, which spills over from model to model"""
+        return self.transitions(lambda profile, _: self.attacks[profile].apply_feel_no_pain(PMF.static(1)))
+
+    def per_attack(self, states: ndarray) -> ndarray:
+        """Propagate the states through the wounds of a single attack"""
+        return chain(self.wound_matrix.__matmul__, self.attacks[0].total_successful_wounds_dist, states)
+
+    def apply(self, remaining_wounds_dist: PMF) -> PMF:
+        """
+        The distribution of the wounds the unit has left after the attack, from the distribution
+        of the wounds it had left before it
+        """
+        first = self.attacks[0]
+        states = array(remaining_wounds_dist.expand_to(len(self.pool)).values)
+        states = chain(self.per_attack, first.attacks_phase_results.attack_number_dist, states)
+        states = chain(self.mortal_wound_matrix.__matmul__, first.total_mortal_wounds, states)
+        return PMF([float(x) for x in states])
+
+    @cached_property
+    def remaining_wounds_dist(self) -> PMF:
+        """Return the distribution of the wounds the unit has left after the attack"""
+        return self.apply(PMF.static(self.unit.wounds))
+
+    def models_left(self, remaining: int, profile: int) -> int:
+        """
+        The models of the profile left standing when the unit has the wounds left
+        """
+        # A model is standing while the wounds left reach its last wound
+        alive = sum(1 for _, left in self.pool[1:remaining + 1] if left == 1)
+        return self.unit.models[::-1][:alive].count(profile)
+
+    @cached_property
+    def kills_dist(self) -> PMF:
+        """Return the distribution of the models killed"""
+        return self.kill_dist(range(len(self.unit.profiles)))
+
+    @cached_property
+    def profile_kill_dists(self) -> list[PMF]:
+        """Return the distribution of the models of each profile killed"""
+        return [self.kill_dist([profile]) for profile in range(len(self.unit.profiles))]
+
+    def kill_dist(self, profiles) -> PMF:
+        models = sum(self.unit.profiles[profile][1] for profile in profiles)
+        values = [0.0] * (models + 1)
+        for remaining, prob in enumerate(self.remaining_wounds_dist.values):
+            values[models - sum(self.models_left(remaining, profile) for profile in profiles)] += prob
+        return PMF(values)
@@ -0,0 +1,99 @@
+"""
+Rankings of a catalog of weapons against target profiles, kept up to date as weapons are added
+so that asking for the best weapons against a target doesn't re-run any attacks.
+"""
+
+from __future__ import annotations
+
+from bisect import insort
+from itertools import count
+from typing import Callable, Optional
+
+from ..utils.target import Target
+from ..utils.weapon import Weapon
+from .attack import Attack
+from .results import AttackResults
+
+
+def per_point(score: float, weapon: Weapon) -> Optional[float]:
+    return score / weapon.cost if weapon.cost else None
+
+
+# How each ranking scores the results of a weapon against a target, None leaves it unranked
+METRICS: dict[str, Callable[[AttackResults, Weapon], Optional[float]]] = {
+    'damage': lambda results, _: results.total_damage_dist.mean(),
+    'kills': lambda results, _: results.kills_dist.mean(),
+    'damage_per_point': lambda results, weapon: per_point(results.total_damage_dist.mean(), weapon),
+    'kills_per_point': lambda results, weapon: per_point(results.kills_dist.mean(), weapon),
+}
+
+
+class WeaponIndex:
+    """
+    The weapons of a catalog ranked by each metric against each target profile. Each weapon
+    is attacked against each target once, when either is added.
+
+    Args:
+        weapons (list[Weapon]): The catalog of weapons
+        targets (list[Target]): The target profiles to rank the weapons against
+    """
+    def __init__(self, weapons: Optional[list[Weapon]] = None, targets: Optional[list[Target]] = None) -> None:
+        self.weapons: list[Weapon] = []
+        # The order each weapon was added in, which breaks ties between equal scores
+        self.orders: dict[Weapon, int] = {}
+        self._added = count()
+        self.rankings: dict[Target, dict[str, list[tuple[float, int, Weapon]]]] = {}
+        for target in targets or []:
+            self.add_target(target)
+        for weapon in weapons or []:
+            self.add_weapon(weapon)
+
+    def _insert(self, target: Target, weapon: Weapon) -> None:
+        results = Attack(weapon, target).run()
+        order = self.orders[weapon]
+        for metric, score in METRICS.items():
+            value = score(results, weapon)
+            if value is not None:
+                # Highest score first, ties in the order the weapons were added
+                insort(self.rankings[target][metric], (-value, order, weapon))
+
+    def add_weapon(self, weapon: Weapon) -> None:
+        """
+        Rank a new weapon against every target
+        """
+        if weapon in self.weapons:
+            return
+        self.weapons.append(weapon)
+        self.orders[weapon] = next(self._added)
+        for target in self.rankings:
+            self._insert(target, weapon)
+
+    def remove_weapon(self, weapon: Weapon) -> None:
+        """
+        Drop a weapon from every ranking
+        """
+        self.weapons.remove(weapon)
+        del self.orders[weapon]
+        for rankings in self.rankings.values():
+            for metric, ranking in rankings.items():
+                rankings[metric] = [entry for entry in ranking if entry[2] != weapon]
+
+    def add_target(self, target: Target) -> None:
+        """
+        Rank every weapon against a new target
+        """
+        if target in self.rankings:
+            return
+        self.rankings[target] = {metric: [] for metric in METRICS}
+        for weapon in self.weapons:
+            self._insert(target, weapon)
+
+    def top(self, target: Target, metric: str = 'kills', k: Optional[int] = None) -> list[tuple[Weapon, float]]:
+        """
+        The best k weapons against the target by the metric and their scores, adding the
+        target if it is new
+        """
+        if metric not in METRICS:
+            raise ValueError(f'unknown metric {metric}, expected one of {", ".join(METRICS)}')
+        self.add_target(target)
+        return [(weapon, -score) for score, _, weapon in self.rankings[target][metric][:k]]
@@ -1,10 +1,13 @@
+from ..utils.frozen import Frozen
 from ..utils.pmf import PMFCollection
 
 from typing import Optional
 
 
 # pylint: disable=R0201,C0302,R0913,R0904
-class Modifier:
+class Modifier(Frozen):
+    __slots__ = ()
+
     priority = 0
 
     def to_dict(self):
@@ -5,10 +5,15 @@ class AddNTo(Modifier):
     """
     Base class for modifying dice or thresholds by a set amount
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.value = value
-        self.priority = self.value
+
+    @property
+    def priority(self) -> int:
+        return self.value
 
     def to_dict(self):
         return {
@@ -26,6 +31,8 @@ class AddNToThreshold(AddNTo):
     modify_threshold()
         Returns the modified threshold value
     """
+    __slots__ = ()
+
     def modify_threshold(self, thresh: int) -> int:
         return thresh - self.value
 
@@ -39,6 +46,8 @@ class AddNToAP(AddNTo):
     modify_ap()
         Returns the modified armour penetration value
     """
+    __slots__ = ()
+
     def modify_ap(self, armour_penetration: int) -> int:
         return max(armour_penetration + self.value, 0)
 
@@ -52,6 +61,8 @@ class AddNToSave(AddNTo):
     modify_save()
         Returns the modified save value
     """
+    __slots__ = ()
+
     def modify_save(self, save: int) -> int:
         return save - self.value
 
@@ -65,6 +76,8 @@ class AddNToInvuln(AddNTo):
     modify_invuln()
         Returns the modified save value
     """
+    __slots__ = ()
+
     def modify_invuln(self, invuln: int) -> int:
         return invuln - self.value
 
@@ -78,6 +91,8 @@ class AddNToVolume(AddNTo):
     modify_dice()
         Returns the modified PMFCollection
     """
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
         return collection.map(lambda x: x.roll(self.value))
 
@@ -91,6 +106,8 @@ class SubtractNVolumeMinOne(AddNTo):
     modify_dice()
         Returns the modified PMFCollection
     """
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
         return collection.map(lambda x: x.roll(-1 * self.value).min(1))
 
@@ -104,8 +121,10 @@ class AddND6(AddNTo):
     modify_dice()
         Returns the modified PMFCollection
     """
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
-        return PMFCollection(collection.pmfs+[PMF.dn(6)])
+        return PMFCollection(collection.pmfs + (PMF.dn(6),))
 
 
 class AddND3(AddNTo):
@@ -117,5 +136,7 @@ class AddND3(AddNTo):
     modify_dice()
         Returns the modified PMFCollection
     """
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
-        return PMFCollection(collection.pmfs+[PMF.dn(3)])
+        return PMFCollection(collection.pmfs + (PMF.dn(3),))
@@ -13,6 +13,7 @@ class GeneratorModifiers(Modifier):
     value : int
         The number of effects dice generated
     """
+    __slots__ = ('thresh', 'value')
 
     def __init__(self, thresh: int, value: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -34,56 +35,78 @@ class GeneratorModifiers(Modifier):
 
 
 class GenerateExtraAutomaticHitsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_automatic_hit_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraAutomaticHitsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_automatic_hit_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraHitRollsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_hit_roll_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraHitRollsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_hit_roll_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraWoundRollsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_wound_roll_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraWoundRollsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_wound_roll_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraAutomaticWoundsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_automatic_wounds_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateExtraAutomaticWoundsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_automatic_wounds_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateMortalWoundsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateMortalWoundsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class GenerateD3MortalWoundsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
@@ -94,6 +117,8 @@ class GenerateD3MortalWoundsUnmodifiable(GeneratorModifiers):
 
 
 class GenerateD3MortalWoundsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
@@ -104,6 +129,8 @@ class GenerateD3MortalWoundsModifiable(GeneratorModifiers):
 
 
 class GenerateD6MortalWoundsUnmodifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
@@ -114,6 +141,8 @@ class GenerateD6MortalWoundsUnmodifiable(GeneratorModifiers):
 
 
 class GenerateD6MortalWoundsModifiable(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
@@ -124,9 +153,11 @@ class GenerateD6MortalWoundsModifiable(GeneratorModifiers):
 
 
 class EndAttackGenerator(GeneratorModifiers):
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
         def null_values(x, thresh):
-            values = x.values[:]
+            values = list(x.values)
             values[0] += sum(values[thresh:])
             values[thresh:] = [0.0] * len(values[thresh:])
             return PMF(values)
@@ -134,26 +165,36 @@ class EndAttackGenerator(GeneratorModifiers):
 
 
 class EndAttackAndGenrateMortalWoundsModifiable(EndAttackGenerator):
+    __slots__ = ()
+
     def extra_mortal_wound_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class EndAttackAndGenrateMortalWoundsUnmodifiable(EndAttackGenerator):
+    __slots__ = ()
+
     def extra_mortal_wound_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class EndAttackAndGenrateExtraWoundsModifiable(EndAttackGenerator):
+    __slots__ = ()
+
     def extra_automatic_wound_modifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class EndAttackAndGenrateExtraWoundsUnmodifiable(EndAttackGenerator):
+    __slots__ = ()
+
     def extra_automatic_wound_unmodifiable(self) -> PMFCollection:
         return self._pmf_collection()
 
 
 class Haywire(GeneratorModifiers):
+    __slots__ = ()
+
     def extra_mortal_wound_modifiable(self) -> PMFCollection:
         # This is a hardcoded implementation of the haywire mechanic of generating a mortal
         # wound on 4 and 5 and D3 mortal wounds on a 6+
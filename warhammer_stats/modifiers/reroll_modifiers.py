@@ -3,6 +3,7 @@ from ..utils.pmf import PMFCollection
 from . import Modifier
 
 class ReRollOnes(Modifier):
+    __slots__ = ()
     priority = 1
 
     def modify_re_roll(self, collection: PMFCollection, thresh: int, mod_thresh: int) -> PMFCollection:
@@ -10,6 +11,7 @@ class ReRollOnes(Modifier):
 
 
 class ReRollFailed(Modifier):
+    __slots__ = ()
     priority = 99
 
     def modify_re_roll(self, collection: PMFCollection, thresh: int, mod_thresh: int) -> PMFCollection:
@@ -18,8 +20,10 @@ class ReRollFailed(Modifier):
 
 
 class ReRollOneDice(Modifier):
+    __slots__ = ()
+
     def modify_re_roll(self, collection: PMFCollection, thresh: int, mod_thresh: int) -> PMFCollection:
-        collection_pmfs = collection.pmfs
+        collection_pmfs = list(collection.pmfs)
         if not collection_pmfs:
             return collection
         collection_pmfs[0] = collection_pmfs[0].re_roll_less_than(thresh)
@@ -27,8 +31,10 @@ class ReRollOneDice(Modifier):
 
 
 class ReRollOneDiceVolume(Modifier):
+    __slots__ = ()
+
     def modify_re_roll(self, collection: PMFCollection, thresh: int, mod_thresh: int) -> PMFCollection:
-        collection_pmfs = collection.pmfs
+        collection_pmfs = list(collection.pmfs)
         if not collection_pmfs:
             return collection
         collection_pmfs[0] = collection_pmfs[0].re_roll_less_than(collection_pmfs[0].mean())
@@ -36,6 +42,7 @@ class ReRollOneDiceVolume(Modifier):
 
 
 class ReRollAll(Modifier):
+    __slots__ = ()
     priority = 100
 
     def modify_re_roll(self, collection: PMFCollection, _, mod_thresh: int) -> PMFCollection:
@@ -43,6 +50,7 @@ class ReRollAll(Modifier):
 
 
 class ReRollLessThanExpectedValue(Modifier):
+    __slots__ = ()
     priority = 98
 
     def modify_re_roll(self, collection: PMFCollection, *_) -> PMFCollection:
@@ -5,11 +5,15 @@ from ..utils.modifier_collection import ModifierCollection
 
 
 class SplitterModifier(Modifier):
+    __slots__ = ()
+
     def _mod_collection(self):
         return ModifierCollection()
 
 
 class OnAnUnmodifiableRollOfNAddAP(SplitterModifier):
+    __slots__ = ('thresh', 'extra_ap')
+
     def __init__(self, thresh: int, extra_ap: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.thresh = thresh
@@ -32,6 +36,8 @@ class OnAnUnmodifiableRollOfNAddAP(SplitterModifier):
 
 
 class OnAModifiableRollOfNAddAP(SplitterModifier):
+    __slots__ = ('thresh', 'extra_ap')
+
     def __init__(self, thresh: int, extra_ap: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.thresh = thresh
@@ -54,6 +60,8 @@ class OnAModifiableRollOfNAddAP(SplitterModifier):
 
 
 class OnAnUnmodifiableRollOfNAddDamage(SplitterModifier):
+    __slots__ = ('thresh', 'extra_damage')
+
     def __init__(self, thresh: int, extra_damage: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.thresh = thresh
@@ -76,6 +84,8 @@ class OnAnUnmodifiableRollOfNAddDamage(SplitterModifier):
 
 
 class OnAModifiableRollOfNAddDamage(SplitterModifier):
+    __slots__ = ('thresh', 'extra_damage')
+
     def __init__(self, thresh: int, extra_damage: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.thresh = thresh
@@ -6,10 +6,18 @@ class SetToN(Modifier):
     """
     Base class of modifiers that fix the PMF or threshold to a certain value
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.value = value
 
+    def to_dict(self):
+        return {
+            **super().to_dict(),
+            'value': self.value
+        }
+
 
 class SetThresholdToN(SetToN):
     """
@@ -20,6 +28,8 @@ class SetThresholdToN(SetToN):
     modify_threshold()
         Returns the N value
     """
+    __slots__ = ()
+
     def modify_threshold(self, thresh: int) -> int:
         return self.value
 
@@ -33,6 +43,8 @@ class SetAPToN(SetToN):
     modify_ap()
         Returns the N value
     """
+    __slots__ = ()
+
     def modify_ap(self, armour_penetration: int) -> int:
         return self.value
 
@@ -46,6 +58,8 @@ class SetSaveToN(SetToN):
     modify_save()
         Returns the N value
     """
+    __slots__ = ()
+
     def modify_save(self, save: int) -> int:
         return self.value
 
@@ -59,6 +73,8 @@ class SetInvulnToN(SetToN):
     modify_invuln()
         Returns the N value
     """
+    __slots__ = ()
+
     def modify_invuln(self, invuln: int) -> int:
         return self.value
 
@@ -72,6 +88,8 @@ class IgnoreAP(Modifier):
     modify_ap()
         Returns the N value
     """
+    __slots__ = ('armour_penetration',)
+
     def __init__(self, value: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.armour_penetration = value
@@ -95,6 +113,8 @@ class IgnoreInvuln(Modifier):
     modify_invuln()
         Returns 7
     """
+    __slots__ = ()
+
     def modify_invuln(self, _: int) -> int:
         return 7
 
@@ -108,6 +128,8 @@ class HalfDamage(Modifier):
     modify_invuln()
         Returns The modified PMFCollection
     """
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
         return collection.map(lambda x: x.div_min_one(2))
 
@@ -121,6 +143,8 @@ class Overheat(Modifier):
     modify_drones()
         Return a 2+ threshold to not inflict wounds
     """
+    __slots__ = ()
+
     def self_wound_thresh(self) -> int:
         return 2
 
@@ -141,6 +165,7 @@ class MinimumValue(Modifier):
     modify_dice(collection: PMFCollection)
         Returns the PMFCollection where the PMFs have been modified to have a lower limit
     """
+    __slots__ = ('min_val',)
 
     def __init__(self, min_val: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -165,5 +190,59 @@ class HighestOfTwo(Modifier):
     modify_dice()
         Returns the PMFCollection of the highest of two dice
     """
+    __slots__ = ()
+
     def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
         return collection.map(lambda x: x.max_of_two())
+
+
+class KeepN(Modifier):
+    """
+    Base class of modifiers that roll each dice several times and keep one of the results
+
+    Attributes
+    rolls : int
+        The number of times each dice is rolled
+    """
+    __slots__ = ('rolls',)
+
+    def __init__(self, rolls: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rolls = rolls
+
+    def to_dict(self):
+        return {
+            **super().to_dict(),
+            'rolls': self.rolls,
+        }
+
+
+class KeepHighest(KeepN):
+    """
+    Roll each dice N times and keep the highest, for example the shots or damage of a weapon
+    that rolls two dice and picks the highest
+
+    Methods
+    -------
+    modify_dice()
+        Returns the PMFCollection of the highest of N rolls of each dice
+    """
+    __slots__ = ()
+
+    def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
+        return collection.map(lambda x: x.order_statistic(self.rolls))
+
+
+class KeepLowest(KeepN):
+    """
+    Roll each dice N times and keep the lowest
+
+    Methods
+    -------
+    modify_dice()
+        Returns the PMFCollection of the lowest of N rolls of each dice
+    """
+    __slots__ = ()
+
+    def modify_dice(self, collection: PMFCollection, *_) -> PMFCollection:
+        return collection.map(lambda x: x.order_statistic(self.rolls, self.rolls))
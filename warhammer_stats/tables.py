@@ -0,0 +1,200 @@
+"""
+Precompute the dice and kill tables for the standard parameter space and write them to a snapshot
+file. Point the WARHAMMER_STATS_SNAPSHOT environment variable at the file to have every new
+process look the tables up rather than computing them.
+
+    python -m warhammer_stats.tables --snapshot snapshot.npy --kill-table kills.npy --atlas atlas.npy
+
+Likewise WARHAMMER_STATS_KILL_TABLE points at a precomputed table of kill distributions and
+WARHAMMER_STATS_ATLAS at an atlas of the results of unmodified attacks.
+"""
+
+from __future__ import annotations
+
+import argparse
+from multiprocessing import Pool
+from typing import Iterable, Iterator, Optional
+
+from .attack.atlas import Atlas, use_atlas
+from .attack.attack import Attack
+from .attack.results import AttackResults
+from .attack.phases.kill_phase import calculate_kills
+from .attack.phases.kill_table import KillTable, use_kill_table
+from .modifiers.additive_modifiers import AddNToThreshold
+from .modifiers.reroll_modifiers import ReRollFailed, ReRollOnes
+from .utils.modifier_collection import ModifierCollection
+from .utils.pmf import PMF, PMFCollection
+from .utils.snapshot import Snapshot, use_snapshot
+from .utils.target import Target
+from .utils.weapon import Weapon
+
+# The standard parameter space, profiles outside of it are computed as normal
+STANDARD_BS = range(2, 7)
+STANDARD_STRENGTH_TOUGHNESS = [(8, 4), (5, 4), (4, 4), (3, 4), (2, 4)]  # Wounding on 2+ to 6+
+STANDARD_FNPS = [4, 5, 6, 7]
+STANDARD_WOUNDS = range(1, 31)
+STANDARD_DICE = 60
+STANDARD_WOUND_THRESHOLDS = range(2, 7)
+STANDARD_SAVE_THRESHOLDS = range(2, 8)
+ATLAS_WOUNDS = [1, 2, 3, 4, 5, 6, 8, 10, 12]
+
+
+def standard_shots() -> list[PMFCollection]:
+    """
+    The shots characteristics of most weapons
+    """
+    return [PMFCollection.static(x) for x in [1, 2, 3, 4, 6, 10, 20]] + [
+        PMFCollection.mdn(1, 3),
+        PMFCollection.mdn(1, 6),
+        PMFCollection.mdn(2, 6),
+    ]
+
+
+def atlas_axes() -> dict[str, list]:
+    """
+    The standard grid of the atlas
+    """
+    return {
+        'shots': standard_shots(),
+        'bs': list(STANDARD_BS),
+        'wound_thresh': list(STANDARD_WOUND_THRESHOLDS),
+        'save_thresh': list(STANDARD_SAVE_THRESHOLDS),
+        'fnp': STANDARD_FNPS,
+        'damage': standard_damages(),
+        'wounds': ATLAS_WOUNDS,
+    }
+
+
+def standard_damages() -> list[PMFCollection]:
+    """
+    The damage characteristics of most weapons
+    """
+    return [PMFCollection.static(x) for x in range(1, 7)] + [
+        PMFCollection.mdn(1, 3),
+        PMFCollection.mdn(1, 6),
+        PMFCollection.mdn(2, 3),
+        PMFCollection.mdn(2, 6),
+        PMFCollection([PMF.dn(3), PMF.static(1)]),
+        PMFCollection([PMF.dn(6), PMF.static(1)]),
+        PMFCollection([PMF.dn(6), PMF.static(2)]),
+        PMFCollection([PMF.dn(3), PMF.static(3)]),
+    ]
+
+
+def standard_modifiers() -> list[ModifierCollection]:
+    """
+    The hit and wound modifiers most profiles have, if any
+    """
+    collections = [ModifierCollection()]
+    for mods in [[ReRollOnes()], [ReRollFailed()], [AddNToThreshold(1)], [AddNToThreshold(-1)], [ReRollOnes(), AddNToThreshold(1)]]:
+        collections += [ModifierCollection(hit_mods=mods), ModifierCollection(wound_mods=mods)]
+    return collections
+
+
+def standard_attacks() -> Iterator[Attack]:
+    """
+    Attacks that between them cover every hit, wound and feel no pain table in the standard
+    parameter space
+    """
+    damage = PMFCollection.mdn(1, 6)
+    for modifiers in standard_modifiers():
+        for bs in STANDARD_BS:
+            for strength, toughness in STANDARD_STRENGTH_TOUGHNESS:
+                weapon = Weapon(bs=bs, shots=PMFCollection.static(1), strength=strength, ap=0, damage=damage, modifiers=modifiers)
+                yield Attack(weapon, Target(toughness=toughness, save=7, invuln=7, fnp=7, wounds=1))
+    for fnp in STANDARD_FNPS:
+        # Enough damage to fill the feel no pain tables for most attacks
+        weapon = Weapon(bs=2, shots=PMFCollection.static(10), strength=8, ap=0, damage=damage)
+        yield Attack(weapon, Target(toughness=4, save=7, invuln=7, fnp=fnp, wounds=6))
+
+
+def memo_tables() -> list[tuple[str, tuple, PMF]]:
+    """
+    The single distributions derived while evaluating the standard attacks
+    """
+    entries = {}
+    for attack in standard_attacks():
+        attack.run()
+        for key, pmf in attack.memo.pmfs():
+            entries[key] = ('memo', key, pmf)
+    return list(entries.values())
+
+
+def kill_table_rows(wounds=STANDARD_WOUNDS, damages: Optional[list[PMFCollection]] = None,
+                    fnps=STANDARD_FNPS, dice: int = STANDARD_DICE) -> list[tuple[int, PMF, PMF, list[PMF]]]:
+    """
+    The kill distributions for each target wounds and damage after feel no pain, without
+    mortal wounds
+    """
+    rows = {}
+    for damage in damages or standard_damages():
+        for fnp in fnps:
+            for wound in wounds:
+                weapon = Weapon(bs=2, shots=PMFCollection.static(1), strength=4, ap=0, damage=damage)
+                attack = Attack(weapon, Target(toughness=4, save=7, invuln=7, fnp=fnp, wounds=wound))
+                damage_dist = attack.failed_save_damage_dist
+                key = (wound, damage_dist)
+                if key not in rows:
+                    rows[key] = (wound, damage_dist, PMF.zero(), [calculate_kills(wound, n, damage_dist, PMF.zero()) for n in range(dice + 1)])
+    return list(rows.values())
+
+
+def attack_results(job: tuple[Weapon, Target]) -> AttackResults:
+    # Compute from scratch rather than from any atlas already in use
+    use_atlas(None)
+    return Attack(*job).run()
+
+
+def atlas_results(jobs: list[tuple[Weapon, Target]], processes: Optional[int] = None) -> Iterable[AttackResults]:
+    """
+    The results of every job, spread over a pool of processes unless only one is asked for
+    """
+    if processes == 1:
+        return map(attack_results, jobs)
+    with Pool(processes) as pool:
+        return pool.map(attack_results, jobs, chunksize=64)
+
+
+def build_snapshot(path: str) -> Snapshot:
+    """
+    Precompute the standard dice tables and write them to the path
+    """
+    # Compute everything from scratch rather than from any snapshot already in use
+    use_snapshot(None)
+    built = Snapshot.build(memo_tables())
+    built.save(path)
+    return built
+
+
+def build_kill_table(path: str) -> KillTable:
+    """
+    Precompute the standard kill distributions and write them to the path
+    """
+    use_kill_table(None)
+    built = KillTable.build(kill_table_rows())
+    built.save(path)
+    return built
+
+
+def build_atlas(path: str, axes: Optional[dict[str, list]] = None, processes: Optional[int] = None) -> Atlas:
+    """
+    Precompute the results of unmodified attacks over the grid and write them to the path
+    """
+    built = Atlas.build(axes or atlas_axes(), lambda jobs: atlas_results(jobs, processes))
+    built.save(path)
+    return built
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute the standard tables')
+    parser.add_argument('--snapshot', help='Where to write the dice tables')
+    parser.add_argument('--kill-table', help='Where to write the kill distributions')
+    parser.add_argument('--atlas', help='Where to write the results of unmodified attacks')
+    parser.add_argument('--processes', type=int, help='The number of processes used to build the atlas')
+    args = parser.parse_args()
+    if args.snapshot:
+        print(f'Wrote {len(build_snapshot(args.snapshot))} tables to {args.snapshot}')
+    if args.kill_table:
+        print(f'Wrote {len(build_kill_table(args.kill_table))} rows to {args.kill_table}')
+    if args.atlas:
+        print(f'Wrote {len(build_atlas(args.atlas, processes=args.processes))} results to {args.atlas}')
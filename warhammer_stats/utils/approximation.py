@@ -0,0 +1,98 @@
+"""
+Approximations for compounding a distribution over a large number of dice
+https://en.wikipedia.org/wiki/Edgeworth_series
+"""
+
+from __future__ import annotations
+
+import math
+
+from numpy import arange, array, clip, diff, exp, ndarray, sqrt, vectorize, zeros
+
+from .pmf import PMF
+
+# Berry-Esseen constant for sums of independent identically distributed variables
+BERRY_ESSEEN = 0.4748
+
+_erf = vectorize(math.erf)
+
+
+def cumulants(values: ndarray) -> tuple[float, float, float, float]:
+    """
+    Return the mean, variance, third central moment and absolute third central moment
+    of a distribution
+    """
+    support = arange(len(values))
+    mean = float((support * values).sum())
+    centred = support - mean
+    return (
+        mean,
+        float((centred**2 * values).sum()),
+        float((centred**3 * values).sum()),
+        float((abs(centred)**3 * values).sum()),
+    )
+
+
+def skewed_normal(mean: float, variance: float, third: float, length: int) -> ndarray:
+    """
+    Discretize a normal distribution with a first order Edgeworth (skew) correction onto the
+    integers 0..length-1, using a continuity correction at the edges of each bucket.
+    """
+    values = zeros(length)
+    if variance <= 0.0:
+        values[min(max(int(round(mean)), 0), length - 1)] = 1.0
+        return values
+    std = math.sqrt(variance)
+    skew = third / std**3
+    edges = (arange(-1, length) + 0.5 - mean) / std
+    normal_cdf = 0.5 * (1 + _erf(edges / math.sqrt(2)))
+    normal_pdf = exp(-edges**2 / 2) / math.sqrt(2 * math.pi)
+    cdf = clip(normal_cdf - normal_pdf * skew / 6 * (edges**2 - 1), 0.0, 1.0)
+    cdf[0], cdf[-1] = 0.0, 1.0
+    values = clip(diff(cdf), 0.0, None)
+    return values / values.sum()
+
+
+def variance_error(variance: float, approximate_variance: float) -> float:
+    """
+    Estimate the largest error in the cumulative distribution from approximating a distribution
+    by one with the same mean and a different variance. Between two normal distributions it is
+    at most (s - 1) / sqrt(2 pi e) for a ratio s of their standard deviations.
+    """
+    low, high = sorted([variance, approximate_variance])
+    if low <= 0.0:
+        return 1.0 if high > 0.0 else 0.0
+    return min((math.sqrt(high / low) - 1) / math.sqrt(2 * math.pi * math.e), 1.0)
+
+
+def approximate_compound(rows: ndarray, lengths: list[int], count: PMF) -> tuple[ndarray, list[int], float]:
+    """
+    Approximate compounding each row by the count distribution. The cumulants of the compound
+    distribution follow from those of the rows and the count, and each field is replaced by a
+    skew-corrected discretized normal.
+
+    Returns the approximated rows, their lengths and a Berry-Esseen estimate of the largest
+    error in any of their cumulative distributions.
+    """
+    count_mean, count_var, count_third, _ = cumulants(array(count.values))
+    max_count = max(i for i, prob in enumerate(count.values) if not PMF.is_null_prob(prob))
+    new_lengths = [1 + max_count * (length - 1) for length in lengths]
+
+    approximated = zeros((len(lengths), max(new_lengths)))
+    error = 0.0
+    for i, length in enumerate(lengths):
+        mean, var, third, abs_third = cumulants(rows[i, :length])
+        if var <= 0.0:
+            # Every die gives the same value so the sum is just a multiple of the count
+            for dice, prob in enumerate(count.values[:max_count + 1]):
+                approximated[i, min(int(round(dice * mean)), new_lengths[i] - 1)] += prob
+            continue
+        approximated[i, :new_lengths[i]] = skewed_normal(
+            count_mean * mean,
+            count_mean * var + count_var * mean**2,
+            count_mean * third + 3 * count_var * mean * var + count_third * mean**3,
+            new_lengths[i],
+        )
+        if count_mean > 0.0:
+            error = max(error, BERRY_ESSEEN * abs_third / (var**1.5 * sqrt(count_mean)))
+    return approximated, new_lengths, min(error, 1.0)
@@ -0,0 +1,99 @@
+"""
+Estimates of the memory the large steps of an evaluation allocate, so that a step that would
+go over a memory budget can switch to a cheaper strategy or fail before allocating anything.
+
+The estimates count the largest arrays a step holds at once, not every temporary, and are
+meant to catch requests that are orders of magnitude too large rather than to be exact.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+FLOAT = 8
+COMPLEX = 16
+# The values of a JointPMF are kept as tuples of python floats
+PYTHON_FLOAT = 32
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """
+    A step of an evaluation would need more memory than the budget allows
+
+    Args:
+        step (str): The step that would go over the budget
+        footprint (int): The estimated bytes the step needs
+        budget (int): The budget in bytes
+        hint (str): How the step could be made to fit, if it can
+    """
+    def __init__(self, step: str, footprint: int, budget: int, hint: str = '') -> None:
+        self.step = step
+        self.footprint = footprint
+        self.budget = budget
+        message = f'{step} needs about {footprint} bytes, more than the memory budget of {budget} bytes'
+        super().__init__(f'{message}, {hint}' if hint else message)
+
+
+class MemoryBudget:
+    """
+    The most memory, in bytes, any one step of an evaluation may allocate
+
+    Args:
+        limit (int): The budget in bytes, None for no limit
+    """
+    def __init__(self, limit: Optional[int] = None) -> None:
+        self.limit = limit
+
+    def fits(self, footprint: int) -> bool:
+        return self.limit is None or footprint <= self.limit
+
+    def check(self, step: str, footprint: int, hint: str = '') -> None:
+        """
+        Raise MemoryBudgetExceeded if the footprint of the step is over the budget
+        """
+        if not self.fits(footprint):
+            raise MemoryBudgetExceeded(step, footprint, self.limit, hint)
+
+
+def compound_footprint(fields: int, length: int, count: int) -> int:
+    """
+    Compounding rows of fields by up to count dice holds the transform of the rows, the result,
+    a temporary and the inverse transform, each as long as the compounded distributions
+    """
+    return 4 * COMPLEX * fields * (1 + count * (length - 1))
+
+
+def approximate_footprint(fields: int, length: int, count: int) -> int:
+    """
+    Approximating the compound only holds the approximated distributions
+    """
+    return FLOAT * fields * (1 + count * (length - 1))
+
+
+def powers_footprint(length: int, count: int) -> int:
+    """
+    The transformed powers of a distribution of a length for 0 up to count draws, their inverse
+    transform and its real part
+    """
+    return (2 * COMPLEX + FLOAT) * (count + 1) * (1 + count * (length - 1))
+
+
+def joint_footprint(shape: tuple[int, int]) -> int:
+    """
+    A joint distribution of a shape, along with its transform while it is compounded
+    """
+    return (PYTHON_FLOAT + 3 * COMPLEX) * shape[0] * shape[1]
+
+
+def convolve_footprint(count: int, length: int) -> int:
+    """
+    Convolving count arrays in one batch holds a row and a transformed row for each of them
+    """
+    return (FLOAT + COMPLEX) * count * length
+
+
+def streaming_footprint(length: int) -> int:
+    """
+    Convolving one array at a time only holds the running product and one transform
+    """
+    return 2 * COMPLEX * length
@@ -0,0 +1,95 @@
+"""
+Compile the dice expressions used on datasheets, such as "2D6+1", "D6 (min 3)" or "D3+3",
+into distributions.
+
+Expressions are first rewritten into a canonical text, with like dice counted together and the
+constants added up, so equivalent spellings such as "1d3 + 3" and "3+D3" compile once and
+resolve to the same interned distributions.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from functools import cache
+
+from .pmf import PMF, PMFCollection
+
+TERM = re.compile(r'([+-]?)(?:(\d*)(D))?(\d+)')
+EXPRESSION = re.compile(r'[+-]?(\d*D)?\d+([+-](\d*D)?\d+)*')
+MINIMUM = re.compile(r'\(MIN\.?(\d+)\)$')
+
+
+@cache
+def normalize(expression: str) -> str:
+    """
+    The canonical text of a dice expression, with the dice largest first and then the constant
+    """
+    text = re.sub(r'\s+', '', expression.upper())
+    minimum = MINIMUM.search(text)
+    if minimum:
+        text = text[:minimum.start()]
+    if not EXPRESSION.fullmatch(text):
+        raise ValueError(f'invalid dice expression {expression!r}')
+
+    dice: Counter = Counter()
+    constant = 0
+    for sign, count, die, value in TERM.findall(text):
+        if die and sign == '-':
+            raise ValueError(f'dice can not be subtracted in {expression!r}')
+        if die:
+            dice[int(value)] += int(count or 1)
+        else:
+            constant += -int(value) if sign == '-' else int(value)
+
+    canonical = '+'.join(f'{count if count > 1 else ""}D{sides}' for sides, count in sorted(dice.items(), reverse=True) if count)
+    if constant or not canonical:
+        canonical += f'{constant:+d}' if canonical else str(constant)
+    return canonical + (f'(MIN{int(minimum.group(1))})' if minimum else '')
+
+
+def total_of(collection: PMFCollection) -> PMF:
+    return collection.pmfs[0] if len(collection) == 1 else collection.convolve()
+
+
+@cache
+def compile_dice(text: str) -> PMFCollection:
+    """
+    The dice of a canonical expression, one PMF for each dice and one for the constant
+    """
+    minimum = MINIMUM.search(text)
+    dice = []
+    constant = 0
+    for sign, count, die, value in TERM.findall(text[:minimum.start()] if minimum else text):
+        if die:
+            dice += [PMF.dn(int(value))] * int(count or 1)
+        else:
+            constant = -int(value) if sign == '-' else int(value)
+    if constant > 0 or not dice:
+        dice.append(PMF.static(max(constant, 0)))
+    collection = PMFCollection(dice)
+    if constant >= 0 and not minimum:
+        return collection
+    # The minimum and any constant taken away apply to the total, so the dice are rolled together
+    total = total_of(collection).roll(min(constant, 0))
+    return PMFCollection([total.min(int(minimum.group(1))) if minimum else total])
+
+
+def parse_dice(expression: str) -> PMFCollection:
+    """
+    The dice of an expression as a PMFCollection, ready to use as the shots or damage of a
+    weapon. Equivalent expressions return the same collection.
+    """
+    return compile_dice(normalize(expression))
+
+
+@cache
+def compile_total(text: str) -> PMF:
+    return total_of(compile_dice(text))
+
+
+def dice_pmf(expression: str) -> PMF:
+    """
+    The distribution of the total of an expression
+    """
+    return compile_total(normalize(expression))
@@ -0,0 +1,76 @@
+"""
+Base class for the immutable value objects (weapons, targets, PMFs and modifiers)
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import Any, TypeVar
+
+F = TypeVar('F', bound='Frozen')
+
+
+@cache
+def slot_names(cls: type) -> tuple[str, ...]:
+    """
+    All the slots declared by the class and its bases, apart from the cached hash
+    """
+    names: list[str] = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name != '_hash' and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def hashable(value: Any) -> Any:
+    """
+    Convert lists into tuples so that the value can be hashed
+    """
+    if isinstance(value, list):
+        return tuple(hashable(x) for x in value)
+    return value
+
+
+class Frozen:
+    """
+    An immutable value object. Subclasses declare their attributes in __slots__ and each can
+    only be set once, in __init__. Instances are equal if they are the same type with equal
+    attributes, and the hash is computed once and cached, so they are safe to use as cache keys.
+    """
+    __slots__ = ('_hash',)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f'{type(self).__name__} is immutable, use replace() to change {name}')
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __getstate__(self) -> tuple[None, dict[str, Any]]:
+        # Leave out the cached hash, it isn't stable between processes
+        return None, {name: getattr(self, name) for name in slot_names(type(self)) if hasattr(self, name)}
+
+    def _key(self) -> tuple:
+        return tuple(hashable(getattr(self, name, None)) for name in slot_names(type(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return NotImplemented
+        return hash(self) == hash(other) and self._key() == other._key()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            object.__setattr__(self, '_hash', hash((type(self), self._key())))
+            return self._hash
+
+    def replace(self: F, **changes: Any) -> F:
+        """
+        Return a copy with some of the attributes changed
+        """
+        return type(self)(**{**{name: getattr(self, name) for name in slot_names(type(self))}, **changes})
@@ -0,0 +1,200 @@
+"""
+Probability mass functions over pairs of outcomes that aren't independent
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from numpy import abs as np_abs, arange, array, fft, ndarray, outer, zeros
+
+from .frozen import Frozen
+from .pmf import PMF
+from .progeny import MAX_DESCENDANTS, PROGENY_EPSILON, cap_tail, resolve_generations
+
+
+def powers(dist: PMF, count: int) -> ndarray:
+    """
+    The distributions of the sums of 0 up to count independent draws from the distribution,
+    one per row, from the powers of its transform
+    """
+    length = 1 + count * (len(dist) - 1)
+    transformed = fft.fft(dist.values, n=length)
+    return np_abs(fft.ifft(transformed[None, :] ** arange(count + 1)[:, None]).real)
+
+
+class JointPMF(Frozen):
+    """
+    The joint distribution of two outcomes, values[i][j] is the chance of the first being i
+    and the second being j. Joint PMFs are immutable value objects like PMFs.
+    """
+    __slots__ = ('values',)
+
+    def __init__(self, values: Iterable[Iterable[float]]):
+        self.values = tuple(tuple(row) for row in values)
+
+    def __str__(self) -> str:
+        return str([[round(x, 4) for x in row] for row in self.values])
+
+    def __mul__(self, other: float) -> JointPMF:
+        return JointPMF([[x * other for x in row] for row in self.values])
+
+    def __rmul__(self, other: float) -> JointPMF:
+        return self * other
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.values), len(self.values[0])
+
+    def to_array(self) -> ndarray:
+        return array(self.values, dtype=float).reshape(self.shape)
+
+    @classmethod
+    def from_array(cls, values: ndarray) -> JointPMF:
+        return cls(values.tolist())
+
+    def marginal(self, axis: int) -> PMF:
+        """
+        The distribution of one of the outcomes on its own
+        """
+        return PMF([float(x) for x in self.to_array().sum(axis=1 - axis)])
+
+    def total(self) -> PMF:
+        """
+        The distribution of the sum of the two outcomes
+        """
+        values = self.to_array()
+        totals = zeros(sum(self.shape) - 1)
+        for i, row in enumerate(values):
+            totals[i:i + len(row)] += row
+        return PMF([float(x) for x in totals])
+
+    def mean(self) -> tuple[float, float]:
+        return self.marginal(0).mean(), self.marginal(1).mean()
+
+    def covariance(self) -> float:
+        """
+        The covariance of the two outcomes
+        """
+        first, second = self.mean()
+        rows, columns = arange(self.shape[0])[:, None] - first, arange(self.shape[1])[None, :] - second
+        return float((self.to_array() * rows * columns).sum())
+
+    def shift(self, first: int, second: int) -> JointPMF:
+        """
+        Add a fixed amount to each of the outcomes
+        """
+        values = zeros((self.shape[0] + first, self.shape[1] + second))
+        values[first:, second:] = self.to_array()
+        return JointPMF.from_array(values)
+
+    def map_axis(self, axis: int, dists: ndarray) -> JointPMF:
+        """
+        Replace each value of one of the outcomes with a draw from the distribution in that row
+        of dists, such as the damage done by that many failed saves
+        """
+        transform = dists[:self.shape[axis]].T
+        values = self.to_array()
+        mapped = transform @ values if axis == 0 else values @ transform.T
+        return JointPMF.from_array(mapped)
+
+    def trim_tail(self, epsilon: float, shape: Optional[tuple[int, int]] = None) -> JointPMF:
+        """
+        Cut off the largest values of each outcome while they hold less than epsilon of the mass,
+        and any past the shape, folding their mass into the largest value kept
+        """
+        values = self.to_array()
+        for axis in (0, 1):
+            tail = values.sum(axis=1 - axis)[::-1].cumsum()[::-1]
+            keep = max(1, int((tail >= epsilon).sum()))
+            if shape is not None:
+                keep = min(keep, shape[axis])
+            values = cap_tail(values, (keep, values.shape[1]) if axis == 0 else (values.shape[0], keep))
+        return JointPMF.from_array(values)
+
+    def compound(self, count_dist: PMF) -> JointPMF:
+        """
+        The distribution of the sum of a random number of independent draws, with the count
+        distribution's generating function evaluated in the frequency space of the joint PMF
+        """
+        counts = len(count_dist) - 1
+        shape = (1 + counts * (self.shape[0] - 1), 1 + counts * (self.shape[1] - 1))
+        transformed = fft.fft2(self.to_array(), s=shape)
+        result = zeros(shape, dtype=complex)
+        for prob in reversed(count_dist.values):
+            result = result * transformed + prob
+        return JointPMF.from_array(np_abs(fft.ifft2(result).real))
+
+    @classmethod
+    def static(cls, first: int, second: int) -> JointPMF:
+        values = zeros((first + 1, second + 1))
+        values[first, second] = 1.0
+        return cls.from_array(values)
+
+    @classmethod
+    def independent(cls, first: PMF, second: PMF) -> JointPMF:
+        """
+        The joint distribution of two independent outcomes
+        """
+        return cls.from_array(outer(first.values, second.values))
+
+    @classmethod
+    def flatten(cls, dists: list[JointPMF]) -> JointPMF:
+        """
+        Add up weighted joint PMFs of different shapes
+        """
+        values = zeros((max(d.shape[0] for d in dists), max(d.shape[1] for d in dists)))
+        for dist in dists:
+            values[:dist.shape[0], :dist.shape[1]] += dist.to_array()
+        return cls.from_array(values)
+
+    @classmethod
+    def convolve_many(cls, dists: list[JointPMF]) -> JointPMF:
+        """
+        The joint distribution of the sums of independent pairs of outcomes, convolved with
+        a two dimensional FFT
+        """
+        shape = (1 + sum(d.shape[0] - 1 for d in dists), 1 + sum(d.shape[1] - 1 for d in dists))
+        transformed = fft.fft2(dists[0].to_array(), s=shape)
+        for dist in dists[1:]:
+            transformed = transformed * fft.fft2(dist.to_array(), s=shape)
+        return cls.from_array(np_abs(fft.ifft2(transformed).real))
+
+    @classmethod
+    def descend(cls, offspring: dict[int, JointPMF], descendants: JointPMF) -> JointPMF:
+        """
+        The outcomes of a roll and its extra rolls, where offspring maps the number of extra
+        rolls the roll generates to its weighted outcomes and each extra roll has the outcomes
+        of descendants
+        """
+        return cls.flatten([
+            cls.convolve_many([outcome] + [descendants] * extra) if extra else outcome
+            for extra, outcome in offspring.items()
+        ])
+
+    @classmethod
+    def progeny(cls, offspring: dict[int, JointPMF], root: Optional[dict[int, JointPMF]] = None,
+                epsilon: float = PROGENY_EPSILON) -> JointPMF:
+        """
+        The outcomes of a roll and every extra roll descended from it, where offspring maps the
+        number of extra rolls an extra roll generates to its weighted outcomes. This is the fixed
+        point of J = sum over k of offspring[k] convolved with k copies of J. The first roll can
+        produce outcomes the extra rolls don't, given by root in the same way as offspring.
+
+        As with the number of descendants, the outcomes of more than MAX_DESCENDANTS extra rolls
+        are counted at the cap so the distribution keeps all of its mass.
+        """
+        start = cls.flatten(list(offspring.values()))
+        cap = (1 + (MAX_DESCENDANTS + 1) * (start.shape[0] - 1), 1 + (MAX_DESCENDANTS + 1) * (start.shape[1] - 1))
+
+        def generation(joint: JointPMF) -> JointPMF:
+            values = cls.descend(offspring, joint).trim_tail(epsilon, cap).to_array()
+            # Mass lost to rounding is counted with the rolls that never die out
+            values[-1, -1] += 1.0 - values.sum()
+            return cls.from_array(values)
+
+        def change(updated: JointPMF, joint: JointPMF) -> float:
+            return abs(cls.flatten([updated, joint * -1.0]).to_array()).sum()
+
+        joint = resolve_generations(generation, start, change, epsilon)
+        return joint if root is None else cls.descend(root, joint)
@@ -0,0 +1,168 @@
+"""
+Optional compiled kernels for the tight scalar loops that numpy can't vectorize.
+
+If numba is installed the kernels are compiled on first use and the compiled code is cached
+on disk (next to this module, or in NUMBA_CACHE_DIR), so later processes skip compilation.
+Without numba the callers use their original pure Python implementations. The kernels are
+plain Python as well, so they can be run and checked without numba.
+"""
+
+from __future__ import annotations
+
+from numpy import int64, ndarray, zeros
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on the environment
+    njit = None
+
+# Set to False to force the pure Python implementations
+JIT_ENABLED = njit is not None
+
+# Mirrors PMF.is_null_prob, events less likely than this are ignored
+NULL_PROB = 0.00001
+
+
+def jit(func):
+    """
+    Compile the function with numba when it is available, caching the result on disk
+    """
+    if njit is None:
+        return func
+    return njit(cache=True)(func)
+
+
+@jit
+def re_roll_less_than(values: ndarray, value: float) -> ndarray:
+    """
+    Re-roll all values below a specific value
+    """
+    re_rolled = 0.0
+    for i in range(len(values)):
+        if i < value:
+            re_rolled += values[i]
+    new_values = zeros(len(values))
+    for i in range(len(values)):
+        if i >= value:
+            new_values[i] = values[i]
+        new_values[i] += re_rolled * values[i]
+    return new_values
+
+
+@jit
+def max_of_two(values_1: ndarray, values_2: ndarray) -> ndarray:
+    """
+    The distribution of the max of two distributions of the same length, using running sums
+    of the lower values rather than re-summing them for every value
+    """
+    new_values = zeros(len(values_1))
+    below_1 = 0.0
+    below_2 = 0.0
+    for value in range(len(values_1)):
+        new_values[value] = values_1[value] * values_2[value] + values_1[value] * below_2 + values_2[value] * below_1
+        below_1 += values_1[value]
+        below_2 += values_2[value]
+    return new_values
+
+
+@jit
+def damage_capped_at(damage: ndarray, wounds_left: int) -> ndarray:
+    """
+    The damage distribution with damage above the wounds left capped at the wounds left
+    """
+    capped = zeros(min(len(damage), wounds_left + 1))
+    for dam in range(len(damage)):
+        capped[min(dam, wounds_left)] += damage[dam]
+    return capped
+
+
+@jit
+def roll_damage_die(fresh: ndarray, wounded: ndarray, damage: ndarray) -> tuple[ndarray, ndarray]:
+    """
+    Apply one damage die to the table of (wounds left, kills) states
+    """
+    wounds = wounded.shape[0] - 1
+    new_fresh = zeros(len(fresh))
+    new_wounded = zeros(wounded.shape)
+    for wounds_left in range(1, wounds + 1):
+        capped = damage_capped_at(damage, wounds_left)
+        for kills in range(len(fresh)):
+            prob = wounded[wounds_left, kills]
+            if wounds_left == wounds:
+                prob += fresh[kills]
+            if prob == 0.0:
+                continue
+            for dam in range(len(capped)):
+                if capped[dam] < NULL_PROB:
+                    continue
+                if dam == wounds_left:
+                    new_fresh[kills + 1] += prob * capped[dam]
+                else:
+                    new_wounded[wounds_left - dam, kills] += prob * capped[dam]
+    return new_fresh, new_wounded
+
+
+@jit
+def mortal_kills(wounds: int, wounds_left: int, dam: int) -> int:
+    """
+    The extra kills from mortal wounds dealt to a model with wounds left, which spill over to
+    the next model, mirroring generate_mortal_kill_tree
+    """
+    if dam < wounds_left:
+        return 0
+    return 1 + (dam - wounds_left) // wounds
+
+
+@jit
+def kill_dist(wounds: int, dice: int, damage: ndarray, mortals: ndarray) -> ndarray:
+    """
+    The distribution of kills from a number of damage dice, followed by mortal wounds dealt to
+    the model the last die left. This walks the dice once with a table of the probability
+    of each (wounds left on the current model, kills) state, matching the kill tree in
+    kill_phase. Excess damage on a model is lost.
+    """
+    dice = max(dice, 0)
+    result = zeros(dice + len(mortals) + 1)
+
+    # fresh holds the states where no die has been rolled since the last kill
+    fresh = zeros(dice + 1)
+    fresh[0] = 1.0
+    wounded = zeros((wounds + 1, dice + 1))
+    for _ in range(dice):
+        fresh, wounded = roll_damage_die(fresh, wounded, damage)
+
+    for kills in range(dice + 1):
+        for wounds_left in range(1, wounds + 1):
+            prob = wounded[wounds_left, kills]
+            if wounds_left == wounds:
+                prob += fresh[kills]
+            for dam in range(len(mortals)):
+                if prob > 0.0 and mortals[dam] >= NULL_PROB:
+                    result[kills + mortal_kills(wounds, wounds_left, dam)] += prob * mortals[dam]
+
+    return trim_zeros(result)
+
+
+@jit
+def trim_zeros(values: ndarray) -> ndarray:
+    """
+    Drop the trailing zeros, keeping at least one value
+    """
+    length = 1
+    for i in range(len(values)):
+        if values[i] > 0.0:
+            length = i + 1
+    return values[:length]
+
+
+@jit
+def slice_patterns(thresholds: ndarray, modifier: int, faces: int) -> ndarray:
+    """
+    For every face of the die, a row flagging which slices apply to it. Faces with the same
+    row share the same merged modifiers.
+    """
+    patterns = zeros((faces, len(thresholds)), dtype=int64)
+    for i in range(len(thresholds)):
+        for face in range(max(thresholds[i] + modifier, 0), faces):
+            patterns[face, i] = 1
+    return patterns
@@ -0,0 +1,53 @@
+"""
+Memoization of the intermediate dice distributions derived while evaluating an attack
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable
+
+from . import snapshot
+from .pmf import PMF
+
+
+class DiceMemo:
+    """
+    Holds the modified dice distributions and thresholds derived during a single evaluation
+    so that every roll and phase of the attack can share them.
+
+    Entries are keyed by the phase, a fingerprint of the modifiers that produced them and
+    any thresholds used. Distributions missing from the memo are looked up in the active
+    snapshot before being computed.
+    """
+    def __init__(self) -> None:
+        self._values: dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Fetch the value for the key, calling func to produce it on a miss
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            # Only the distributions are kept in snapshots
+            value = snapshot.lookup('memo', *key) if key[1] == 'dist' else None
+            if value is None:
+                value = func()
+            self._values[key] = value
+            return value
+
+    def pmfs(self) -> list[tuple[Hashable, PMF]]:
+        """
+        The entries that hold a single distribution, these are the ones that can be snapshot
+        """
+        return [(key, value) for key, value in self._values.items() if isinstance(value, PMF)]
+
+    def fingerprint(self, mods: list) -> tuple:
+        """
+        A structural fingerprint of a list of modifiers, modifiers compare by value so this is
+        just the list as a tuple
+        """
+        return tuple(mods)
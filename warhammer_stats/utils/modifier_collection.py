@@ -1,11 +1,16 @@
+from numpy import array
+
+from ..utils import kernels
+from ..utils.frozen import Frozen
 from ..utils.pmf import PMFCollection
-import json
-import hashlib
+from ..modifiers import Modifier
 
-class ModifierCollection:
+class ModifierCollection(Frozen):
     """
     Used to keep track of any modifiers to the attack
     """
+    __slots__ = ('attacks_mods', 'hit_mods', 'wound_mods', 'save_mods', 'fnp_mods', 'damage_mods')
+
     def __init__(self, attacks_mods=None, hit_mods=None, wound_mods=None, save_mods=None,
                  fnp_mods=None, damage_mods=None):
 
@@ -40,11 +45,18 @@ class ModifierCollection:
             'damage_mods': [x.to_dict() for x in self.damage_mods],
         }
 
-    def __hash__(self):
-        return int(hashlib.md5(json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")).hexdigest(), 16)
+    def dice_fingerprint(self, mods: list) -> tuple:
+        """
+        Identify the mods in the list that change the dice themselves (re-rolls, added dice)
+        rather than a threshold or characteristic
+        """
+        return tuple(
+            mod for mod in mods
+            if type(mod).modify_dice is not Modifier.modify_dice or type(mod).modify_re_roll is not Modifier.modify_re_roll
+        )
 
-    def _sort_priority(self, mods: list) -> list:
-        return sorted(mods, key=lambda x: x.priority, reverse=True)
+    def _sort_priority(self, mods: list) -> tuple:
+        return tuple(sorted(mods, key=lambda x: x.priority, reverse=True))
 
     def _mod_dice(self, collection: PMFCollection, mods: list, thresh=None,
                   mod_thresh=None) -> PMFCollection:
@@ -143,7 +155,7 @@ class ModifierCollection:
         output = []
         for hit_prob, hit_mod in flattened_hit_slices:
             output.append([hit_prob, hit_mod + self])
-        return output
+        return self.dedupe_slices(output)
 
     def split_save_roll(self, hit_dist, hit_modifier, wound_dist, wound_modifier):
         flattened_hit_slices = self.split_on_hit(
@@ -164,7 +176,7 @@ class ModifierCollection:
         for hit_prob, hit_mod in flattened_hit_slices:
             for wound_prob, wound_mod in flattened_wound_slices:
                 output.append([hit_prob * wound_prob, hit_mod + wound_mod + self])
-        return output
+        return self.dedupe_slices(output)
 
     def split_damage_roll(self, hit_dist, hit_modifier, wound_dist, wound_modifier):
         flattened_hit_slices = self.split_on_hit(
@@ -185,7 +197,22 @@ class ModifierCollection:
         for hit_prob, hit_mod in flattened_hit_slices:
             for wound_prob, wound_mod in flattened_wound_slices:
                 output.append([hit_prob * wound_prob, hit_mod + wound_mod + self])
-        return output
+        return self.dedupe_slices(output)
+
+    def dedupe_slices(self, slices):
+        """
+        Merge the probability of slices with identical modifiers and drop the impossible ones,
+        so each distinct set of modifiers is only evaluated once
+        """
+        deduped: dict = {}
+        for prob, mod in slices:
+            if prob == 0:
+                continue
+            if mod in deduped:
+                deduped[mod][0] += prob
+            else:
+                deduped[mod] = [prob, mod]
+        return list(deduped.values())
 
     def modify_slices(self, slices, modifier):
         return [[max(x[0]+modifier, 0), x[1]] for x in slices]
@@ -197,6 +224,8 @@ class ModifierCollection:
         return output
 
     def collect_slices(self, slices, modifier=0):
+        if kernels.JIT_ENABLED:
+            return self._collect_slice_patterns(slices, modifier)
         value_dict = {x: [] for x in range(7)}
         for slice_index, slice_mods in slices:
             for i in range(max(slice_index + modifier, 0), 7):
@@ -204,10 +233,26 @@ class ModifierCollection:
         merged = {i: self.sum_mod_collections(value_dict[i]) for i in value_dict}
         inverted = {}
         for i in merged:
-            if merged[i].__hash__() in inverted:
-                inverted[merged[i].__hash__()][1].append(i)
+            if merged[i] in inverted:
+                inverted[merged[i]][1].append(i)
+            else:
+                inverted[merged[i]] = [merged[i], [i]]
+        return inverted
+
+    def _collect_slice_patterns(self, slices, modifier=0):
+        # Only merge and hash the modifiers once for each distinct set of slices
+        patterns = kernels.slice_patterns(array([x[0] for x in slices], dtype=int), modifier, 7)
+        merged: dict = {}
+        inverted: dict = {}
+        for i in range(7):
+            pattern = tuple(patterns[i])
+            if pattern not in merged:
+                merged[pattern] = self.sum_mod_collections([x[1] for x, flag in zip(slices, pattern) if flag])
+            collection = merged[pattern]
+            if collection in inverted:
+                inverted[collection][1].append(i)
             else:
-                inverted[merged[i].__hash__()] = [merged[i], [i]]
+                inverted[collection] = [collection, [i]]
         return inverted
 
     def sum_mod_collections(self, mod_collections):
@@ -6,18 +6,45 @@ https://en.wikipedia.org/wiki/Probability_mass_function
 from __future__ import annotations
 import math
 
-from typing import Callable, Optional, Union
-from numpy import fft, zeros
+from functools import cache, lru_cache
+
+from typing import Callable, Iterable, Optional, Union
+from numpy import arange, array, clip, cumsum, diff, fft, ones, zeros
+
+from . import kernels
+from .frozen import Frozen
+
+# The most order statistics kept, enough for the dice of every modifier in an evaluation
+ORDER_STATISTIC_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=ORDER_STATISTIC_CACHE_SIZE)
+def order_statistic(values: tuple[float, ...], count: int, rank: int) -> PMF:
+    """
+    The PMF of the rank-th highest of count rolls of the values. The rank-th highest is at most
+    a value when at least count - rank + 1 of the rolls are, which is a binomial sum of powers
+    of the CDF.
+    """
+    if not 1 <= rank <= count:
+        raise ValueError(f'rank {rank} is not between 1 and {count}')
+    at_most = clip(cumsum(values), 0.0, 1.0)[:, None]
+    rolls = arange(count - rank + 1, count + 1)
+    coefficients = array([math.comb(count, n) for n in rolls], dtype=float)
+    cdf = (coefficients * at_most ** rolls * (1.0 - at_most) ** (count - rolls)).sum(axis=1)
+    return PMF(list(diff(cdf, prepend=0.0)))
+
 
 # pylint: disable=too-many-public-methods
 
-class PMF:
+class PMF(Frozen):
     """
     Discrete Probability Distribution - Used to keep track of the probability of random discrete
-    events
+    events. PMFs are immutable, so the values are kept as a tuple.
     """
-    def __init__(self, values: list[float]):
-        self.values = [abs(x) for x in values]
+    __slots__ = ('values',)
+
+    def __init__(self, values: Iterable[float]):
+        self.values = tuple(abs(x) for x in values)
 
     def __str__(self) -> str:
         return str(self.rounded().values)
@@ -79,6 +106,8 @@ class PMF:
         """
         Re-roll all values below a specific value
         """
+        if kernels.JIT_ENABLED:
+            return PMF(list(kernels.re_roll_less_than(array(self.values, dtype=float), value)))
         rr_mask = [0.0 if i < value else x for i, x in enumerate(self.values)]
         for i, _ in enumerate(self.values):
             if i < value:
@@ -114,19 +143,26 @@ class PMF:
         """
         Pad values with zeros to reach the desired length
         """
-        return PMF(self.values + [0.0] * max(length - len(self), 0))
+        return PMF(self.values + (0.0,) * max(length - len(self), 0))
 
     def add_value(self, value: int) -> PMF:
         """
         Add an integer value to the PMF by shifting the values right
         """
-        return PMF([0.0] * value + self.values)
+        return PMF((0.0,) * value + self.values)
 
     def max_of_two(self) -> PMF:
         """
         Produce the PMF from rolling two of this PMF and choosing the higher
         """
-        return PMF.max_of_two_pmf(self, self)
+        return self.order_statistic(2)
+
+    def order_statistic(self, count: int, rank: int = 1) -> PMF:
+        """
+        The PMF of the rank-th highest of count rolls of this PMF, so rank 1 keeps the highest
+        and rank count keeps the lowest
+        """
+        return order_statistic(self.values, count, rank)
 
     def roll(self, roll_value: int) -> PMF:
         """
@@ -137,10 +173,10 @@ class PMF:
             return self
         elif roll_value < 0:
             index = (-1 * roll_value) + 1
-            return PMF([sum(self.values[:index])] + self.values[index:])
+            return PMF((sum(self.values[:index]),) + self.values[index:])
         elif roll_value > 0:
-            return PMF([0.0] * roll_value + self.values)
-        return PMF([sum(self.values[:(-1*roll_value)+1])] + self.values[(-1*roll_value)+1:])
+            return PMF((0.0,) * roll_value + self.values)
+        return PMF((sum(self.values[:(-1*roll_value)+1]),) + self.values[(-1*roll_value)+1:])
 
     def div_min_one(self, divisor: int) -> PMF:
         """
@@ -157,7 +193,7 @@ class PMF:
         Sets the minimum value of the PMF by adding the sum of all probabilites less than
         the min_val to the min val.
         """
-        return PMF([0.0] * min_val + [sum(self.values[:min_val+1])] + self.values[min_val+1:])
+        return PMF((0.0,) * min_val + (sum(self.values[:min_val+1]),) + self.values[min_val+1:])
 
     def mean(self) -> float:
         """
@@ -180,6 +216,7 @@ class PMF:
         return PMF([round(x, 4) for x in self.values])
 
     @classmethod
+    @cache
     def dn(cls, dice_sides: int) -> PMF:  # pylint: disable=invalid-name
         """
         Return the PMD for a dice with dice_sides number of sides
@@ -187,6 +224,7 @@ class PMF:
         return PMF([0.0] + [1/dice_sides] * dice_sides)
 
     @classmethod
+    @cache
     def static(cls, static_value: int) -> PMF:
         """
         Return the PMD for exactly the static_value
@@ -222,6 +260,18 @@ class PMF:
         # be ignored.
         return PMF(list(convolution.real))
 
+    @classmethod
+    def convolve_streaming(cls, dists: list[PMF]) -> PMF:
+        """
+        Convolve like convolve_many, but transform one array at a time into the running
+        product so only a single row is held rather than one for each array
+        """
+        result_length = 1 + sum((len(dist) - 1) for dist in dists)
+        fft_of_convolution = ones(result_length, dtype=complex)
+        for dist in dists:
+            fft_of_convolution *= fft.fft(dist.values, n=result_length)
+        return PMF(list(fft.ifft(fft_of_convolution).real))
+
     @classmethod
     def flatten(cls, dists: list[PMF]) -> PMF:
         """
@@ -247,6 +297,8 @@ class PMF:
         Compute the PMF for the max of two PMF
         """
         dist1, dist2 = cls.match_sizes([dist1, dist2])
+        if kernels.JIT_ENABLED:
+            return PMF(list(kernels.max_of_two(array(dist1.values, dtype=float), array(dist2.values, dtype=float))))
         new_dist = []
         for value in range(len(dist1)):
             prob = dist1.get(value) * dist2.get(value)
@@ -256,6 +308,7 @@ class PMF:
         return PMF(new_dist)
 
     @classmethod
+    @cache
     def zero(cls) -> PMF:
         """
         A PMF with a 100% chance of being zero
@@ -270,12 +323,14 @@ class PMF:
         return prob < 0.00001
 
 
-class PMFCollection:
+class PMFCollection(Frozen):
     """
     Discrete Probability Distribution - Used to keep track of collections of PMFs
     """
-    def __init__(self, pmfs: Optional[list[PMF]] = None):
-        self.pmfs = pmfs or []
+    __slots__ = ('pmfs',)
+
+    def __init__(self, pmfs: Optional[Iterable[PMF]] = None):
+        self.pmfs = tuple(pmfs or ())
 
     def __bool__(self) -> bool:
         return len(self) > 0
@@ -299,7 +354,7 @@ class PMFCollection:
         """
         Modify the collection based on a dice modifer
         """
-        if thresh_mod == 0 or self.pmfs == []:  # pylint: disable=no-else-return
+        if thresh_mod == 0 or not self.pmfs:  # pylint: disable=no-else-return
             return self
         else:
             return self.map(lambda x: x.roll(thresh_mod))
@@ -347,7 +402,7 @@ class PMFCollection:
         """
         returns the PMF collection plus a static value
         """
-        return PMFCollection(self.pmfs + [PMF.static(static_value)])
+        return PMFCollection(self.pmfs + (PMF.static(static_value),))
 
     @classmethod
     def add_many(cls, collection_list: list[PMFCollection]) -> PMFCollection:
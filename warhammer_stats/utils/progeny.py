@@ -0,0 +1,64 @@
+"""
+Resolving extra rolls that can generate further extra rolls, to any depth, one generation at a
+time until the outcomes stop changing.
+
+Outcomes past a cap are folded into the cap rather than dropped, so the distributions keep all
+of their mass even when the extra rolls never die out.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, TypeVar
+
+from numpy import ndarray
+
+T = TypeVar('T')
+
+# Extra rolls are resolved until a further generation changes the outcomes by less than this
+PROGENY_EPSILON = 1e-9
+MAX_GENERATIONS = 4096
+# Processes that never die out are cut off at this many descendants
+MAX_DESCENDANTS = 256
+
+
+class ProgenyNotConverged(ArithmeticError):
+    """
+    The outcomes of the extra rolls were still changing after the most generations
+
+    Args:
+        change (float): How much the last generation changed the outcomes
+    """
+    def __init__(self, change: float) -> None:
+        self.change = change
+        super().__init__(f'extra rolls still changed the outcomes by {change:.3g} after {MAX_GENERATIONS} generations')
+
+
+def cap_tail(values: ndarray, shape: tuple[int, ...]) -> ndarray:
+    """
+    Cut the values down to the shape, folding the mass past the end of each axis into its last index
+    """
+    for axis, length in enumerate(shape):
+        if values.shape[axis] > length:
+            head = values.take(range(length), axis=axis)
+            tail = values.take(range(length - 1, values.shape[axis]), axis=axis).sum(axis=axis)
+            index = [slice(None)] * values.ndim
+            index[axis] = length - 1
+            head[tuple(index)] = tail
+            values = head
+    return values
+
+
+def resolve_generations(generation: Callable[[T], T], start: T, change: Callable[[T, T], float],
+                        epsilon: float = PROGENY_EPSILON) -> T:
+    """
+    Add one generation of extra rolls at a time to the outcomes, starting from those of the
+    rolls without any, until a generation changes them by less than epsilon
+    """
+    outcomes = start
+    for _ in range(MAX_GENERATIONS):
+        updated = generation(outcomes)
+        last_change = change(updated, outcomes)
+        outcomes = updated
+        if last_change < epsilon:
+            return outcomes
+    raise ProgenyNotConverged(last_change)
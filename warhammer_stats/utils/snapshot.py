@@ -0,0 +1,187 @@
+"""
+Snapshots of precomputed distributions, so that a new process starts with warm tables.
+
+A snapshot file holds a JSON header followed by one or more arrays, all in the numpy .npy
+format. The arrays are memory-mapped when the file is loaded, so only the pages holding the
+tables that are actually used get read from disk and processes share the pages they read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from numpy import array, frombuffer, generic, lib, load, memmap, ndarray, prod, save, uint8, zeros
+
+from .pmf import PMF
+
+# The snapshot to load on first use, if any
+SNAPSHOT_ENV = 'WARHAMMER_STATS_SNAPSHOT'
+
+# PMFs that match to this many decimal places share a table entry
+DIGITS = 10
+# The most lookups a snapshot keeps the results of, hits and misses
+LOOKUP_CACHE_SIZE = 4096
+
+_HEADER_READERS = {
+    (1, 0): lib.format.read_array_header_1_0,
+    (2, 0): lib.format.read_array_header_2_0,
+}
+
+T = TypeVar('T')
+
+
+def write_arrays(path: str, header: Any, arrays: list[ndarray]) -> None:
+    """
+    Write a JSON header and the arrays to the file
+    """
+    with open(path, 'wb') as snapshot_file:
+        save(snapshot_file, frombuffer(json.dumps(header).encode('utf-8'), dtype=uint8))
+        for values in arrays:
+            save(snapshot_file, values)
+
+
+def map_arrays(path: str) -> tuple[Any, list[ndarray]]:
+    """
+    Read the JSON header of a file written by write_arrays and memory-map its arrays
+    """
+    arrays = []
+    with open(path, 'rb') as snapshot_file:
+        header = json.loads(load(snapshot_file).tobytes().decode('utf-8'))
+        size = os.fstat(snapshot_file.fileno()).st_size
+        while snapshot_file.tell() < size:
+            version = lib.format.read_magic(snapshot_file)
+            shape, fortran_order, dtype = _HEADER_READERS[version](snapshot_file)
+            offset = snapshot_file.tell()
+            if 0 in shape:
+                arrays.append(zeros(shape, dtype=dtype))
+            else:
+                order = 'F' if fortran_order else 'C'
+                arrays.append(memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape, order=order))
+            snapshot_file.seek(offset + dtype.itemsize * prod(shape, dtype=int))
+    return header, arrays
+
+
+class LazyFile(Generic[T]):
+    """
+    A file that is loaded on first use from the path in an environment variable, if set
+    """
+    def __init__(self, env: str, loader: Callable[[str], T]) -> None:
+        self.env = env
+        self.loader = loader
+        self.value: Optional[T] = None
+        self.loaded = False
+
+    def use(self, value: Optional[T]) -> None:
+        self.value, self.loaded = value, True
+
+    def get(self) -> Optional[T]:
+        if not self.loaded:
+            path = os.environ.get(self.env)
+            self.use(self.loader(path) if path and os.path.exists(path) else None)
+        return self.value
+
+
+def pmf_key(pmf: PMF) -> list[float]:
+    """
+    The rounded values of the PMF without any trailing zeros, used to look the PMF up
+    """
+    values = [round(float(x), DIGITS) for x in pmf.values]
+    while len(values) > 1 and values[-1] == 0.0:
+        values.pop()
+    return values
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, PMF):
+        return pmf_key(value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, generic):
+        return value.item()
+    raise TypeError(f'{value!r} can not be used in a snapshot key')
+
+
+def table_key(table: str, params: tuple) -> str:
+    return json.dumps([table, *params], default=_encode)
+
+
+class Snapshot:
+    """
+    A set of named tables of distributions, each entry keyed by the params used to compute it.
+    The params are serialized into the key of the file's index, and the results of the most
+    recent lookups are kept by the params themselves so that repeated lookups don't serialize them.
+    """
+    def __init__(self, index: Optional[dict[str, tuple[int, int]]] = None, values: Optional[ndarray] = None) -> None:
+        self.index = index or {}
+        self.values = values if values is not None else frombuffer(b'', dtype=float)
+        # Misses are kept too, most lookups are for distributions that aren't in the snapshot
+        self._lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._read)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, table: str, *params: Any) -> Optional[PMF]:
+        """
+        Fetch the distribution for the params, or None if it isn't in the snapshot
+        """
+        return self._lookup(table, params)
+
+    def _read(self, table: str, params: tuple) -> Optional[PMF]:
+        entry = self.index.get(table_key(table, params))
+        if entry is None:
+            return None
+        offset, length = entry
+        return PMF([float(x) for x in self.values[offset:offset + length]])
+
+    @classmethod
+    def build(cls, entries: list[tuple[str, tuple, PMF]]) -> Snapshot:
+        """
+        Build a snapshot from a list of table names, params and the distribution for them
+        """
+        index: dict[str, tuple[int, int]] = {}
+        values: list[float] = []
+        for table, params, pmf in entries:
+            index[table_key(table, params)] = (len(values), len(pmf))
+            values += pmf.values
+        return cls(index, array(values, dtype=float))
+
+    def save(self, path: str) -> None:
+        write_arrays(path, self.index, [self.values.astype(float)])
+
+    @classmethod
+    def load(cls, path: str) -> Snapshot:
+        """
+        Load the index of a snapshot file and memory-map its values
+        """
+        index, (values,) = map_arrays(path)
+        return cls({key: tuple(entry) for key, entry in index.items()}, values)
+
+
+_active = LazyFile(SNAPSHOT_ENV, Snapshot.load)
+
+
+def use_snapshot(snapshot: Optional[Snapshot]) -> None:
+    """
+    Set the snapshot used to look up precomputed tables, None turns the lookups off
+    """
+    _active.use(snapshot)
+
+
+def active_snapshot() -> Optional[Snapshot]:
+    """
+    The snapshot in use, loading the one named by the environment variable on first use
+    """
+    return _active.get()
+
+
+def lookup(table: str, *params: Any) -> Optional[PMF]:
+    """
+    Fetch a precomputed distribution from the active snapshot, if there is one
+    """
+    snapshot = active_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot.get(table, *params)
@@ -2,6 +2,7 @@
 Classes related to modeling the target of an attack
 """
 
+from .frozen import Frozen
 from .modifier_collection import ModifierCollection
 
 from typing import Optional
@@ -9,10 +10,13 @@ from typing import Optional
 # pylint: disable=too-many-arguments,too-few-public-methods
 
 
-class Target:
+class Target(Frozen):
     """
-    Holds params of a target
+    Holds params of a target. Targets are immutable, use replace() to get a target
+    with different params
     """
+    __slots__ = ('toughness', 'save', 'invuln', 'fnp', 'wounds', 'modifiers', 'name', 'cost')
+
     def __init__(self, toughness: int, save: int, invuln: int, fnp: int, wounds: int,
                  modifiers: Optional[ModifierCollection] = None, name: Optional[str] = None,
                  cost: Optional[float] = None):
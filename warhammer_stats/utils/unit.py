@@ -0,0 +1,63 @@
+"""
+Classes related to modeling a unit of several identical models
+"""
+
+from .frozen import Frozen
+from .target import Target
+from .weapon import Weapon
+
+from typing import Iterable, Optional
+
+# pylint: disable=too-few-public-methods
+
+
+class Unit(Frozen):
+    """
+    Holds the params of a unit, the profile of its models as a target, how many models it
+    has and the weapons each model fires. Units are immutable, use replace() to get a unit
+    with different params
+    """
+    __slots__ = ('target', 'models', 'weapons', 'name')
+
+    def __init__(self, target: Target, models: int, weapons: Optional[Iterable[Weapon]] = None,
+                 name: Optional[str] = None) -> None:
+        self.target = target
+        self.models = models
+        self.weapons = tuple(weapons or ())
+        self.name = name
+
+    @property
+    def wounds(self) -> int:
+        """
+        The total wounds of all the models in the unit
+        """
+        return self.models * self.target.wounds
+
+
+class UnitTarget(Frozen):
+    """
+    Holds the params of a unit with models of different profiles, as the profiles and the
+    number of models with each in the order wounds are allocated to them. Unit targets are
+    immutable, use replace() to get a unit target with different params
+    """
+    __slots__ = ('profiles', 'name')
+
+    def __init__(self, profiles: Iterable[tuple[Target, int]], name: Optional[str] = None) -> None:
+        self.profiles = tuple((target, models) for target, models in profiles)
+        if not self.profiles:
+            raise ValueError('a unit target needs at least one profile')
+        self.name = name
+
+    @property
+    def models(self) -> list[int]:
+        """
+        The index of the profile of each model, in the order wounds are allocated to them
+        """
+        return [index for index, (_, models) in enumerate(self.profiles) for _ in range(models)]
+
+    @property
+    def wounds(self) -> int:
+        """
+        The total wounds of all the models in the unit
+        """
+        return sum(target.wounds * models for target, models in self.profiles)
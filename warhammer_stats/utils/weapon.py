@@ -3,16 +3,20 @@ Classes for representing an attacking weapon
 """
 
 from .pmf import PMFCollection
+from .frozen import Frozen
 from .modifier_collection import ModifierCollection
 
 from typing import Optional
 
 # pylint: disable=too-many-arguments,too-few-public-methods
 
-class Weapon:
+class Weapon(Frozen):
     """
-    Holds the params of a weapon
+    Holds the params of a weapon. Weapons are immutable, use replace() to get a weapon
+    with different params
     """
+    __slots__ = ('bs', 'shots', 'strength', 'ap', 'damage', 'modifiers', 'name', 'cost')
+
     def __init__(self, bs: int, shots: PMFCollection, strength: int, ap: int,
                  damage: PMFCollection, modifiers: Optional[ModifierCollection] = None,
                  name: Optional[str] = None, cost: Optional[float] = None) -> None: